@@ -2,52 +2,379 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
 import logging
+import os
+from typing import Any
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
-from homeassistant.core import HomeAssistant
+import aiohttp
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import (
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    EVENT_HOMEASSISTANT_CLOSE,
+    Platform,
+)
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
-from .client import FilenApiError, FilenAuthError, FilenClient
-from .const import CONF_API_KEY
+from .client import (
+    FilenApiError,
+    FilenAuthError,
+    FilenClient,
+    FilenConnectionStats,
+    FilenCredentialCache,
+    FilenRateLimiter,
+    create_gateway_session,
+)
+from .const import (
+    CONF_ACTIVITY_FEED,
+    CONF_API_KEY,
+    CONF_DRIVE_INDEX,
+    CONF_FOLDER_UUIDS,
+    CONF_REALTIME,
+    CONF_TRASH_SENSORS,
+    DOMAIN,
+    GATEWAY_REQUEST_BURST,
+    GATEWAY_REQUESTS_PER_SECOND,
+    STORAGE_KEY_ACTIVITY,
+    STORAGE_KEY_GROWTH,
+    STORAGE_KEY_SNAPSHOT,
+    STORAGE_VERSION,
+)
+from .coordinator import (
+    FilenActivityCoordinator,
+    FilenConfigEntry,
+    FilenDataUpdateCoordinator,
+    FilenFolderSizeCoordinator,
+    FilenIndexCoordinator,
+    FilenRuntimeData,
+    FilenTrashCoordinator,
+    index_path,
+)
+from .realtime import FilenRealtimeListener
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+# Options that change which objects async_setup_entry creates.
+RELOAD_OPTIONS = (
+    CONF_ACTIVITY_FEED,
+    CONF_DRIVE_INDEX,
+    CONF_FOLDER_UUIDS,
+    CONF_REALTIME,
+    CONF_TRASH_SENSORS,
+)
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+@dataclass
+class FilenDomainData:
+    """Integration-wide state shared by all Filen config entries."""
+
+    clients: dict[str, FilenClient] = field(default_factory=dict)
+    session: aiohttp.ClientSession | None = None
+    # Unsubscribes the listener that closes the session when Home Assistant stops.
+    session_close_listener: Callable[[], None] | None = None
+    connection_stats: FilenConnectionStats = field(
+        default_factory=FilenConnectionStats
+    )
+    backup_agent_listeners: list[Callable[[], None]] = field(default_factory=list)
+    rate_limiter: FilenRateLimiter = field(
+        default_factory=lambda: FilenRateLimiter(
+            GATEWAY_REQUESTS_PER_SECOND, GATEWAY_REQUEST_BURST
+        )
+    )
+    # Password derivations, shared so a flow and its entry derive only once.
+    credential_cache: FilenCredentialCache = field(
+        default_factory=FilenCredentialCache
+    )
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Filen integration services."""
+    async_setup_services(hass)
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: FilenConfigEntry) -> bool:
     """Set up Filen from a config entry."""
-    client = FilenClient(
-        session=async_get_clientsession(hass),
-        email=entry.data[CONF_EMAIL],
-        password=entry.data[CONF_PASSWORD],
+    client = async_get_client(
+        hass,
+        entry.data[CONF_EMAIL],
+        entry.data[CONF_PASSWORD],
         api_key=entry.data.get(CONF_API_KEY),
     )
+    client.api_key_callback = partial(_async_store_api_key, hass, entry)
 
     try:
         await client.authenticate()
-        if client.api_key != entry.data.get(CONF_API_KEY):
-            hass.config_entries.async_update_entry(
-                entry,
-                data={
-                    CONF_EMAIL: entry.data[CONF_EMAIL],
-                    CONF_PASSWORD: entry.data[CONF_PASSWORD],
-                    CONF_API_KEY: client.api_key,
-                },
-            )
     except FilenAuthError as exc:
         raise ConfigEntryAuthFailed(str(exc)) from exc
     except FilenApiError as exc:
         raise ConfigEntryNotReady(str(exc)) from exc
 
-    entry.runtime_data = client
+    coordinator = FilenDataUpdateCoordinator(hass, entry, client)
+    if await coordinator.async_restore_snapshot():
+        # Entities start from the last known values; fetch live data without
+        # holding up Home Assistant startup, staggered across accounts so a
+        # restart does not hit the gateway with every account at once.
+        coordinator.async_schedule_staggered_refresh()
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
+    folder_coordinator: FilenFolderSizeCoordinator | None = None
+    if folder_uuids := entry.options.get(CONF_FOLDER_UUIDS):
+        folder_coordinator = FilenFolderSizeCoordinator(
+            hass, entry, coordinator, folder_uuids
+        )
+        entry.async_create_background_task(
+            hass, folder_coordinator.async_refresh(), f"{DOMAIN}_folder_refresh"
+        )
+
+    activity_coordinator: FilenActivityCoordinator | None = None
+    if entry.options.get(CONF_ACTIVITY_FEED):
+        activity_coordinator = FilenActivityCoordinator(hass, entry, client)
+        await activity_coordinator.async_restore_cursor()
+        entry.async_create_background_task(
+            hass, activity_coordinator.async_refresh(), f"{DOMAIN}_activity_refresh"
+        )
+
+    trash_coordinator: FilenTrashCoordinator | None = None
+    if entry.options.get(CONF_TRASH_SENSORS):
+        trash_coordinator = FilenTrashCoordinator(hass, entry, client)
+        entry.async_create_background_task(
+            hass, trash_coordinator.async_refresh(), f"{DOMAIN}_trash_refresh"
+        )
+
+    index_coordinator: FilenIndexCoordinator | None = None
+    if entry.options.get(CONF_DRIVE_INDEX):
+        index_coordinator = FilenIndexCoordinator(hass, entry, coordinator)
+        await index_coordinator.async_open()
+        entry.async_create_background_task(
+            hass, index_coordinator.async_refresh(), f"{DOMAIN}_index_refresh"
+        )
+
+    realtime_listener: FilenRealtimeListener | None = None
+    if entry.options.get(CONF_REALTIME):
+        realtime_listener = FilenRealtimeListener(
+            client,
+            coordinator.async_handle_realtime_event,
+            coordinator.async_handle_realtime_connection,
+        )
+        entry.async_on_unload(realtime_listener.async_stop)
+        entry.async_create_background_task(
+            hass, realtime_listener.async_run(), f"{DOMAIN}_realtime"
+        )
+
+    entry.runtime_data = FilenRuntimeData(
+        client=client,
+        coordinator=coordinator,
+        folder_coordinator=folder_coordinator,
+        activity_coordinator=activity_coordinator,
+        trash_coordinator=trash_coordinator,
+        index_coordinator=index_coordinator,
+        realtime_listener=realtime_listener,
+    )
+    entry.async_on_unload(
+        entry.add_update_listener(partial(_async_options_updated, dict(entry.options)))
+    )
+    entry.async_on_unload(
+        entry.async_on_state_change(partial(_async_notify_backup_listeners, hass))
+    )
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+async def _async_options_updated(
+    options: dict[str, Any], hass: HomeAssistant, entry: FilenConfigEntry
+) -> None:
+    """Reload the entry when options that affect setup change.
+
+    Entry data updates, such as a new API key, also trigger update listeners
+    and must not cause a reload.
+    """
+    if any(entry.options.get(key) != options.get(key) for key in RELOAD_OPTIONS):
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
+@callback
+def _async_notify_backup_listeners(hass: HomeAssistant) -> None:
+    """Tell the backup integration that the set of Filen agents changed."""
+    for listener in list(async_get_domain_data(hass).backup_agent_listeners):
+        listener()
+
+
+@callback
+def async_get_client(
+    hass: HomeAssistant,
+    email: str,
+    password: str,
+    *,
+    api_key: str | None = None,
+) -> FilenClient:
+    """Return the shared client for a Filen account, creating it if needed.
+
+    Only async_setup_entry registers clients; config flows use
+    async_create_client instead. A client is only reused while the password
+    matches; otherwise it is replaced.
+    """
+    domain_data = async_get_domain_data(hass)
+    clients = domain_data.clients
+    key = email.lower()
+    client = clients.get(key)
+    if client is None or client.password != password:
+        client = async_create_client(hass, email, password, api_key=api_key)
+        clients[key] = client
+        return client
+
+    if api_key and not client.api_key:
+        client.api_key = api_key
+    return client
+
+
+@callback
+def async_create_client(
+    hass: HomeAssistant,
+    email: str,
+    password: str,
+    *,
+    two_factor_code: str | None = None,
+    api_key: str | None = None,
+) -> FilenClient:
+    """Return a new client that is not in the shared registry.
+
+    Config flows validate credentials with such a client, so a mistyped
+    password or a one-time two-factor code never reaches the client of a
+    loaded entry. It still uses the shared session, request budget and
+    password derivations.
+    """
+    domain_data = async_get_domain_data(hass)
+    return FilenClient(
+        session=_async_get_session(hass, domain_data),
+        email=email,
+        password=password,
+        two_factor_code=two_factor_code,
+        api_key=api_key,
+        rate_limiter=domain_data.rate_limiter,
+        credential_cache=domain_data.credential_cache,
+    )
+
+
+@callback
+def async_release_client(hass: HomeAssistant, client: FilenClient) -> None:
+    """Drop a client from the shared registry if it is still registered."""
+    clients = async_get_domain_data(hass).clients
+    key = client.email.lower()
+    if clients.get(key) is client:
+        del clients[key]
+
+
+@callback
+def async_get_domain_data(hass: HomeAssistant) -> FilenDomainData:
+    """Return the integration-wide state, creating it on first use."""
+    if DOMAIN not in hass.data:
+        hass.data[DOMAIN] = FilenDomainData()
+    return hass.data[DOMAIN]
+
+
+@callback
+def _async_get_session(
+    hass: HomeAssistant, domain_data: FilenDomainData
+) -> aiohttp.ClientSession:
+    """Return the integration-owned gateway session, creating it if needed."""
+    if domain_data.session is None or domain_data.session.closed:
+        domain_data.session = create_gateway_session(domain_data.connection_stats)
+
+    if domain_data.session_close_listener is None:
+
+        async def _async_close_on_stop(event: Event) -> None:
+            domain_data.session_close_listener = None
+            await _async_close_session(hass)
+
+        domain_data.session_close_listener = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, _async_close_on_stop
+        )
+    return domain_data.session
+
+
+async def _async_close_session(hass: HomeAssistant) -> None:
+    """Close the gateway session and forget clients bound to it."""
+    domain_data = async_get_domain_data(hass)
+    if domain_data.session_close_listener is not None:
+        domain_data.session_close_listener()
+        domain_data.session_close_listener = None
+    if domain_data.session is not None:
+        _LOGGER.debug(
+            "Closing Filen gateway session (%s connections created, %s reused)",
+            domain_data.connection_stats.created,
+            domain_data.connection_stats.reused,
+        )
+        await domain_data.session.close()
+        domain_data.session = None
+    domain_data.clients.clear()
+
+
+@callback
+def _async_store_api_key(
+    hass: HomeAssistant, entry: FilenConfigEntry, api_key: str
+) -> None:
+    """Persist a new Filen API key and move the realtime socket over to it."""
+    if api_key == entry.data.get(CONF_API_KEY):
+        return
+    hass.config_entries.async_update_entry(
+        entry,
+        data={
+            CONF_EMAIL: entry.data[CONF_EMAIL],
+            CONF_PASSWORD: entry.data[CONF_PASSWORD],
+            CONF_API_KEY: api_key,
+        },
+    )
+    if (
+        entry.state is ConfigEntryState.LOADED
+        and entry.runtime_data.realtime_listener is not None
+    ):
+        entry.runtime_data.realtime_listener.async_reconnect()
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: FilenConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        client = entry.runtime_data.client
+        client.api_key_callback = None
+        async_release_client(hass, client)
+        async_get_domain_data(hass).credential_cache.clear(client.email)
+        if not any(
+            other.state is ConfigEntryState.LOADED
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.entry_id != entry.entry_id
+        ):
+            await _async_close_session(hass)
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove stored data when a config entry is deleted."""
+    async_get_domain_data(hass).credential_cache.clear(entry.data[CONF_EMAIL])
+    for key in (STORAGE_KEY_SNAPSHOT, STORAGE_KEY_GROWTH, STORAGE_KEY_ACTIVITY):
+        await Store(hass, STORAGE_VERSION, f"{key}.{entry.entry_id}").async_remove()
+    await hass.async_add_executor_job(
+        _remove_index_files, index_path(hass, entry.entry_id)
+    )
+
+
+def _remove_index_files(path: str) -> None:
+    """Delete a drive index database and its journal files."""
+    for file_path in (path, f"{path}-wal", f"{path}-shm"):
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,236 @@
+"""Backup platform for the Filen integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Coroutine
+from contextlib import aclosing
+from dataclasses import dataclass
+import json
+import logging
+from typing import Any
+
+from homeassistant.components.backup import (
+    AgentBackup,
+    BackupAgent,
+    BackupAgentError,
+    BackupNotFound,
+    suggested_filename,
+)
+from homeassistant.core import HomeAssistant, callback
+
+from . import async_get_domain_data
+from .client import FilenApiError, FilenFile
+from .const import BACKUP_FOLDER_NAME, DOMAIN
+from .coordinator import FilenConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+# Each backup archive has a small sidecar file holding its AgentBackup metadata.
+METADATA_SUFFIX = ".metadata.json"
+
+
+@dataclass(frozen=True, slots=True)
+class _StoredBackup:
+    """A backup archive on Filen and its metadata sidecar."""
+
+    backup: AgentBackup
+    archive: FilenFile
+    metadata: FilenFile
+
+
+async def async_get_backup_agents(
+    hass: HomeAssistant, **kwargs: Any
+) -> list[BackupAgent]:
+    """Return a backup agent for every loaded Filen account."""
+    return [
+        FilenBackupAgent(hass, entry)
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN)
+    ]
+
+
+@callback
+def async_register_backup_agents_listener(
+    hass: HomeAssistant,
+    *,
+    listener: Callable[[], None],
+    **kwargs: Any,
+) -> Callable[[], None]:
+    """Register a listener called when Filen accounts are loaded or unloaded."""
+    listeners = async_get_domain_data(hass).backup_agent_listeners
+    listeners.append(listener)
+
+    @callback
+    def remove_listener() -> None:
+        listeners.remove(listener)
+
+    return remove_listener
+
+
+async def _async_iter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    """Yield a bytes object as a one-piece stream."""
+    yield data
+
+
+class FilenBackupAgent(BackupAgent):
+    """Store Home Assistant backups in a folder of a Filen drive."""
+
+    domain = DOMAIN
+
+    def __init__(self, hass: HomeAssistant, entry: FilenConfigEntry) -> None:
+        """Initialize the agent."""
+        super().__init__()
+        self._hass = hass
+        self._entry = entry
+        self._client = entry.runtime_data.client
+        self.name = entry.title
+        self.unique_id = entry.entry_id
+        self._folder_uuid: str | None = None
+        # Parsed metadata sidecars by file UUID. Sidecars are never modified,
+        # so each one is only downloaded once.
+        self._metadata_cache: dict[str, tuple[AgentBackup, str]] = {}
+
+    async def async_upload_backup(
+        self,
+        *,
+        open_stream: Callable[[], Coroutine[Any, Any, AsyncIterator[bytes]]],
+        backup: AgentBackup,
+        **kwargs: Any,
+    ) -> None:
+        """Upload a backup archive followed by its metadata sidecar.
+
+        A retry after a failed upload resumes the archive from the chunks that
+        reached Filen, as long as Home Assistant has not restarted in between.
+        """
+        archive_name = suggested_filename(backup)
+        metadata = json.dumps(
+            {"backup": backup.as_dict(), "file": archive_name}
+        ).encode("utf-8")
+        try:
+            folder_uuid = await self._async_get_folder_uuid()
+            await self._client.async_upload_file(
+                folder_uuid,
+                archive_name,
+                await open_stream(),
+                mime="application/x-tar",
+            )
+            await self._client.async_upload_file(
+                folder_uuid,
+                f"{backup.backup_id}{METADATA_SUFFIX}",
+                _async_iter_bytes(metadata),
+                mime="application/json",
+            )
+        except FilenApiError as err:
+            raise BackupAgentError(f"Failed to upload backup to Filen: {err}") from err
+
+        _LOGGER.debug("Uploaded backup %s to Filen", backup.backup_id)
+        await self._entry.runtime_data.coordinator.async_request_refresh()
+
+    async def async_download_backup(
+        self, backup_id: str, **kwargs: Any
+    ) -> AsyncIterator[bytes]:
+        """Return a stream of the backup archive."""
+        stored = await self._async_get_stored_backup(backup_id)
+        return self._async_iter_archive(stored.archive)
+
+    async def async_delete_backup(self, backup_id: str, **kwargs: Any) -> None:
+        """Delete a backup archive and its metadata sidecar."""
+        stored = await self._async_get_stored_backup(backup_id)
+        try:
+            await self._client.async_delete_file(stored.archive.uuid)
+            await self._client.async_delete_file(stored.metadata.uuid)
+        except FilenApiError as err:
+            raise BackupAgentError(f"Failed to delete backup from Filen: {err}") from err
+
+        self._metadata_cache.pop(stored.metadata.uuid, None)
+        await self._entry.runtime_data.coordinator.async_request_refresh()
+
+    async def async_list_backups(self, **kwargs: Any) -> list[AgentBackup]:
+        """List the backups stored on Filen."""
+        return [stored.backup for stored in (await self._async_list_stored()).values()]
+
+    async def async_get_backup(self, backup_id: str, **kwargs: Any) -> AgentBackup:
+        """Return one backup."""
+        return (await self._async_get_stored_backup(backup_id)).backup
+
+    async def _async_get_stored_backup(self, backup_id: str) -> _StoredBackup:
+        """Return one stored backup or raise BackupNotFound."""
+        if (stored := (await self._async_list_stored()).get(backup_id)) is None:
+            raise BackupNotFound(f"Backup {backup_id} not found on Filen")
+        return stored
+
+    async def _async_list_stored(self) -> dict[str, _StoredBackup]:
+        """Pair metadata sidecars with their archives.
+
+        Sidecars whose archive is missing belong to incomplete uploads and are
+        ignored.
+        """
+        try:
+            files = await self._client.async_list_files(
+                await self._async_get_folder_uuid()
+            )
+            sidecars = [file for file in files if file.name.endswith(METADATA_SUFFIX)]
+            await asyncio.gather(
+                *(
+                    self._async_read_metadata(sidecar)
+                    for sidecar in sidecars
+                    if sidecar.uuid not in self._metadata_cache
+                )
+            )
+        except FilenApiError as err:
+            raise BackupAgentError(f"Failed to list backups on Filen: {err}") from err
+
+        sidecar_uuids = {sidecar.uuid for sidecar in sidecars}
+        for sidecar_uuid in [
+            uuid for uuid in self._metadata_cache if uuid not in sidecar_uuids
+        ]:
+            del self._metadata_cache[sidecar_uuid]
+
+        archives = {file.name: file for file in files}
+        stored: dict[str, _StoredBackup] = {}
+        for sidecar in sidecars:
+            if (cached := self._metadata_cache.get(sidecar.uuid)) is None:
+                continue
+            backup, archive_name = cached
+            if (archive := archives.get(archive_name)) is not None:
+                stored[backup.backup_id] = _StoredBackup(backup, archive, sidecar)
+        return stored
+
+    async def _async_read_metadata(self, sidecar: FilenFile) -> None:
+        """Download and cache one metadata sidecar."""
+        content = bytearray()
+        async with aclosing(self._client.async_iter_file(sidecar)) as chunks:
+            async for chunk in chunks:
+                content += chunk
+        try:
+            metadata = json.loads(content)
+            backup = AgentBackup.from_dict(metadata["backup"])
+            archive_name = str(metadata["file"])
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning(
+                "Ignoring unreadable Filen backup metadata %s: %s", sidecar.name, err
+            )
+            return
+        self._metadata_cache[sidecar.uuid] = (backup, archive_name)
+
+    async def _async_iter_archive(self, archive: FilenFile) -> AsyncIterator[bytes]:
+        """Stream an archive, reporting Filen errors as backup agent errors."""
+        try:
+            async with aclosing(self._client.async_iter_file(archive)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+        except FilenApiError as err:
+            raise BackupAgentError(
+                f"Failed to download backup from Filen: {err}"
+            ) from err
+
+    async def _async_get_folder_uuid(self) -> str:
+        """Return the backup folder in the drive's root, creating it if needed."""
+        if self._folder_uuid is None:
+            account = self._entry.runtime_data.coordinator.data
+            if account is None or not account.base_folder_uuid:
+                raise BackupAgentError("The Filen drive root folder is not known yet")
+            self._folder_uuid = await self._client.async_get_or_create_folder(
+                account.base_folder_uuid, BACKUP_FOLDER_NAME
+            )
+        return self._folder_uuid
@@ -1,19 +1,300 @@
-"""Minimal async Filen API client for account/storage sensors."""
+"""Async Filen API client: login, account data, drive listings and encrypted file transfers."""
 
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass, field, fields
+from email.utils import parsedate_to_datetime
+from functools import partial
 import hashlib
+import heapq
+import hmac
+import itertools
 import json as json_lib
 import logging
-from typing import Any
+import random
+import secrets
+import time
+from typing import Any, Callable
+from uuid import uuid4
 
 import aiohttp
-from argon2.low_level import Type, hash_secret_raw
 
-from .const import API_BASE_URL, REQUEST_TIMEOUT
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+from .const import (
+    ACCOUNT_DETAILS_TTL,
+    API_BASE_URL,
+    CIRCUIT_BREAKER_RESET,
+    CIRCUIT_BREAKER_THRESHOLD,
+    CONNECTION_KEEPALIVE_TIMEOUT,
+    CONNECTION_LIMIT_PER_HOST,
+    DNS_CACHE_TTL,
+    FILE_EGEST_URL,
+    FILE_INGEST_URL,
+    FILE_TRANSFER_CONCURRENCY,
+    FOLDER_SCAN_CONCURRENCY,
+    FOLDER_SIZE_TTL,
+    METRIC_CHUNK_DOWNLOAD,
+    METRIC_PASSWORD_DERIVATION,
+    REQUEST_PRIORITY_NORMAL,
+    REQUEST_RETRIES,
+    REQUEST_TIMEOUT,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    TRASH_USAGE_TTL,
+    USER_EVENTS_MAX_PAGES,
+)
+from .crypto import (
+    CHUNK_SIZE,
+    FILE_VERSION_2,
+    decrypt_chunk,
+    decrypt_metadata,
+    decrypt_metadata_with_keys,
+    encrypt_chunk,
+    encrypt_metadata,
+    generate_key,
+    hash_name,
+)
+from .metrics import FilenMetrics
 
 _LOGGER = logging.getLogger(__name__)
 
+# Error codes Filen returns in the response envelope for a rejected API key.
+_API_KEY_ERROR_CODES = {"api_key_not_found", "invalid_api_key", "unauthorized"}
+
+_CLIENT_TIMEOUT = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+# Response bodies quoted in error messages are truncated to this many characters.
+_ERROR_BODY_MAX_CHARS = 512
+
+# Failed uploads whose progress is kept so a retry can resume them.
+_PENDING_UPLOADS_MAX = 8
+
+
+def _json_loads(body: bytes) -> Any:
+    """Parse a JSON body, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json_lib.loads(body)
+
+
+def _error_body(body: bytes) -> str:
+    """Return a size-capped, decoded response body for error messages."""
+    text = body[:_ERROR_BODY_MAX_CHARS].decode("utf-8", errors="replace")
+    if len(body) > _ERROR_BODY_MAX_CHARS:
+        text += "..."
+    return text
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Return the delay in seconds requested by a Retry-After header."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+@dataclass(slots=True)
+class FilenConnectionStats:
+    """Count new and reused gateway connections of a session."""
+
+    created: int = 0
+    reused: int = 0
+
+
+def create_gateway_session(stats: FilenConnectionStats) -> aiohttp.ClientSession:
+    """Create a session tuned for repeated calls to the Filen gateway.
+
+    Connections are kept alive between polls, DNS lookups are cached and the
+    number of parallel connections per host is bounded.
+    """
+
+    async def on_connection_create_end(
+        session: aiohttp.ClientSession, context: Any, params: Any
+    ) -> None:
+        stats.created += 1
+
+    async def on_connection_reuseconn(
+        session: aiohttp.ClientSession, context: Any, params: Any
+    ) -> None:
+        stats.reused += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=CONNECTION_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+        ),
+        timeout=_CLIENT_TIMEOUT,
+        trace_configs=[trace_config],
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class FilenAccountData:
+    """Compact snapshot of one Filen account's metadata and storage usage."""
+
+    account_id: int | str | None
+    email: str | None
+    avatar_url: str | None
+    base_folder_uuid: str | None
+    is_premium: bool
+    storage_used: int
+    storage_total: int
+    storage_percentage: float
+    display_name: str | None
+    nick_name: str | None
+    plan_names: tuple[str, ...]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> FilenAccountData:
+        """Build a snapshot from as_dict output, ignoring unknown keys."""
+        values = {field.name: data.get(field.name) for field in fields(cls)}
+        values["is_premium"] = bool(values["is_premium"])
+        values["storage_used"] = values["storage_used"] or 0
+        values["storage_total"] = values["storage_total"] or 0
+        values["storage_percentage"] = values["storage_percentage"] or 0
+        values["plan_names"] = tuple(values["plan_names"] or ())
+        return cls(**values)
+
+
+@dataclass(frozen=True, slots=True)
+class FilenFolderSize:
+    """Recursive size of one Filen folder."""
+
+    uuid: str
+    size: int
+    files: int
+    folders: int
+
+
+@dataclass(frozen=True, slots=True)
+class FilenTrashUsage:
+    """Item counts and size of the Filen trash."""
+
+    files: int
+    folders: int
+    size: int
+
+    @property
+    def items(self) -> int:
+        """Return the number of trashed files and folders."""
+        return self.files + self.folders
+
+
+@dataclass(frozen=True, slots=True)
+class FilenUserEvent:
+    """One entry of the Filen account activity feed.
+
+    ``uuid`` and ``parent`` identify the affected item and its folder when
+    Filen includes them in the event.
+    """
+
+    id: int
+    type: str
+    timestamp: int
+    uuid: str | None = None
+    parent: str | None = None
+
+    @property
+    def cursor(self) -> tuple[int, int]:
+        """Return the (timestamp, id) position of the event in the feed."""
+        return (self.timestamp, self.id)
+
+
+@dataclass(frozen=True, slots=True)
+class FilenFolder:
+    """A folder stored on Filen."""
+
+    uuid: str
+    name: str
+    parent: str
+
+
+@dataclass(frozen=True, slots=True)
+class FilenFolderListing:
+    """Subfolders and files directly inside one folder."""
+
+    folders: list[FilenFolder]
+    files: list[FilenFile]
+
+
+@dataclass(frozen=True, slots=True)
+class FilenFile:
+    """A file stored on Filen with the metadata needed to download it."""
+
+    uuid: str
+    name: str
+    size: int
+    mime: str
+    key: str
+    # File encryption version, which decides how ``key`` is decoded.
+    version: int
+    chunks: int
+    region: str
+    bucket: str
+    last_modified: int
+
+
+@dataclass(slots=True)
+class FilenUpload:
+    """Progress of one chunked upload, kept so a failed upload can resume."""
+
+    parent: str
+    name: str
+    uuid: str = field(default_factory=lambda: str(uuid4()))
+    key: str = field(default_factory=generate_key)
+    upload_key: str = field(default_factory=generate_key)
+    uploaded: set[int] = field(default_factory=set)
+    region: str | None = None
+    bucket: str | None = None
+
+
+async def _iter_chunks(
+    stream: AsyncIterator[bytes], chunk_size: int
+) -> AsyncIterator[bytes]:
+    """Re-slice a byte stream into chunks of exactly chunk_size bytes.
+
+    Only the last chunk may be shorter. At most one chunk plus one incoming
+    piece is buffered at a time.
+    """
+    buffer = bytearray()
+    async for piece in stream:
+        buffer += piece
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _encrypt_upload_chunk(data: bytes, key: str) -> tuple[bytes, str]:
+    """Encrypt a chunk and return it with the hash the ingest server expects."""
+    encrypted = encrypt_chunk(data, key, FILE_VERSION_2)
+    return encrypted, hashlib.sha512(encrypted).hexdigest()
+
 
 class FilenApiError(Exception):
     """Raised when the Filen API returns an error."""
@@ -23,6 +304,201 @@ class FilenAuthError(FilenApiError):
     """Raised when Filen authentication fails."""
 
 
+class FilenApiKeyError(FilenAuthError):
+    """Raised when the stored Filen API key was rejected."""
+
+
+class FilenTransientError(FilenApiError):
+    """Raised when a Filen request failed in a way that may succeed on retry."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        """Initialize the error with an optional server-requested delay."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FilenCircuitOpenError(FilenApiError):
+    """Raised when requests are short-circuited during a gateway outage."""
+
+
+class FilenEventsOverflowError(FilenApiError):
+    """Raised after the last event page when some new events were not read."""
+
+
+class _CircuitBreaker:
+    """Track consecutive transient failures and pause requests after too many."""
+
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        """Initialize the breaker."""
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.open_count = 0
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half_open."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def check(self) -> None:
+        """Raise if requests should not be sent right now."""
+        if self.state == "open":
+            raise FilenCircuitOpenError(
+                "Filen gateway requests are paused after repeated failures"
+            )
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        if self.opened_at is not None:
+            _LOGGER.info("Filen gateway recovered; resuming requests")
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a transient failure and open the breaker at the threshold."""
+        self.consecutive_failures += 1
+        if self.state == "half_open" or (
+            self.opened_at is None and self.consecutive_failures >= self.threshold
+        ):
+            self.opened_at = time.monotonic()
+            self.open_count += 1
+            _LOGGER.warning(
+                "Pausing Filen gateway requests for %s seconds after %s "
+                "consecutive failures",
+                self.reset_timeout,
+                self.consecutive_failures,
+            )
+
+
+class FilenRateLimiter:
+    """Token bucket that paces gateway requests of all clients sharing it.
+
+    Requests pass immediately while tokens are available. Once the bucket is
+    empty, waiters are released at ``rate`` per second, lowest priority value
+    first and in arrival order within a priority.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.delayed_count = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    async def async_acquire(self, priority: int = REQUEST_PRIORITY_NORMAL) -> None:
+        """Wait until a request may be sent."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        self.delayed_count += 1
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._schedule_release()
+        await future
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def _schedule_release(self) -> None:
+        """Wake up when the next token is available."""
+        if self._timer is None and self._waiters:
+            delay = max((1 - self._tokens) / self.rate, 0.0)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self) -> None:
+        """Hand out available tokens to waiters in priority order."""
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # The waiting request was cancelled.
+                continue
+            future.set_result(None)
+            self._tokens -= 1
+        self._schedule_release()
+
+
+class FilenCredentialCache:
+    """Derived (master key, login password) pairs, keyed by account and salt.
+
+    Each entry holds an HMAC of the raw password under a secret that only this
+    cache knows, so a changed password is derived again and the cache holds
+    nothing an attacker could test password guesses against offline.
+    """
+
+    def __init__(self, max_size: int = 32) -> None:
+        """Initialize an empty cache."""
+        self.max_size = max_size
+        self._secret = secrets.token_bytes(32)
+        self._entries: dict[tuple[str, str, int], tuple[bytes, tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached derivations."""
+        return len(self._entries)
+
+    def get(
+        self, email: str, salt: str, auth_version: int, password: str
+    ) -> tuple[str, str] | None:
+        """Return the cached derivation if it was made from this password."""
+        cached = self._entries.get((email.lower(), salt, auth_version))
+        if cached is None or not hmac.compare_digest(
+            cached[0], self._fingerprint(password)
+        ):
+            return None
+        return cached[1]
+
+    def set(
+        self,
+        email: str,
+        salt: str,
+        auth_version: int,
+        password: str,
+        credentials: tuple[str, str],
+    ) -> None:
+        """Store a derivation, evicting the oldest one when full."""
+        if len(self._entries) >= self.max_size:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[(email.lower(), salt, auth_version)] = (
+            self._fingerprint(password),
+            credentials,
+        )
+
+    def clear(self, email: str | None = None) -> None:
+        """Forget the derivations of one account, or of all accounts."""
+        if email is None:
+            self._entries.clear()
+            return
+        email = email.lower()
+        for key in [key for key in self._entries if key[0] == email]:
+            del self._entries[key]
+
+    def _fingerprint(self, password: str) -> bytes:
+        """Return the keyed fingerprint of a raw password."""
+        return hmac.new(self._secret, password.encode("utf-8"), "sha256").digest()
+
+
 class FilenClient:
     """Small Filen API client for authentication and account metadata."""
 
@@ -33,29 +509,83 @@ class FilenClient:
         password: str,
         two_factor_code: str | None = None,
         api_key: str | None = None,
+        api_key_callback: Callable[[str], None] | None = None,
+        base_url: str = API_BASE_URL,
+        ingest_url: str = FILE_INGEST_URL,
+        egest_url: str = FILE_EGEST_URL,
+        rate_limiter: FilenRateLimiter | None = None,
+        credential_cache: FilenCredentialCache | None = None,
     ) -> None:
-        """Initialize the client."""
+        """Initialize the client.
+
+        ``api_key_callback`` is called with the new key after every login,
+        including transparent re-logins after the stored API key was rejected.
+        ``base_url``, ``ingest_url`` and ``egest_url`` point the client at a
+        different gateway and file servers, such as local stand-in servers.
+        Gateway requests wait for ``rate_limiter`` when one is given, at the
+        client's ``priority``; file server transfers are not limited.
+        Password derivations are kept in ``credential_cache``, or in a cache of
+        the client's own when none is given.
+        """
         self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.ingest_url = ingest_url.rstrip("/")
+        self.egest_url = egest_url.rstrip("/")
         self.email = email
         self.password = password
         self.two_factor_code = self._normalize_two_factor_code(two_factor_code)
         self.api_key = api_key
         self.auth_version: int | None = None
+        self._response_cache: dict[str, tuple[float, Any]] = {}
+        # Folder UUID -> (fetched at, account storage_used at fetch, size).
+        self._folder_size_cache: dict[str, tuple[float, int, FilenFolderSize]] = {}
+        self._trash_usage: tuple[float, FilenTrashUsage] | None = None
+        # Bumped by async_empty_trash to discard listings it overtook.
+        self._trash_emptied = 0
+        self.circuit_breaker = _CircuitBreaker(
+            CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_RESET.total_seconds()
+        )
+        self.retry_count = 0
+        self.relogin_count = 0
+        self.api_key_callback = api_key_callback
+        self._auth_lock = asyncio.Lock()
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self.coalesced_count = 0
+        self.metrics = FilenMetrics()
+        self.rate_limiter = rate_limiter
+        self.credential_cache = (
+            credential_cache if credential_cache is not None else FilenCredentialCache()
+        )
+        self.priority = REQUEST_PRIORITY_NORMAL
+        self._master_key: str | None = None
+        self._master_keys: list[str] | None = None
+        self._keys_lock = asyncio.Lock()
+        self._folder_uuids: dict[tuple[str, str], str] = {}
+        self._pending_uploads: dict[tuple[str, str], FilenUpload] = {}
 
     async def authenticate(self) -> None:
         """Authenticate and store the API key for subsequent requests."""
         if self.api_key:
             return
 
+        async with self._auth_lock:
+            if not self.api_key:
+                await self._async_login()
+
+    async def _async_login(self) -> None:
+        """Log in with the stored credentials and store the new API key."""
         auth_info = await self._request(
             "POST",
             "/v3/auth/info",
             json={"email": self.email},
             authenticated=False,
+            idempotent=True,
         )
         auth_version = int(auth_info["authVersion"])
         salt = auth_info["salt"]
-        derived_password = self._derive_password(self.password, salt, auth_version)
+        master_key, derived_password = await self._async_derive_credentials(
+            self.password, salt, auth_version
+        )
 
         login_response = await self._request(
             "POST",
@@ -75,21 +605,26 @@ class FilenClient:
 
         self.api_key = api_key
         self.auth_version = auth_version
+        self._master_key = master_key
         _LOGGER.debug("Authenticated with Filen using auth version %s", auth_version)
+        if self.api_key_callback is not None:
+            self.api_key_callback(api_key)
 
-    async def async_get_account_data(self) -> dict[str, Any]:
-        """Return merged user info and account/storage details."""
-        await self._ensure_authenticated()
+    async def async_get_account_data(
+        self, *, force_refresh: bool = False
+    ) -> FilenAccountData:
+        """Return merged user info and account/storage details.
 
-        user_info = await self._request("GET", "/v3/user/info")
+        Storage values from /v3/user/info are fetched on every call, while the
+        slow-changing /v3/user/account details are served from a TTL cache unless
+        ``force_refresh`` is set.
+        """
+        await self._ensure_authenticated()
 
-        # /v3/user/account contains richer account fields but is not essential for
-        # storage sensors. If it fails, still expose /v3/user/info values.
-        try:
-            account = await self._request("GET", "/v3/user/account")
-        except FilenApiError as err:
-            _LOGGER.debug("Could not fetch Filen account details: %s", err)
-            account = {}
+        user_info, account = await asyncio.gather(
+            self._request("GET", "/v3/user/info"),
+            self._async_get_optional_account(force_refresh=force_refresh),
+        )
 
         storage_used = self._as_int(
             user_info.get("storageUsed", account.get("storage", 0))
@@ -102,24 +637,624 @@ class FilenClient:
         )
 
         plans = account.get("plans") or []
-        plan_names = [plan.get("name") for plan in plans if plan.get("name")]
+        plan_names = tuple(plan.get("name") for plan in plans if plan.get("name"))
+
+        return FilenAccountData(
+            account_id=user_info.get("id"),
+            email=user_info.get("email", self.email),
+            avatar_url=user_info.get("avatarURL") or account.get("avatarURL"),
+            base_folder_uuid=user_info.get("baseFolderUUID"),
+            is_premium=bool(user_info.get("isPremium", account.get("isPremium", 0))),
+            storage_used=storage_used,
+            storage_total=storage_total,
+            storage_percentage=storage_percentage,
+            display_name=account.get("displayName"),
+            nick_name=account.get("nickName"),
+            plan_names=plan_names,
+        )
+
+    async def async_get_folder_sizes(
+        self, folder_uuids: list[str], *, storage_used: int
+    ) -> dict[str, FilenFolderSize]:
+        """Return recursive sizes for the given folders.
+
+        Sizes are cached per folder. A folder is only rescanned when its entry
+        is older than FOLDER_SIZE_TTL or the account's storage usage changed
+        since it was fetched, and at most FOLDER_SCAN_CONCURRENCY folders are
+        scanned at once. Folders that fail keep their last cached size.
+        """
+        await self._ensure_authenticated()
+
+        now = time.monotonic()
+        cache = self._folder_size_cache
+        ttl = FOLDER_SIZE_TTL.total_seconds()
+        for folder_uuid in [uuid for uuid in cache if uuid not in folder_uuids]:
+            del cache[folder_uuid]
+
+        stale = [
+            folder_uuid
+            for folder_uuid in folder_uuids
+            if (cached := cache.get(folder_uuid)) is None
+            or now - cached[0] >= ttl
+            or cached[1] != storage_used
+        ]
+        semaphore = asyncio.Semaphore(FOLDER_SCAN_CONCURRENCY)
+
+        async def _async_scan(folder_uuid: str) -> FilenFolderSize:
+            async with semaphore:
+                return await self.async_get_folder_size(folder_uuid)
+
+        results = await asyncio.gather(
+            *(_async_scan(folder_uuid) for folder_uuid in stale),
+            return_exceptions=True,
+        )
+        errors: list[BaseException] = []
+        for folder_uuid, result in zip(stale, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, FilenApiError):
+                    raise result
+                _LOGGER.debug("Could not scan Filen folder %s: %s", folder_uuid, result)
+                errors.append(result)
+                continue
+            cache[folder_uuid] = (now, storage_used, result)
 
+        if errors and not any(folder_uuid in cache for folder_uuid in folder_uuids):
+            raise errors[0]
+
+        _LOGGER.debug(
+            "Scanned %s of %s Filen folders", len(stale) - len(errors), len(folder_uuids)
+        )
         return {
-            "account_id": user_info.get("id"),
-            "email": user_info.get("email", self.email),
-            "avatar_url": user_info.get("avatarURL") or account.get("avatarURL"),
-            "base_folder_uuid": user_info.get("baseFolderUUID"),
-            "is_premium": bool(user_info.get("isPremium", account.get("isPremium", 0))),
-            "storage_used": storage_used,
-            "storage_total": storage_total,
-            "storage_percentage": storage_percentage,
-            "display_name": account.get("displayName"),
-            "nick_name": account.get("nickName"),
-            "plan_names": plan_names,
-            "raw_user_info": user_info,
-            "raw_account": account,
+            folder_uuid: cache[folder_uuid][2]
+            for folder_uuid in folder_uuids
+            if folder_uuid in cache
         }
 
+    async def async_get_trash_usage(self) -> FilenTrashUsage:
+        """Return trash item counts and size, cached for TRASH_USAGE_TTL.
+
+        Only the counts are kept between polls, not the listing. A listing
+        that was in flight while the trash was emptied is fetched again, so it
+        cannot cache the old total.
+        """
+        now = time.monotonic()
+        if (
+            self._trash_usage is not None
+            and now - self._trash_usage[0] < TRASH_USAGE_TTL.total_seconds()
+        ):
+            return self._trash_usage[1]
+
+        await self._ensure_authenticated()
+        while True:
+            trash_emptied = self._trash_emptied
+            payload = await self._request(
+                "POST", "/v3/dir/content", json={"uuid": "trash"}, idempotent=True
+            )
+            if trash_emptied == self._trash_emptied:
+                break
+        uploads = payload.get("uploads") or ()
+        folders = payload.get("folders") or ()
+        usage = FilenTrashUsage(
+            files=len(uploads),
+            folders=len(folders),
+            size=sum(self._as_int(upload.get("size")) for upload in uploads),
+        )
+        self._trash_usage = (now, usage)
+        return usage
+
+    async def async_empty_trash(self) -> None:
+        """Permanently delete everything in the trash."""
+        await self._ensure_authenticated()
+        await self._request("POST", "/v3/trash/empty", json={})
+        self._trash_emptied += 1
+        self._trash_usage = None
+        self.invalidate_cache()
+
+    async def async_iter_user_events(
+        self, *, after: tuple[int, int] | None = None
+    ) -> AsyncIterator[list[FilenUserEvent]]:
+        """Yield pages of account events newer than the ``after`` cursor.
+
+        Filen returns events newest first and pages backwards in time with
+        ``lastTimestamp``. Paging stops at the first event at or before the
+        cursor, so each poll only fetches new events. Without a cursor only the
+        newest page is fetched.
+
+        At most USER_EVENTS_MAX_PAGES pages are read. If new events remain after
+        that, or more events share one second than a page holds, some cannot be
+        read and FilenEventsOverflowError is raised after the last page.
+        """
+        await self._ensure_authenticated()
+
+        last_timestamp = int(time.time()) + 60
+        boundary: tuple[int, int] | None = None
+        stepped_past_second = False
+        for _ in range(USER_EVENTS_MAX_PAGES):
+            payload = await self._request(
+                "POST",
+                "/v3/user/events",
+                json={"lastTimestamp": last_timestamp, "filter": "all"},
+                idempotent=True,
+            )
+            raw_events = payload.get("events") or []
+
+            page: list[FilenUserEvent] = []
+            reached_cursor = False
+            for raw_event in raw_events:
+                info = raw_event.get("info")
+                if not isinstance(info, dict):
+                    info = {}
+                event = FilenUserEvent(
+                    id=self._as_int(raw_event.get("id")),
+                    type=str(raw_event.get("type") or "unknown"),
+                    timestamp=self._as_int(raw_event.get("timestamp")),
+                    uuid=info.get("uuid") or None,
+                    parent=info.get("parent") or None,
+                )
+                if boundary is not None and event.cursor >= boundary:
+                    # Already yielded on the previous page.
+                    continue
+                if after is not None and event.cursor <= after:
+                    reached_cursor = True
+                    break
+                page.append(event)
+
+            if page:
+                yield page
+            if reached_cursor or after is None or not raw_events:
+                break
+
+            if page:
+                boundary = page[-1].cursor
+                last_timestamp = page[-1].timestamp
+            else:
+                # Only already yielded events, so all from the boundary's
+                # second. lastTimestamp cannot page within a second; step past
+                # it, losing any of its events that did not fit on the page.
+                stepped_past_second = True
+                last_timestamp -= 1
+        else:
+            raise FilenEventsOverflowError(
+                f"More new Filen events than {USER_EVENTS_MAX_PAGES} pages hold"
+            )
+
+        if stepped_past_second:
+            raise FilenEventsOverflowError(
+                "More new Filen events share one second than a page holds"
+            )
+
+    async def async_get_folder_size(self, folder_uuid: str) -> FilenFolderSize:
+        """Return the recursive size of one folder."""
+        payload = await self._request(
+            "POST",
+            "/v3/dir/size",
+            json={
+                "uuid": folder_uuid,
+                "sharerId": 0,
+                "receiverId": 0,
+                "trash": False,
+            },
+            idempotent=True,
+        )
+        return FilenFolderSize(
+            uuid=folder_uuid,
+            size=self._as_int(payload.get("size")),
+            files=self._as_int(payload.get("files")),
+            folders=self._as_int(payload.get("folders")),
+        )
+
+    async def async_get_master_keys(self) -> list[str]:
+        """Return the account's master keys, oldest first.
+
+        The newest key encrypts new metadata; older keys are still needed to
+        decrypt metadata written before a password change. Deriving the master
+        key needs the password, so the first call after starting with a stored
+        API key pays one password derivation.
+        """
+        if self._master_keys is not None:
+            return self._master_keys
+
+        await self._ensure_authenticated()
+        async with self._keys_lock:
+            if self._master_keys is not None:
+                return self._master_keys
+
+            master_key = self._master_key
+            if master_key is None:
+                auth_info = await self._request(
+                    "POST",
+                    "/v3/auth/info",
+                    json={"email": self.email},
+                    authenticated=False,
+                    idempotent=True,
+                )
+                master_key, _ = await self._async_derive_credentials(
+                    self.password, auth_info["salt"], int(auth_info["authVersion"])
+                )
+                self._master_key = master_key
+
+            payload = await self._request(
+                "POST",
+                "/v3/user/masterKeys",
+                json={"masterKeys": encrypt_metadata(master_key, master_key)},
+                idempotent=True,
+            )
+            try:
+                decrypted = decrypt_metadata(payload["keys"], master_key)
+            except (KeyError, TypeError, ValueError) as err:
+                raise FilenAuthError("Could not decrypt the Filen master keys") from err
+
+            keys = [key for key in decrypted.split("|") if key]
+            if master_key not in keys:
+                keys.append(master_key)
+            self._master_keys = keys
+            return keys
+
+    async def async_get_or_create_folder(self, parent_uuid: str, name: str) -> str:
+        """Return the UUID of a named subfolder, creating it if it is missing."""
+        cache_key = (parent_uuid, name)
+        if (folder_uuid := self._folder_uuids.get(cache_key)) is not None:
+            return folder_uuid
+
+        await self._ensure_authenticated()
+        name_hashed = hash_name(name)
+        existing = await self._request(
+            "POST",
+            "/v3/dir/exists",
+            json={"parent": parent_uuid, "nameHashed": name_hashed},
+            idempotent=True,
+        )
+        if existing.get("exists") and existing.get("uuid"):
+            folder_uuid = str(existing["uuid"])
+        else:
+            master_keys = await self.async_get_master_keys()
+            folder_uuid = str(uuid4())
+            await self._request(
+                "POST",
+                "/v3/dir/create",
+                json={
+                    "uuid": folder_uuid,
+                    "name": encrypt_metadata(
+                        json_lib.dumps({"name": name}), master_keys[-1]
+                    ),
+                    "nameHashed": name_hashed,
+                    "parent": parent_uuid,
+                },
+            )
+            self.invalidate_cache()
+            _LOGGER.debug("Created Filen folder %s", folder_uuid)
+
+        self._folder_uuids[cache_key] = folder_uuid
+        return folder_uuid
+
+    async def async_list_files(self, folder_uuid: str) -> list[FilenFile]:
+        """Return the files directly inside a folder."""
+        return (await self.async_list_folder(folder_uuid)).files
+
+    async def async_list_folder(
+        self, folder_uuid: str, *, priority: int | None = None
+    ) -> FilenFolderListing:
+        """Return the subfolders and files directly inside a folder.
+
+        Entries whose metadata cannot be decrypted with the account's master
+        keys are skipped. ``priority`` overrides the client's rate limiter
+        priority, so bulk listings can yield to polls.
+        """
+        await self._ensure_authenticated()
+        master_keys = await self.async_get_master_keys()
+        payload = await self._request(
+            "POST",
+            "/v3/dir/content",
+            json={"uuid": folder_uuid},
+            idempotent=True,
+            priority=priority,
+        )
+
+        folders: list[FilenFolder] = []
+        for folder in payload.get("folders") or ():
+            try:
+                name = json_lib.loads(
+                    decrypt_metadata_with_keys(folder["name"], master_keys)
+                )["name"]
+                folders.append(
+                    FilenFolder(
+                        uuid=str(folder["uuid"]),
+                        name=str(name),
+                        parent=str(folder.get("parent") or folder_uuid),
+                    )
+                )
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.debug(
+                    "Skipping Filen folder %s with unreadable metadata: %s",
+                    folder.get("uuid"),
+                    err,
+                )
+
+        files: list[FilenFile] = []
+        for upload in payload.get("uploads") or ():
+            try:
+                files.append(self._parse_file(upload, master_keys))
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.debug(
+                    "Skipping Filen file %s with unreadable metadata: %s",
+                    upload.get("uuid"),
+                    err,
+                )
+        return FilenFolderListing(folders=folders, files=files)
+
+    async def async_get_file(self, file_uuid: str) -> FilenFile:
+        """Return one file by UUID."""
+        await self._ensure_authenticated()
+        master_keys = await self.async_get_master_keys()
+        payload = await self._request(
+            "POST", "/v3/file", json={"uuid": file_uuid}, idempotent=True
+        )
+        try:
+            return self._parse_file({"uuid": file_uuid, **payload}, master_keys)
+        except (KeyError, TypeError, ValueError) as err:
+            raise FilenApiError(
+                f"Could not read the metadata of Filen file {file_uuid}"
+            ) from err
+
+    def _parse_file(self, item: dict[str, Any], master_keys: list[str]) -> FilenFile:
+        """Build a FilenFile from a file listing item with encrypted metadata."""
+        metadata = json_lib.loads(
+            decrypt_metadata_with_keys(item["metadata"], master_keys)
+        )
+        size = self._as_int(metadata.get("size"))
+        return FilenFile(
+            uuid=str(item["uuid"]),
+            name=str(metadata.get("name") or ""),
+            size=size,
+            mime=str(metadata.get("mime") or "application/octet-stream"),
+            key=str(metadata.get("key") or ""),
+            version=self._as_int(item.get("version")) or FILE_VERSION_2,
+            # Some listings omit the chunk count; it follows from the size.
+            chunks=self._as_int(item.get("chunks")) or -(-size // CHUNK_SIZE),
+            region=str(item.get("region") or ""),
+            bucket=str(item.get("bucket") or ""),
+            last_modified=self._as_int(metadata.get("lastModified")),
+        )
+
+    async def async_upload_file(
+        self,
+        parent_uuid: str,
+        name: str,
+        stream: AsyncIterator[bytes],
+        *,
+        mime: str = "application/octet-stream",
+    ) -> FilenFile:
+        """Upload a byte stream as a new file and return it.
+
+        The stream is cut into CHUNK_SIZE chunks that are encrypted in an
+        executor and uploaded with at most FILE_TRANSFER_CONCURRENCY chunks in
+        flight, so memory use does not depend on the file size. Reading pauses
+        while the window is full.
+
+        If an upload of the same name into the same folder failed before, its
+        progress is reused and chunks that already reached the server are not
+        sent again. The stream must then yield the same content. Progress is
+        only kept in memory, so an upload interrupted by a restart starts over.
+        """
+        await self._ensure_authenticated()
+        master_keys = await self.async_get_master_keys()
+
+        upload_id = (parent_uuid, name)
+        upload = self._pending_uploads.pop(upload_id, None) or FilenUpload(
+            parent=parent_uuid, name=name
+        )
+        if upload.uploaded:
+            _LOGGER.debug(
+                "Resuming Filen upload of %s with %s chunks already uploaded",
+                name,
+                len(upload.uploaded),
+            )
+
+        try:
+            size, chunks = await self._async_upload_chunks(upload, stream)
+        except BaseException:
+            if len(self._pending_uploads) >= _PENDING_UPLOADS_MAX:
+                self._pending_uploads.pop(next(iter(self._pending_uploads)))
+            self._pending_uploads[upload_id] = upload
+            raise
+        if not chunks:
+            raise FilenApiError(f"Cannot upload {name}: the file is empty")
+
+        last_modified = int(time.time() * 1000)
+        await self._request(
+            "POST",
+            "/v3/upload/done",
+            json={
+                "uuid": upload.uuid,
+                "name": encrypt_metadata(name, upload.key),
+                "nameHashed": hash_name(name),
+                "size": encrypt_metadata(str(size), upload.key),
+                "chunks": chunks,
+                "mime": encrypt_metadata(mime, upload.key),
+                "rm": generate_key(),
+                "metadata": encrypt_metadata(
+                    json_lib.dumps(
+                        {
+                            "name": name,
+                            "size": size,
+                            "mime": mime,
+                            "key": upload.key,
+                            "lastModified": last_modified,
+                        },
+                        separators=(",", ":"),
+                    ),
+                    master_keys[-1],
+                ),
+                "version": FILE_VERSION_2,
+                "uploadKey": upload.upload_key,
+            },
+        )
+        self.invalidate_cache()
+        return FilenFile(
+            uuid=upload.uuid,
+            name=name,
+            size=size,
+            mime=mime,
+            key=upload.key,
+            version=FILE_VERSION_2,
+            chunks=chunks,
+            region=upload.region or "",
+            bucket=upload.bucket or "",
+            last_modified=last_modified,
+        )
+
+    async def _async_upload_chunks(
+        self, upload: FilenUpload, stream: AsyncIterator[bytes]
+    ) -> tuple[int, int]:
+        """Encrypt and upload a stream's chunks, returning (size, chunk count)."""
+        loop = asyncio.get_running_loop()
+        window = asyncio.Semaphore(FILE_TRANSFER_CONCURRENCY)
+        tasks: set[asyncio.Task[None]] = set()
+        errors: list[BaseException] = []
+
+        async def _async_upload_chunk(index: int, chunk: bytes) -> None:
+            try:
+                encrypted, chunk_hash = await loop.run_in_executor(
+                    None, _encrypt_upload_chunk, chunk, upload.key
+                )
+                result = await self._request(
+                    "POST",
+                    "/v3/upload",
+                    data=encrypted,
+                    params={
+                        "uuid": upload.uuid,
+                        "index": str(index),
+                        "parent": upload.parent,
+                        "uploadKey": upload.upload_key,
+                        "hash": chunk_hash,
+                    },
+                    base_url=self.ingest_url,
+                    idempotent=True,
+                )
+                upload.region = result.get("region", upload.region)
+                upload.bucket = result.get("bucket", upload.bucket)
+                upload.uploaded.add(index)
+            except Exception as err:  # noqa: BLE001 - re-raised by the reader
+                errors.append(err)
+            finally:
+                window.release()
+
+        size = 0
+        index = 0
+        try:
+            async for chunk in _iter_chunks(stream, CHUNK_SIZE):
+                if index not in upload.uploaded:
+                    await window.acquire()
+                    if errors:
+                        window.release()
+                        raise errors[0]
+                    task = asyncio.create_task(_async_upload_chunk(index, chunk))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                size += len(chunk)
+                index += 1
+            if tasks:
+                await asyncio.wait(tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        if errors:
+            raise errors[0]
+        return size, index
+
+    async def async_iter_file(self, file: FilenFile) -> AsyncIterator[bytes]:
+        """Yield the decrypted content of a file, chunk by chunk, in order.
+
+        Up to FILE_TRANSFER_CONCURRENCY chunks are fetched ahead and decrypted
+        in an executor while earlier chunks are consumed, so at most that many
+        chunks are held in memory.
+        """
+        await self._ensure_authenticated()
+        loop = asyncio.get_running_loop()
+
+        async def _async_fetch_chunk(index: int) -> bytes:
+            encrypted = await self._request_with_relogin(
+                "GET",
+                f"/{file.region}/{file.bucket}/{file.uuid}/{index}",
+                base_url=self.egest_url,
+                raw_response=True,
+                metric=METRIC_CHUNK_DOWNLOAD,
+            )
+            try:
+                return await loop.run_in_executor(
+                    None, decrypt_chunk, encrypted, file.key, file.version
+                )
+            except ValueError as err:
+                raise FilenApiError(
+                    f"Chunk {index} of Filen file {file.uuid} is corrupt"
+                ) from err
+
+        pending: deque[asyncio.Future[bytes]] = deque()
+        next_index = 0
+        try:
+            while pending or next_index < file.chunks:
+                while (
+                    next_index < file.chunks
+                    and len(pending) < FILE_TRANSFER_CONCURRENCY
+                ):
+                    pending.append(
+                        asyncio.ensure_future(_async_fetch_chunk(next_index))
+                    )
+                    next_index += 1
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def async_delete_file(self, file_uuid: str) -> None:
+        """Permanently delete a file."""
+        await self._ensure_authenticated()
+        await self._request(
+            "POST", "/v3/file/delete/permanent", json={"uuid": file_uuid}
+        )
+        self.invalidate_cache()
+
+    async def _async_get_optional_account(
+        self, *, force_refresh: bool = False
+    ) -> dict[str, Any]:
+        """Return /v3/user/account details, or an empty dict if they fail."""
+        # /v3/user/account contains richer account fields but is not essential for
+        # storage sensors. If it fails, fall back to the last cached details and
+        # still expose /v3/user/info values.
+        try:
+            return await self._async_get_cached(
+                "/v3/user/account",
+                ACCOUNT_DETAILS_TTL.total_seconds(),
+                force_refresh=force_refresh,
+            )
+        except FilenApiError as err:
+            _LOGGER.debug("Could not fetch Filen account details: %s", err)
+            cached = self._response_cache.get("/v3/user/account")
+            return cached[1] if cached is not None else {}
+
+    async def _async_get_cached(
+        self, endpoint: str, ttl: float, *, force_refresh: bool = False
+    ) -> Any:
+        """GET an endpoint, reusing the cached payload while it is younger than ttl."""
+        cached = self._response_cache.get(endpoint)
+        now = time.monotonic()
+        if not force_refresh and cached is not None and now - cached[0] < ttl:
+            return cached[1]
+
+        payload = await self._request("GET", endpoint)
+        self._response_cache[endpoint] = (now, payload)
+        return payload
+
+    def invalidate_cache(self, endpoint: str | None = None) -> None:
+        """Expire cached responses for one endpoint, or all endpoints.
+
+        The payloads are kept as the fallback for a failed refetch.
+        """
+        for key in list(self._response_cache) if endpoint is None else [endpoint]:
+            if (cached := self._response_cache.get(key)) is not None:
+                self._response_cache[key] = (float("-inf"), cached[1])
+
     async def _ensure_authenticated(self) -> None:
         """Authenticate if there is no API key yet."""
         if not self.api_key:
@@ -132,8 +1267,192 @@ class FilenClient:
         *,
         json: dict[str, Any] | None = None,
         authenticated: bool = True,
+        **kwargs: Any,
     ) -> Any:
-        """Call the Filen API and unwrap the common response envelope."""
+        """Call the Filen API, sharing identical in-flight GET requests."""
+        if method != "GET" or kwargs:
+            return await self._request_with_relogin(
+                method, endpoint, json=json, authenticated=authenticated, **kwargs
+            )
+
+        inflight = self._inflight.get(endpoint)
+        if inflight is not None:
+            self.coalesced_count += 1
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(
+            self._request_with_relogin(
+                method, endpoint, json=json, authenticated=authenticated
+            )
+        )
+        self._inflight[endpoint] = task
+        task.add_done_callback(partial(self._finish_inflight, endpoint))
+        return await asyncio.shield(task)
+
+    def _finish_inflight(self, endpoint: str, task: asyncio.Future[Any]) -> None:
+        """Forget a finished shared request and mark its exception as retrieved."""
+        if self._inflight.get(endpoint) is task:
+            del self._inflight[endpoint]
+        if not task.cancelled():
+            task.exception()
+
+    async def _request_with_relogin(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        json: dict[str, Any] | None = None,
+        authenticated: bool = True,
+        **kwargs: Any,
+    ) -> Any:
+        """Call the Filen API, logging in again once if the API key was rejected."""
+        used_api_key = self.api_key
+        try:
+            return await self._request_with_retry(
+                method, endpoint, json=json, authenticated=authenticated, **kwargs
+            )
+        except FilenApiKeyError:
+            if not authenticated:
+                raise
+            _LOGGER.debug("Filen rejected the API key for %s %s", method, endpoint)
+            await self._async_relogin(used_api_key)
+
+        return await self._request_with_retry(
+            method, endpoint, json=json, authenticated=authenticated, **kwargs
+        )
+
+    async def _async_relogin(self, rejected_api_key: str | None) -> None:
+        """Replace a rejected API key, sharing one login between callers."""
+        async with self._auth_lock:
+            if self.api_key != rejected_api_key:
+                # Another caller already logged in while we waited for the lock.
+                return
+            await self._async_login()
+            self.relogin_count += 1
+
+        _LOGGER.info("Logged in to Filen again after the API key was rejected")
+
+    async def _request_with_retry(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        json: dict[str, Any] | None = None,
+        authenticated: bool = True,
+        idempotent: bool | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Call the Filen API, retrying transient failures with backoff.
+
+        Only idempotent requests are retried: GET requests by default, and
+        POST requests whose callers pass ``idempotent=True`` because sending
+        them twice has the same effect as sending them once. File server
+        requests (``base_url`` set) do not count toward the gateway's circuit
+        breaker.
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+        breaker = self.circuit_breaker if kwargs.get("base_url") is None else None
+        if breaker is not None:
+            breaker.check()
+
+        attempt = 0
+        while True:
+            try:
+                result = await self._request_once(
+                    method, endpoint, json=json, authenticated=authenticated, **kwargs
+                )
+            except FilenTransientError as err:
+                if breaker is not None:
+                    breaker.record_failure()
+                delay = self._retry_delay(attempt, err.retry_after)
+                if (
+                    not idempotent
+                    or attempt >= REQUEST_RETRIES
+                    or delay is None
+                    or (breaker is not None and breaker.state == "open")
+                ):
+                    raise
+                attempt += 1
+                self.retry_count += 1
+                _LOGGER.debug(
+                    "Retrying %s %s in %.1f seconds (attempt %s of %s): %s",
+                    method,
+                    endpoint,
+                    delay,
+                    attempt,
+                    REQUEST_RETRIES,
+                    err,
+                )
+                await asyncio.sleep(delay)
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: float | None) -> float | None:
+        """Return the jittered backoff delay, or None if retrying is pointless."""
+        if retry_after is not None:
+            # Honor the server's requested delay unless it exceeds what a
+            # single refresh can reasonably wait for.
+            return retry_after if retry_after <= RETRY_BACKOFF_MAX else None
+        backoff = min(RETRY_BACKOFF_BASE * 2**attempt, RETRY_BACKOFF_MAX)
+        return random.uniform(backoff / 2, backoff)
+
+    async def _request_once(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        json: dict[str, Any] | None = None,
+        authenticated: bool = True,
+        metric: str | None = None,
+        priority: int | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Call the Filen API once and record its latency and outcome.
+
+        Latency is recorded under ``metric``, or the endpoint if it is not set.
+        Time spent waiting for the rate limiter is not included. ``priority``
+        overrides the client's priority for this request.
+        """
+        if self.rate_limiter is not None and kwargs.get("base_url") is None:
+            await self.rate_limiter.async_acquire(
+                self.priority if priority is None else priority
+            )
+
+        started = time.perf_counter()
+        success = False
+        try:
+            result = await self._send_request(
+                method, endpoint, json=json, authenticated=authenticated, **kwargs
+            )
+            success = True
+            return result
+        finally:
+            self.metrics.record(
+                metric or endpoint, (time.perf_counter() - started) * 1000, success
+            )
+
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        json: dict[str, Any] | None = None,
+        authenticated: bool = True,
+        data: bytes | None = None,
+        params: dict[str, str] | None = None,
+        base_url: str | None = None,
+        raw_response: bool = False,
+    ) -> Any:
+        """Call the Filen API once and unwrap the common response envelope.
+
+        ``data`` sends a raw body instead of JSON, ``base_url`` targets the
+        file servers instead of the gateway and ``raw_response`` returns the
+        response body as bytes.
+        """
         headers = {
             "Accept": "application/json, text/plain, */*",
             "User-Agent": "ha-filen",
@@ -144,40 +1463,62 @@ class FilenClient:
         else:
             headers["Authorization"] = "Bearer anonymous"
 
-        url = f"{API_BASE_URL}{endpoint}"
+        url = f"{base_url or self.base_url}{endpoint}"
         request_kwargs: dict[str, Any] = {}
-        if json is not None:
-            body = json_lib.dumps(json, separators=(",", ":"))
+        if params is not None:
+            request_kwargs["params"] = params
+        if data is not None:
+            headers["Content-Type"] = "application/octet-stream"
+            request_kwargs["data"] = data
+        elif json is not None:
+            request_body = json_lib.dumps(json, separators=(",", ":"))
             headers["Content-Type"] = "application/json"
-            headers["Checksum"] = hashlib.sha512(body.encode("utf-8")).hexdigest()
-            request_kwargs["data"] = body
+            headers["Checksum"] = hashlib.sha512(
+                request_body.encode("utf-8")
+            ).hexdigest()
+            request_kwargs["data"] = request_body
 
         try:
             async with self.session.request(
                 method,
                 url,
                 headers=headers,
-                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                timeout=_CLIENT_TIMEOUT,
                 **request_kwargs,
             ) as response:
-                text = await response.text()
+                body = await response.read()
                 if response.status != 200:
-                    raise FilenApiError(
-                        f"{method} {endpoint} failed with HTTP {response.status}: {text}"
+                    message = (
+                        f"{method} {endpoint} failed with HTTP {response.status}: "
+                        f"{_error_body(body)}"
                     )
-                try:
-                    payload = await response.json()
-                except aiohttp.ContentTypeError as err:
-                    raise FilenApiError(
-                        f"{method} {endpoint} returned non-JSON response: {text}"
-                    ) from err
+                    if authenticated and response.status == 401:
+                        raise FilenApiKeyError(message)
+                    if response.status == 429 or response.status >= 500:
+                        raise FilenTransientError(
+                            message,
+                            _parse_retry_after(response.headers.get("Retry-After")),
+                        )
+                    raise FilenApiError(message)
         except TimeoutError as err:
-            raise FilenApiError(f"{method} {endpoint} timed out") from err
+            raise FilenTransientError(f"{method} {endpoint} timed out") from err
         except aiohttp.ClientError as err:
-            raise FilenApiError(f"{method} {endpoint} failed: {err}") from err
+            raise FilenTransientError(f"{method} {endpoint} failed: {err}") from err
+
+        if raw_response:
+            return body
+
+        try:
+            payload = _json_loads(body)
+        except ValueError as err:
+            raise FilenApiError(
+                f"{method} {endpoint} returned non-JSON response: {_error_body(body)}"
+            ) from err
 
         if isinstance(payload, dict) and payload.get("status") is False:
             message = payload.get("message") or payload.get("code") or "Unknown error"
+            if authenticated and payload.get("code") in _API_KEY_ERROR_CODES:
+                raise FilenApiKeyError(str(message))
             error_cls = FilenAuthError if endpoint in {"/v3/auth/info", "/v3/login"} else FilenApiError
             raise error_cls(str(message))
 
@@ -190,9 +1531,45 @@ class FilenClient:
         if not self.api_key:
             raise FilenAuthError("Filen API key is not available; authenticate first")
 
+    async def _async_derive_credentials(
+        self, raw_password: str, salt: str, auth_version: int
+    ) -> tuple[str, str]:
+        """Derive the master key and login password in an executor.
+
+        Results are cached, so a later master key lookup after a login does not
+        derive again.
+        """
+        cached = self.credential_cache.get(
+            self.email, salt, auth_version, raw_password
+        )
+        if cached is not None:
+            _LOGGER.debug("Reusing cached Filen password derivation")
+            return cached
+
+        started = time.perf_counter()
+        success = False
+        try:
+            credentials = await asyncio.get_running_loop().run_in_executor(
+                None, self._derive_credentials, raw_password, salt, auth_version
+            )
+            success = True
+        finally:
+            self.metrics.record(
+                METRIC_PASSWORD_DERIVATION,
+                (time.perf_counter() - started) * 1000,
+                success,
+            )
+
+        self.credential_cache.set(
+            self.email, salt, auth_version, raw_password, credentials
+        )
+        return credentials
+
     @staticmethod
-    def _derive_password(raw_password: str, salt: str, auth_version: int) -> str:
-        """Derive the login password according to the Filen SDK auth version."""
+    def _derive_credentials(
+        raw_password: str, salt: str, auth_version: int
+    ) -> tuple[str, str]:
+        """Derive (master key, login password) per the Filen SDK auth version."""
         if auth_version == 2:
             derived_key = hashlib.pbkdf2_hmac(
                 "sha512",
@@ -201,10 +1578,18 @@ class FilenClient:
                 200_000,
                 dklen=64,
             ).hex()
+            master_key = derived_key[: len(derived_key) // 2]
             derived_password = derived_key[len(derived_key) // 2 :]
-            return hashlib.sha512(derived_password.encode("utf-8")).hexdigest()
+            return (
+                master_key,
+                hashlib.sha512(derived_password.encode("utf-8")).hexdigest(),
+            )
 
         if auth_version == 3:
+            # Imported lazily: a stored API key means most startups never derive
+            # a password, so they should not pay for loading the cffi extension.
+            from argon2.low_level import Type, hash_secret_raw  # noqa: PLC0415
+
             derived = hash_secret_raw(
                 raw_password.encode("utf-8"),
                 bytes.fromhex(salt),
@@ -215,7 +1600,7 @@ class FilenClient:
                 type=Type.ID,
                 version=0x13,
             ).hex()
-            return derived[len(derived) // 2 :]
+            return derived[: len(derived) // 2], derived[len(derived) // 2 :]
 
         raise FilenAuthError(f"Unsupported Filen auth version: {auth_version}")
 
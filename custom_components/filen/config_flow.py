@@ -8,12 +8,25 @@ from typing import Any
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
 
-from .client import FilenApiError, FilenAuthError, FilenClient
-from .const import CONF_API_KEY, CONF_TWO_FACTOR_CODE, DOMAIN
+from . import async_create_client
+from .client import FilenApiError, FilenAuthError
+from .const import (
+    CONF_ACTIVITY_FEED,
+    CONF_API_KEY,
+    CONF_DRIVE_INDEX,
+    CONF_FOLDER_UUIDS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_REALTIME,
+    CONF_TRASH_SENSORS,
+    CONF_TWO_FACTOR_CODE,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,16 +41,16 @@ DATA_SCHEMA = vol.Schema(
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, str]:
     """Validate the user input allows us to connect to Filen."""
-    client = FilenClient(
-        session=async_get_clientsession(hass),
-        email=data[CONF_EMAIL],
-        password=data[CONF_PASSWORD],
+    client = async_create_client(
+        hass,
+        data[CONF_EMAIL],
+        data[CONF_PASSWORD],
         two_factor_code=data.get(CONF_TWO_FACTOR_CODE),
     )
     await client.authenticate()
     account_data = await client.async_get_account_data()
 
-    email = account_data.get("email") or data[CONF_EMAIL]
+    email = account_data.email or data[CONF_EMAIL]
     if not client.api_key:
         raise FilenAuthError("Filen login response did not contain an API key")
 
@@ -48,6 +61,11 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     }
 
 
+def _parse_folder_uuids(value: str) -> list[str]:
+    """Split a comma or whitespace separated list of folder UUIDs."""
+    return list(dict.fromkeys(part for part in value.replace(",", " ").split()))
+
+
 def _entry_data_from_input(
     user_input: dict[str, Any], info: dict[str, str]
 ) -> dict[str, str]:
@@ -68,6 +86,14 @@ class FilenConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self._reauth_entry: config_entries.ConfigEntry | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> FilenOptionsFlow:
+        """Return the options flow handler."""
+        return FilenOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
@@ -77,13 +103,6 @@ class FilenConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             try:
                 info = await validate_input(self.hass, user_input)
-                await self.async_set_unique_id(info["email"].lower())
-                self._abort_if_unique_id_configured()
-
-                return self.async_create_entry(
-                    title=info["title"],
-                    data=_entry_data_from_input(user_input, info),
-                )
             except FilenAuthError:
                 errors["base"] = "invalid_auth"
             except FilenApiError:
@@ -91,6 +110,14 @@ class FilenConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except Exception:  # noqa: BLE001 - config flows should show unknown for unexpected errors
                 _LOGGER.exception("Unexpected exception while configuring Filen")
                 errors["base"] = "unknown"
+            else:
+                await self.async_set_unique_id(info["email"].lower())
+                self._abort_if_unique_id_configured()
+
+                return self.async_create_entry(
+                    title=info["title"],
+                    data=_entry_data_from_input(user_input, info),
+                )
 
         return self.async_show_form(
             step_id="user",
@@ -154,3 +181,70 @@ class FilenConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors=errors,
         )
+
+
+class FilenOptionsFlow(config_entries.OptionsFlow):
+    """Handle Filen options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Configure polling, realtime updates and optional sensors."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            if (
+                user_input[CONF_MIN_UPDATE_INTERVAL]
+                > user_input[CONF_MAX_UPDATE_INTERVAL]
+            ):
+                errors["base"] = "invalid_interval_bounds"
+            else:
+                return self.async_create_entry(
+                    data={
+                        **user_input,
+                        CONF_FOLDER_UUIDS: _parse_folder_uuids(
+                            user_input.get(CONF_FOLDER_UUIDS, "")
+                        ),
+                    }
+                )
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_MIN_UPDATE_INTERVAL,
+                        default=options.get(
+                            CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Required(
+                        CONF_MAX_UPDATE_INTERVAL,
+                        default=options.get(
+                            CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_REALTIME, default=options.get(CONF_REALTIME, False)
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_ACTIVITY_FEED,
+                        default=options.get(CONF_ACTIVITY_FEED, False),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_TRASH_SENSORS,
+                        default=options.get(CONF_TRASH_SENSORS, False),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_DRIVE_INDEX,
+                        default=options.get(CONF_DRIVE_INDEX, False),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_FOLDER_UUIDS,
+                        default=", ".join(options.get(CONF_FOLDER_UUIDS, [])),
+                    ): cv.string,
+                }
+            ),
+            errors=errors,
+        )
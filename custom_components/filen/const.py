@@ -8,16 +8,131 @@ DOMAIN = "filen"
 
 CONF_TWO_FACTOR_CODE = "two_factor_code"
 CONF_API_KEY = "api_key"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_FOLDER_UUIDS = "folder_uuids"
+CONF_REALTIME = "realtime"
+CONF_ACTIVITY_FEED = "activity_feed"
+CONF_TRASH_SENSORS = "trash_sensors"
+CONF_DRIVE_INDEX = "drive_index"
 
 API_BASE_URL = "https://gateway.filen.io"
+REALTIME_SOCKET_URL = "wss://socket.filen.io"
+FILE_INGEST_URL = "https://ingest.filen.io"
+FILE_EGEST_URL = "https://egest.filen.io"
 REQUEST_TIMEOUT = 30
+CONNECTION_LIMIT_PER_HOST = 8
+CONNECTION_KEEPALIVE_TIMEOUT = 75
+DNS_CACHE_TTL = 300
+REQUEST_RETRIES = 3
+RETRY_BACKOFF_BASE = 1.0
+RETRY_BACKOFF_MAX = 10.0
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_RESET = timedelta(minutes=5)
 UPDATE_INTERVAL = timedelta(minutes=30)
+STARTUP_REFRESH_WINDOW = timedelta(minutes=2)
+GATEWAY_REQUESTS_PER_SECOND = 4.0
+GATEWAY_REQUEST_BURST = 8
+REQUEST_PRIORITY_HIGH = 0
+REQUEST_PRIORITY_NORMAL = 1
+REQUEST_PRIORITY_LOW = 2
+DEFAULT_MIN_UPDATE_INTERVAL = 5  # minutes
+DEFAULT_MAX_UPDATE_INTERVAL = 360  # minutes
+NEAR_QUOTA_PERCENTAGE = 90
+# Growing accounts are polled at least this often before they would be full.
+POLLS_BEFORE_FULL = 10
+REALTIME_REFRESH_DELAY = 5  # seconds
+REALTIME_RECONNECT_MIN = 5.0
+REALTIME_RECONNECT_MAX = 300.0
+# An authenticated socket session this long resets the reconnect backoff.
+REALTIME_STABLE_SESSION = 60.0  # seconds
+STORAGE_GROWTH_SAMPLES = 168
+STORAGE_GROWTH_SAMPLE_INTERVAL = timedelta(hours=1)
+ACTIVITY_UPDATE_INTERVAL = timedelta(minutes=15)
+USER_EVENTS_MAX_PAGES = 10
+TRASH_UPDATE_INTERVAL = timedelta(hours=1)
+TRASH_USAGE_TTL = timedelta(minutes=55)
+FOLDER_SCAN_CONCURRENCY = 4
+FOLDER_SIZE_TTL = timedelta(hours=6)
+ACCOUNT_DETAILS_TTL = timedelta(hours=24)
+FILE_TRANSFER_CONCURRENCY = 4
+INDEX_UPDATE_INTERVAL = timedelta(minutes=15)
+INDEX_FULL_SYNC_INTERVAL = timedelta(hours=24)
+INDEX_SCAN_CONCURRENCY = 4
+INDEX_WRITE_BATCH = 50  # folder listings per transaction
+INDEX_TOP_FILES = 10
+# Account event types that change the folder tree or the files in it.
+INDEX_CHANGE_EVENTS = frozenset(
+    {
+        "baseFolderCreated",
+        "deleteAll",
+        "fileMoved",
+        "fileRenamed",
+        "fileRestored",
+        "fileRm",
+        "fileTrash",
+        "fileUploaded",
+        "fileVersioned",
+        "folderMoved",
+        "folderRenamed",
+        "folderRestored",
+        "folderTrash",
+        "subFolderCreated",
+        "versionedFileRestored",
+    }
+)
+# Events that add a folder; the new folder is found by listing its parent.
+INDEX_FOLDER_CREATED_EVENTS = frozenset({"baseFolderCreated", "subFolderCreated"})
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 200
+BACKUP_FOLDER_NAME = "Home Assistant Backups"
+
+SERVICE_EMPTY_TRASH = "empty_trash"
+SERVICE_DOWNLOAD_FILE = "download_file"
+SERVICE_SEARCH = "search"
+SERVICE_REFRESH = "refresh"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_DIRECTORY = "directory"
+ATTR_FILE_UUID = "file_uuid"
+ATTR_FILENAME = "filename"
+ATTR_OVERWRITE = "overwrite"
+ATTR_QUERY = "query"
+ATTR_LIMIT = "limit"
+ATTR_STORAGE = "storage"
+ATTR_ACCOUNT_DETAILS = "account_details"
+REFRESH_MODE_CACHED = "cached"
+REFRESH_MODE_FRESH = "fresh"
+REFRESH_DEBOUNCE = 1.0  # seconds
+REFRESH_MIN_INTERVAL = timedelta(seconds=15)
+DOWNLOAD_PROGRESS_INTERVAL = 2  # seconds
+
+METRIC_PASSWORD_DERIVATION = "password_derivation"
+METRIC_CHUNK_DOWNLOAD = "chunk_download"
+
+STORAGE_VERSION = 1
+STORAGE_KEY_SNAPSHOT = f"{DOMAIN}.snapshot"
+STORAGE_KEY_GROWTH = f"{DOMAIN}.growth"
+STORAGE_KEY_ACTIVITY = f"{DOMAIN}.activity"
+STORAGE_KEY_INDEX = f"{DOMAIN}.index"
+STORAGE_SAVE_DELAY = 60
+
+EVENT_ACTIVITY = f"{DOMAIN}_activity"
+EVENT_DOWNLOAD_PROGRESS = f"{DOMAIN}_download_progress"
+SIGNAL_FORECAST_UPDATED = f"{DOMAIN}_forecast_updated_{{}}"
 
 ATTR_ACCOUNT_ID = "account_id"
 ATTR_AVATAR_URL = "avatar_url"
 ATTR_BASE_FOLDER_UUID = "base_folder_uuid"
 ATTR_DISPLAY_NAME = "display_name"
 ATTR_EMAIL = "email"
+ATTR_EVENT_ID = "event_id"
+ATTR_EVENT_TYPE = "event_type"
+ATTR_FILES = "files"
+ATTR_FOLDER_UUID = "folder_uuid"
+ATTR_FOLDERS = "folders"
 ATTR_IS_PREMIUM = "is_premium"
+ATTR_MISSED_EVENTS = "missed_events"
 ATTR_NICK_NAME = "nick_name"
+ATTR_NEW_EVENTS = "new_events"
 ATTR_PLAN_NAMES = "plan_names"
+ATTR_TOP_FILES = "top_files"
@@ -0,0 +1,811 @@
+"""Data update coordinator for the Filen integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+import json
+import logging
+import time
+from typing import Any, TypeVar
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .client import (
+    FilenAccountData,
+    FilenApiError,
+    FilenAuthError,
+    FilenClient,
+    FilenEventsOverflowError,
+    FilenFolderListing,
+    FilenFolderSize,
+    FilenTrashUsage,
+    FilenUserEvent,
+)
+from .const import (
+    ACTIVITY_UPDATE_INTERVAL,
+    ATTR_ACCOUNT_ID,
+    ATTR_AVATAR_URL,
+    ATTR_BASE_FOLDER_UUID,
+    ATTR_DISPLAY_NAME,
+    ATTR_EMAIL,
+    ATTR_EVENT_ID,
+    ATTR_EVENT_TYPE,
+    ATTR_IS_PREMIUM,
+    ATTR_NICK_NAME,
+    ATTR_PLAN_NAMES,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DOMAIN,
+    EVENT_ACTIVITY,
+    FOLDER_SIZE_TTL,
+    INDEX_CHANGE_EVENTS,
+    INDEX_FOLDER_CREATED_EVENTS,
+    INDEX_FULL_SYNC_INTERVAL,
+    INDEX_SCAN_CONCURRENCY,
+    INDEX_TOP_FILES,
+    INDEX_UPDATE_INTERVAL,
+    INDEX_WRITE_BATCH,
+    NEAR_QUOTA_PERCENTAGE,
+    POLLS_BEFORE_FULL,
+    REALTIME_REFRESH_DELAY,
+    REFRESH_DEBOUNCE,
+    REFRESH_MIN_INTERVAL,
+    REQUEST_PRIORITY_HIGH,
+    REQUEST_PRIORITY_LOW,
+    REQUEST_PRIORITY_NORMAL,
+    SIGNAL_FORECAST_UPDATED,
+    STARTUP_REFRESH_WINDOW,
+    STORAGE_GROWTH_SAMPLE_INTERVAL,
+    STORAGE_GROWTH_SAMPLES,
+    STORAGE_KEY_ACTIVITY,
+    STORAGE_KEY_GROWTH,
+    STORAGE_KEY_INDEX,
+    STORAGE_KEY_SNAPSHOT,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    TRASH_UPDATE_INTERVAL,
+    UPDATE_INTERVAL,
+)
+from .forecast import StorageForecast, StorageGrowthTracker
+from .index import FilenDriveIndex, FilenIndexSummary, IndexedFile
+from .realtime import FilenRealtimeListener
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class FilenRuntimeData:
+    """Runtime objects of one Filen config entry."""
+
+    client: FilenClient
+    coordinator: FilenDataUpdateCoordinator
+    folder_coordinator: FilenFolderSizeCoordinator | None = None
+    activity_coordinator: FilenActivityCoordinator | None = None
+    trash_coordinator: FilenTrashCoordinator | None = None
+    index_coordinator: FilenIndexCoordinator | None = None
+    realtime_listener: FilenRealtimeListener | None = None
+
+
+FilenConfigEntry = ConfigEntry[FilenRuntimeData]
+
+
+class FilenDataUpdateCoordinator(DataUpdateCoordinator[FilenAccountData]):
+    """Fetch and cache Filen account data."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, client: FilenClient
+    ) -> None:
+        """Initialize the data coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=UPDATE_INTERVAL,
+            # FilenAccountData compares by value, so identical refreshes do not
+            # notify entities at all.
+            always_update=False,
+        )
+        self.client = client
+        self.entry = entry
+        self.update_interval = self._poll_interval = self._clamp_interval(
+            UPDATE_INTERVAL
+        )
+        self.stagger = _stagger_fraction(hass, entry)
+        self._stagger_pending = True
+        self._on_demand: asyncio.Future[FilenAccountData] | None = None
+        self._on_demand_force = False
+        self._last_on_demand: float | None = None
+        self._last_sample: tuple[float, int] | None = None
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_SNAPSHOT}.{entry.entry_id}"
+        )
+        self._attributes: dict[str, Any] = {}
+        self._attributes_source: FilenAccountData | None = None
+        self.growth = StorageGrowthTracker(STORAGE_GROWTH_SAMPLES)
+        self.forecast = StorageForecast(growth_per_day=None, days_until_full=None)
+        self.forecast_signal = SIGNAL_FORECAST_UPDATED.format(entry.entry_id)
+        self._growth_store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_GROWTH}.{entry.entry_id}"
+        )
+        self.realtime_connected = False
+        self._realtime_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=REALTIME_REFRESH_DELAY,
+            immediate=False,
+            function=self.async_refresh,
+        )
+        entry.async_on_unload(self._realtime_debouncer.async_cancel)
+
+    @callback
+    def async_schedule_staggered_refresh(self) -> None:
+        """Refresh after this account's share of STARTUP_REFRESH_WINDOW."""
+        delay = STARTUP_REFRESH_WINDOW * self.stagger
+        _LOGGER.debug("Refreshing Filen account %s in %s", self.client.email, delay)
+        self.entry.async_on_unload(
+            async_call_later(self.hass, delay, self._async_staggered_refresh)
+        )
+
+    async def _async_staggered_refresh(self, _now: Any) -> None:
+        """Run the delayed startup refresh."""
+        await self.async_refresh()
+
+    @callback
+    def async_handle_realtime_event(self, event: str) -> None:
+        """Schedule a debounced refresh after a realtime file or folder event."""
+        _LOGGER.debug("Filen realtime event %s for %s", event, self.client.email)
+        self.entry.async_create_background_task(
+            self.hass,
+            self._realtime_debouncer.async_call(),
+            f"{DOMAIN}_realtime_refresh",
+        )
+
+    @callback
+    def async_handle_realtime_connection(self, connected: bool) -> None:
+        """Switch between realtime updates and regular polling."""
+        self.realtime_connected = connected
+        if connected:
+            # Events drive refreshes; polling is only a rare safety net.
+            self.update_interval = self._max_interval
+            _LOGGER.debug("Filen realtime updates active for %s", self.client.email)
+            return
+
+        _LOGGER.debug(
+            "Filen realtime updates lost for %s; falling back to polling",
+            self.client.email,
+        )
+        self.update_interval = self._poll_interval = self._clamp_interval(
+            UPDATE_INTERVAL
+        )
+        # Catch up on events missed while disconnected; this also reschedules
+        # polling with the shorter interval.
+        self.async_handle_realtime_event("disconnect")
+
+    @property
+    def account_attributes(self) -> dict[str, Any]:
+        """Return account attributes shared by all sensors of this account.
+
+        The dict is rebuilt only when a new snapshot arrives.
+        """
+        data = self.data
+        if data is not self._attributes_source:
+            self._attributes = _account_attributes(data) if data else {}
+            self._attributes_source = data
+        return self._attributes
+
+    async def async_restore_snapshot(self) -> bool:
+        """Populate the coordinator from the last stored snapshot, if any.
+
+        Stored storage growth samples are restored as well.
+        """
+        if growth := await self._growth_store.async_load():
+            self.growth.restore(growth)
+
+        snapshot = await self._store.async_load()
+        if not snapshot:
+            return False
+
+        _LOGGER.debug("Restored Filen account snapshot for %s", self.client.email)
+        data = FilenAccountData.from_dict(snapshot)
+        self.forecast = self.growth.forecast(data.storage_used, data.storage_total)
+        self.async_set_updated_data(data)
+        return True
+
+    async def async_refresh_on_demand(
+        self, *, force_account_details: bool = False
+    ) -> FilenAccountData:
+        """Fetch fresh account data for a caller, coalescing bursts of calls.
+
+        Calls within REFRESH_DEBOUNCE of the first one share a single fetch,
+        which forces fresh account details if any caller asked for them. Each
+        account fetches on demand at most once per REFRESH_MIN_INTERVAL; calls
+        inside that window wait for the next allowed fetch and share it.
+        """
+        if self._on_demand is None:
+            delay = REFRESH_DEBOUNCE
+            if self._last_on_demand is not None:
+                delay = max(
+                    delay,
+                    self._last_on_demand
+                    + REFRESH_MIN_INTERVAL.total_seconds()
+                    - time.monotonic(),
+                )
+            self._on_demand = self.hass.loop.create_future()
+            self._on_demand_force = False
+            self.entry.async_create_background_task(
+                self.hass,
+                self._async_run_on_demand(delay),
+                f"{DOMAIN}_on_demand_refresh",
+            )
+        self._on_demand_force |= force_account_details
+        return await asyncio.shield(self._on_demand)
+
+    async def _async_run_on_demand(self, delay: float) -> None:
+        """Run one coalesced on-demand fetch after the debounce delay."""
+        future = self._on_demand
+        if future is None:
+            return
+        try:
+            await asyncio.sleep(delay)
+            self._on_demand = None
+            self._last_on_demand = time.monotonic()
+            data = await self._async_fetch(
+                force_account_details=self._on_demand_force, on_demand=True
+            )
+        except Exception as err:  # noqa: BLE001 - handed to the waiting callers
+            future.set_exception(err)
+            # Callers may have been cancelled; do not warn about the exception.
+            future.exception()
+        else:
+            # Also resets the poll timer, so the next poll does not repeat
+            # this fetch.
+            self.async_set_updated_data(data)
+            future.set_result(data)
+        finally:
+            if self._on_demand is future:
+                self._on_demand = None
+            if not future.done():
+                # The entry is unloading; release the waiting callers.
+                future.cancel()
+
+    async def _async_update_data(self) -> FilenAccountData:
+        """Fetch account/storage data from Filen."""
+        return await self._async_fetch()
+
+    async def _async_fetch(
+        self, *, force_account_details: bool = False, on_demand: bool = False
+    ) -> FilenAccountData:
+        """Fetch account/storage data and update the interval and forecast.
+
+        On-demand fetches leave the poll interval and the pending stagger
+        alone: they run whenever a caller asks, so the time since the last
+        poll says nothing about how fast usage changes.
+        """
+        try:
+            data = await self.client.async_get_account_data(
+                force_refresh=force_account_details
+            )
+        except FilenAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except FilenApiError as err:
+            raise UpdateFailed(f"Error communicating with Filen: {err}") from err
+
+        self.client.priority = (
+            REQUEST_PRIORITY_HIGH
+            if data.storage_percentage >= NEAR_QUOTA_PERCENTAGE
+            else REQUEST_PRIORITY_NORMAL
+        )
+        if not on_demand:
+            self._adjust_update_interval(data)
+            if self._stagger_pending and self.update_interval is not None:
+                # Delay the second poll once by this account's share of the
+                # interval, so accounts that refreshed together at setup poll
+                # at evenly spread phases afterwards.
+                self._stagger_pending = False
+                self.update_interval += self.update_interval * self.stagger
+        self._update_forecast(data)
+        if data != self.data:
+            self._store.async_delay_save(data.as_dict, STORAGE_SAVE_DELAY)
+        return data
+
+    def _update_forecast(self, data: FilenAccountData) -> None:
+        """Sample storage usage and notify forecast sensors if the forecast moved.
+
+        At most one sample is kept per STORAGE_GROWTH_SAMPLE_INTERVAL so the
+        fixed-size window covers a predictable time span whatever the poll
+        interval is.
+        """
+        now = time.time()
+        last_sample = self.growth.last_timestamp
+        if (
+            last_sample is None
+            or now - last_sample >= STORAGE_GROWTH_SAMPLE_INTERVAL.total_seconds()
+        ):
+            self.growth.add(now, data.storage_used)
+            self._growth_store.async_delay_save(self.growth.as_dict, STORAGE_SAVE_DELAY)
+
+        forecast = self.growth.forecast(data.storage_used, data.storage_total)
+        if forecast != self.forecast:
+            self.forecast = forecast
+            async_dispatcher_send(self.hass, self.forecast_signal)
+
+    def _adjust_update_interval(self, data: FilenAccountData) -> None:
+        """Adapt the poll interval to how quickly storage usage is changing.
+
+        Halve the interval while usage is moving and double it while usage is
+        idle. While usage grows, the interval is also capped so the account is
+        polled POLLS_BEFORE_FULL times before it would be full at the current
+        rate. The interval always stays within the bounds configured in the
+        options flow. While realtime updates are connected the maximum
+        interval is kept instead.
+        """
+        now = time.monotonic()
+        previous = self._last_sample
+        self._last_sample = (now, data.storage_used)
+        if previous is None or self.update_interval is None or self.realtime_connected:
+            return
+
+        # The staggered first interval is not a base for adaptation.
+        current = self._poll_interval
+        elapsed = max(now - previous[0], 1.0)
+        rate = (data.storage_used - previous[1]) / elapsed
+        if rate > 0:
+            reason = "usage growing"
+            time_to_full = timedelta(
+                seconds=max(data.storage_total - data.storage_used, 0) / rate
+            )
+            interval = min(current / 2, time_to_full / POLLS_BEFORE_FULL)
+        elif rate < 0:
+            reason = "usage shrinking"
+            interval = current / 2
+        else:
+            reason = "usage idle"
+            interval = current * 2
+        interval = self._clamp_interval(interval)
+
+        _LOGGER.debug(
+            "Filen poll interval for %s: %s -> %s (%s, %.1f bytes/s, %.2f%% used)",
+            self.client.email,
+            current,
+            interval,
+            reason,
+            rate,
+            data.storage_percentage,
+        )
+        self.update_interval = self._poll_interval = interval
+
+    @property
+    def _min_interval(self) -> timedelta:
+        """Return the configured minimum poll interval."""
+        return timedelta(
+            minutes=self.entry.options.get(
+                CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+            )
+        )
+
+    @property
+    def _max_interval(self) -> timedelta:
+        """Return the configured maximum poll interval."""
+        return timedelta(
+            minutes=self.entry.options.get(
+                CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+            )
+        )
+
+    def _clamp_interval(self, interval: timedelta) -> timedelta:
+        """Keep an interval within the configured bounds."""
+        return max(self._min_interval, min(interval, self._max_interval))
+
+
+class FilenFolderSizeCoordinator(DataUpdateCoordinator[dict[str, FilenFolderSize]]):
+    """Fetch recursive sizes of the folders configured in the options flow.
+
+    Folders are rescanned when the account coordinator reports new data and
+    at least every FOLDER_SIZE_TTL; the client skips folders whose cached size
+    is still current.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        account_coordinator: FilenDataUpdateCoordinator,
+        folder_uuids: list[str],
+    ) -> None:
+        """Initialize the folder size coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_folders",
+            update_interval=FOLDER_SIZE_TTL,
+            always_update=False,
+        )
+        self.entry = entry
+        self.account_coordinator = account_coordinator
+        self.folder_uuids = folder_uuids
+        entry.async_on_unload(
+            account_coordinator.async_add_listener(self._handle_account_update)
+        )
+
+    @callback
+    def _handle_account_update(self) -> None:
+        """Rescan changed folders after the account data changed."""
+        self.entry.async_create_background_task(
+            self.hass, self.async_request_refresh(), f"{DOMAIN}_folder_refresh"
+        )
+
+    async def _async_update_data(self) -> dict[str, FilenFolderSize]:
+        """Fetch folder sizes from Filen."""
+        account = self.account_coordinator.data
+        try:
+            return await self.account_coordinator.client.async_get_folder_sizes(
+                self.folder_uuids,
+                storage_used=account.storage_used if account else 0,
+            )
+        except FilenAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except FilenApiError as err:
+            raise UpdateFailed(f"Error scanning Filen folders: {err}") from err
+
+
+@dataclass(frozen=True, slots=True)
+class FilenActivity:
+    """Latest account activity and how many events the last poll found.
+
+    ``missed_events`` is set when the poll found more new events than it
+    reads, so older ones were skipped.
+    """
+
+    last_event: FilenUserEvent | None
+    new_events: int
+    missed_events: bool = False
+
+
+class FilenActivityCoordinator(DataUpdateCoordinator[FilenActivity]):
+    """Ingest the Filen activity feed incrementally from a persisted cursor.
+
+    Each new event is fired on the event bus as ``filen_activity``, oldest
+    first. Filen pages newest first, so a poll buffers its pages, at most
+    USER_EVENTS_MAX_PAGES of them, before firing. Events older than those
+    pages are skipped and reported through ``missed_events``. The first poll
+    without a stored cursor only records the newest event, so existing history
+    is not replayed.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, client: FilenClient
+    ) -> None:
+        """Initialize the activity coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_activity",
+            update_interval=ACTIVITY_UPDATE_INTERVAL,
+            always_update=False,
+        )
+        self.entry = entry
+        self.client = client
+        self._cursor: tuple[int, int] | None = None
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_ACTIVITY}.{entry.entry_id}"
+        )
+
+    async def async_restore_cursor(self) -> None:
+        """Load the stored feed cursor."""
+        if stored := await self._store.async_load():
+            self._cursor = (stored["timestamp"], stored["id"])
+
+    async def _async_update_data(self) -> FilenActivity:
+        """Fetch and publish events newer than the cursor."""
+        replay = self._cursor is not None
+        newest: FilenUserEvent | None = None
+        new_events = 0
+        missed_events = False
+        pages: list[list[FilenUserEvent]] = []
+        try:
+            async for page in self.client.async_iter_user_events(after=self._cursor):
+                if newest is None:
+                    newest = page[0]
+                new_events += len(page)
+                if replay:
+                    pages.append(page)
+        except FilenEventsOverflowError as err:
+            _LOGGER.warning("Skipping older Filen activity: %s", err)
+            missed_events = True
+        except FilenAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except FilenApiError as err:
+            raise UpdateFailed(f"Error fetching Filen activity: {err}") from err
+
+        if newest is None:
+            last_event = self.data.last_event if self.data else None
+            return FilenActivity(last_event=last_event, new_events=0)
+
+        for page in reversed(pages):
+            for event in reversed(page):
+                self._fire_event(event)
+
+        self._cursor = newest.cursor
+        self._store.async_delay_save(
+            lambda: {"timestamp": newest.timestamp, "id": newest.id},
+            STORAGE_SAVE_DELAY,
+        )
+        return FilenActivity(
+            last_event=newest,
+            new_events=new_events if replay else 0,
+            missed_events=missed_events,
+        )
+
+    @callback
+    def _fire_event(self, event: FilenUserEvent) -> None:
+        """Publish one activity event on the Home Assistant event bus."""
+        self.hass.bus.async_fire(
+            EVENT_ACTIVITY,
+            {
+                "entry_id": self.entry.entry_id,
+                ATTR_EVENT_ID: event.id,
+                ATTR_EVENT_TYPE: event.type,
+                "timestamp": event.timestamp,
+            },
+        )
+
+
+class FilenTrashCoordinator(DataUpdateCoordinator[FilenTrashUsage]):
+    """Fetch trash item counts and size."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, client: FilenClient
+    ) -> None:
+        """Initialize the trash coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_trash",
+            update_interval=TRASH_UPDATE_INTERVAL,
+            always_update=False,
+        )
+        self.client = client
+
+    async def _async_update_data(self) -> FilenTrashUsage:
+        """Fetch trash usage from Filen."""
+        try:
+            return await self.client.async_get_trash_usage()
+        except FilenAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except FilenApiError as err:
+            raise UpdateFailed(f"Error fetching Filen trash: {err}") from err
+
+
+class FilenIndexCoordinator(DataUpdateCoordinator[FilenIndexSummary]):
+    """Keep a local SQLite index of the drive in sync and summarize it.
+
+    The first sync, and one every INDEX_FULL_SYNC_INTERVAL, walks the whole
+    tree from the drive root at low request priority. In between, only folders
+    named in account events newer than the stored cursor are listed again,
+    plus folders that newly appear below them. When an event names a folder
+    the index does not know, or events were missed, the sync walks the whole
+    tree instead. All index access runs in the executor, one job at a time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        account_coordinator: FilenDataUpdateCoordinator,
+    ) -> None:
+        """Initialize the index coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_index",
+            update_interval=INDEX_UPDATE_INTERVAL,
+            always_update=False,
+        )
+        self.entry = entry
+        self.account_coordinator = account_coordinator
+        self.client = account_coordinator.client
+        self.index = FilenDriveIndex(index_path(hass, entry.entry_id))
+        self._index_lock = asyncio.Lock()
+
+    async def async_open(self) -> None:
+        """Open the index and close it again when the entry unloads."""
+        await self._async_run(self.index.open)
+        self.entry.async_on_unload(self.async_close)
+
+    async def async_close(self) -> None:
+        """Close the index."""
+        await self._async_run(self.index.close)
+
+    async def async_search(self, query: str, limit: int) -> list[IndexedFile]:
+        """Return indexed files whose name contains the query."""
+        return await self._async_run(self.index.search, query, limit)
+
+    async def _async_run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking index call in the executor."""
+        async with self._index_lock:
+            return await self.hass.async_add_executor_job(func, *args)
+
+    async def _async_update_data(self) -> FilenIndexSummary:
+        """Sync the index with Filen and return its summary."""
+        account = self.account_coordinator.data
+        if account is None or not account.base_folder_uuid:
+            raise UpdateFailed("The Filen drive root folder is not known yet")
+        try:
+            await self._async_sync(account.base_folder_uuid)
+        except FilenAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except FilenApiError as err:
+            raise UpdateFailed(f"Error indexing the Filen drive: {err}") from err
+        return await self._async_run(self.index.summary, INDEX_TOP_FILES)
+
+    async def _async_sync(self, root_uuid: str) -> None:
+        """Run a full or incremental sync from the drive root."""
+        index = self.index
+        stored_cursor = await self._async_run(index.get_state, "cursor")
+        full_sync_at = await self._async_run(index.get_state, "full_sync_at")
+        generation = int(await self._async_run(index.get_state, "generation") or 0) + 1
+        cursor = tuple(json.loads(stored_cursor)) if stored_cursor else None
+
+        full = (
+            cursor is None
+            or full_sync_at is None
+            or await self._async_run(index.get_state, "root") != root_uuid
+            or time.time() - float(full_sync_at)
+            >= INDEX_FULL_SYNC_INTERVAL.total_seconds()
+        )
+        # Events are read before walking, so changes made during the walk are
+        # seen again by the next sync.
+        changed, created, complete, newest = await self._async_read_changes(
+            None if full else cursor
+        )
+        if not complete:
+            full = True
+
+        if not full:
+            known = await self._async_run(index.known_folders, changed)
+            # Folders created since the last sync are found by listing their
+            # parents. Any other unknown folder means the index is missing a
+            # part of the tree.
+            if changed - known - created - {root_uuid}:
+                full = True
+            start = [uuid for uuid in changed if uuid in known or uuid == root_uuid]
+        if full:
+            start = [root_uuid]
+
+        listed = await self._async_walk(start, generation, full=full)
+        state = {"generation": str(generation), "root": root_uuid}
+        if newest is not None:
+            state["cursor"] = json.dumps(newest)
+        if full:
+            await self._async_run(index.remove_stale, generation)
+            state["full_sync_at"] = str(time.time())
+        await self._async_run(index.set_state, state)
+        _LOGGER.debug(
+            "Listed %s Filen folders in a %s index sync",
+            listed,
+            "full" if full else "incremental",
+        )
+
+    async def _async_read_changes(
+        self, cursor: tuple[int, int] | None
+    ) -> tuple[set[str], set[str], bool, tuple[int, int] | None]:
+        """Return changed and created folders, completeness and the newest cursor.
+
+        Events without a parent folder make the changes incomplete. Without a
+        cursor only the newest event is needed, as the start of the next
+        incremental sync.
+        """
+        changed: set[str] = set()
+        created: set[str] = set()
+        complete = True
+        newest = cursor
+        try:
+            async for page in self.client.async_iter_user_events(after=cursor):
+                if newest is None or page[0].cursor > newest:
+                    newest = page[0].cursor
+                for event in page:
+                    if event.type not in INDEX_CHANGE_EVENTS:
+                        continue
+                    if event.parent is None:
+                        complete = False
+                        continue
+                    changed.add(event.parent)
+                    if not event.uuid:
+                        continue
+                    if event.type in INDEX_FOLDER_CREATED_EVENTS:
+                        created.add(event.uuid)
+                    elif event.type.startswith("folder"):
+                        changed.add(event.uuid)
+        except FilenEventsOverflowError:
+            # Older events were not read; some changes may be missing.
+            complete = False
+        return changed, created, complete, newest
+
+    async def _async_walk(
+        self, start: Iterable[str], generation: int, *, full: bool
+    ) -> int:
+        """List folders with bounded concurrency and write them in batches.
+
+        A full walk descends into every subfolder at low request priority; an
+        incremental walk only into subfolders the index did not know. Returns
+        the folders listed.
+        """
+        priority = REQUEST_PRIORITY_LOW if full else None
+        queue = deque(start)
+        tasks: dict[asyncio.Task[FilenFolderListing], str] = {}
+        batch: list[tuple[str, FilenFolderListing]] = []
+        listed = 0
+        try:
+            while queue or tasks or batch:
+                while queue and len(tasks) < INDEX_SCAN_CONCURRENCY:
+                    folder_uuid = queue.popleft()
+                    task = asyncio.create_task(
+                        self.client.async_list_folder(folder_uuid, priority=priority)
+                    )
+                    tasks[task] = folder_uuid
+                if tasks:
+                    done, _ = await asyncio.wait(
+                        tasks, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        listing = task.result()
+                        batch.append((tasks.pop(task), listing))
+                        if full:
+                            queue.extend(folder.uuid for folder in listing.folders)
+                if batch and (len(batch) >= INDEX_WRITE_BATCH or not tasks):
+                    new_folders = await self._async_run(
+                        self.index.write_listings, batch, generation
+                    )
+                    listed += len(batch)
+                    batch = []
+                    if not full:
+                        queue.extend(new_folders)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return listed
+
+
+def index_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the path of an entry's drive index database."""
+    return hass.config.path(STORAGE_DIR, f"{STORAGE_KEY_INDEX}.{entry_id}.db")
+
+
+def _stagger_fraction(hass: HomeAssistant, entry: ConfigEntry) -> float:
+    """Return the entry's evenly spaced position in [0, 1) among Filen entries."""
+    entry_ids = sorted(
+        other.entry_id for other in hass.config_entries.async_entries(DOMAIN)
+    )
+    if entry.entry_id not in entry_ids:
+        return 0.0
+    return entry_ids.index(entry.entry_id) / len(entry_ids)
+
+
+def _account_attributes(data: FilenAccountData) -> dict[str, Any]:
+    """Return additional account details for sensor state attributes."""
+    attrs = {
+        ATTR_EMAIL: data.email,
+        ATTR_ACCOUNT_ID: data.account_id,
+        ATTR_IS_PREMIUM: data.is_premium,
+        ATTR_BASE_FOLDER_UUID: data.base_folder_uuid,
+        ATTR_AVATAR_URL: data.avatar_url,
+        ATTR_DISPLAY_NAME: data.display_name,
+        ATTR_NICK_NAME: data.nick_name,
+        ATTR_PLAN_NAMES: list(data.plan_names),
+    }
+    return {key: value for key, value in attrs.items() if value not in (None, "", [])}
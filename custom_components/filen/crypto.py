@@ -0,0 +1,137 @@
+"""Client-side encryption helpers compatible with Filen's file format."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from collections.abc import Iterable
+from functools import lru_cache
+import hashlib
+import os
+import secrets
+import string
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# Files are split into chunks of this many plaintext bytes before encryption.
+CHUNK_SIZE = 1024 * 1024
+
+_KEY_ALPHABET = string.ascii_letters + string.digits
+_IV_LENGTH = 12
+_METADATA_VERSION_2 = "002"
+_METADATA_VERSION_3 = "003"
+# File encryption versions. Version 3 file keys are 32 bytes in hex, earlier
+# versions use the key's text as the AES key.
+FILE_VERSION_2 = 2
+FILE_VERSION_3 = 3
+
+
+def generate_key(length: int = 32) -> str:
+    """Return a random alphanumeric key as used for Filen file keys."""
+    return "".join(secrets.choice(_KEY_ALPHABET) for _ in range(length))
+
+
+def hash_name(name: str) -> str:
+    """Return the hashed, case-insensitive name Filen uses for lookups."""
+    inner = hashlib.sha512(name.lower().encode("utf-8")).hexdigest()
+    return hashlib.sha1(inner.encode("utf-8")).hexdigest()
+
+
+def _aesgcm(key: bytes) -> AESGCM:
+    """Return an AES-GCM cipher for a key.
+
+    cryptography's AEAD module is imported on first use: with a stored API
+    key and no transfers, a startup never encrypts anything.
+    """
+    from cryptography.hazmat.primitives.ciphers.aead import (  # noqa: PLC0415
+        AESGCM,
+    )
+
+    return AESGCM(key)
+
+
+def _invalid_tag() -> type[Exception]:
+    """Return the exception cryptography raises for a failed authentication."""
+    from cryptography.exceptions import InvalidTag  # noqa: PLC0415
+
+    return InvalidTag
+
+
+@lru_cache(maxsize=16)
+def _metadata_key(key: str) -> bytes:
+    """Return the AES key that version 2 metadata derives from a text key.
+
+    Cached because a drive listing decrypts every entry with the same master
+    key.
+    """
+    return hashlib.pbkdf2_hmac(
+        "sha512", key.encode("utf-8"), key.encode("utf-8"), 1, dklen=32
+    )
+
+
+def encrypt_metadata(data: str, key: str) -> str:
+    """Encrypt a metadata string in Filen's version 2 format."""
+    iv = generate_key(_IV_LENGTH)
+    encrypted = _aesgcm(_metadata_key(key)).encrypt(
+        iv.encode("utf-8"), data.encode("utf-8"), None
+    )
+    return _METADATA_VERSION_2 + iv + base64.b64encode(encrypted).decode("ascii")
+
+
+def decrypt_metadata(data: str, key: str) -> str:
+    """Decrypt a version 2 or version 3 metadata string.
+
+    Raises ValueError if the format is unknown or the key does not match.
+    """
+    try:
+        if data.startswith(_METADATA_VERSION_2):
+            iv = data[3 : 3 + _IV_LENGTH].encode("utf-8")
+            encrypted = base64.b64decode(data[3 + _IV_LENGTH :])
+            aes_key = _metadata_key(key)
+        elif data.startswith(_METADATA_VERSION_3):
+            iv = bytes.fromhex(data[3 : 3 + _IV_LENGTH * 2])
+            encrypted = base64.b64decode(data[3 + _IV_LENGTH * 2 :])
+            aes_key = bytes.fromhex(key)
+        else:
+            raise ValueError("Unsupported Filen metadata format")
+        return _aesgcm(aes_key).decrypt(iv, encrypted, None).decode("utf-8")
+    except (_invalid_tag(), binascii.Error, UnicodeDecodeError) as err:
+        raise ValueError("Could not decrypt Filen metadata") from err
+
+
+def decrypt_metadata_with_keys(data: str, keys: Iterable[str]) -> str:
+    """Decrypt metadata with the first matching key, newest key first."""
+    for key in reversed(list(keys)):
+        try:
+            return decrypt_metadata(data, key)
+        except ValueError:
+            continue
+    raise ValueError("None of the Filen master keys can decrypt the metadata")
+
+
+def _chunk_key(key: str, version: int) -> bytes:
+    """Return the AES key of a file's chunks for its encryption version."""
+    if version == FILE_VERSION_3:
+        return bytes.fromhex(key)
+    return key.encode("utf-8")
+
+
+def encrypt_chunk(data: bytes, key: str, version: int) -> bytes:
+    """Encrypt one file chunk as IV followed by ciphertext and tag."""
+    iv = os.urandom(_IV_LENGTH)
+    return iv + _aesgcm(_chunk_key(key, version)).encrypt(iv, data, None)
+
+
+def decrypt_chunk(data: bytes, key: str, version: int) -> bytes:
+    """Decrypt one file chunk produced by encrypt_chunk.
+
+    Raises ValueError if the chunk is corrupt or the key does not match.
+    """
+    try:
+        return _aesgcm(_chunk_key(key, version)).decrypt(
+            data[:_IV_LENGTH], data[_IV_LENGTH:], None
+        )
+    except _invalid_tag() as err:
+        raise ValueError("Could not decrypt Filen file chunk") from err
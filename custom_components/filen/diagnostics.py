@@ -0,0 +1,87 @@
+"""Diagnostics support for the Filen integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, DOMAIN
+from .coordinator import FilenConfigEntry
+
+TO_REDACT = {
+    CONF_API_KEY,
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    "account_id",
+    "avatar_url",
+    "base_folder_uuid",
+    "display_name",
+    "nick_name",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: FilenConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    client = entry.runtime_data.client
+    coordinator = entry.runtime_data.coordinator
+    realtime_listener = entry.runtime_data.realtime_listener
+    domain_data = hass.data.get(DOMAIN)
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "stagger": round(coordinator.stagger, 3),
+            "data": async_redact_data(
+                coordinator.data.as_dict() if coordinator.data else {}, TO_REDACT
+            ),
+        },
+        "client": {
+            "auth_version": client.auth_version,
+            "circuit_breaker": {
+                "state": client.circuit_breaker.state,
+                "consecutive_failures": client.circuit_breaker.consecutive_failures,
+                "open_count": client.circuit_breaker.open_count,
+            },
+            "retries": client.retry_count,
+            "relogins": client.relogin_count,
+            "coalesced_requests": client.coalesced_count,
+            "priority": client.priority,
+            "metrics": client.metrics.as_dict(),
+        },
+        "realtime": (
+            {
+                "connected": realtime_listener.connected,
+                "reconnects": realtime_listener.reconnect_count,
+            }
+            if realtime_listener is not None
+            else None
+        ),
+        "rate_limiter": (
+            {
+                "requests_per_second": client.rate_limiter.rate,
+                "burst": client.rate_limiter.burst,
+                "delayed_requests": client.rate_limiter.delayed_count,
+                "waiting": client.rate_limiter.waiting,
+            }
+            if client.rate_limiter is not None
+            else None
+        ),
+        "connections": (
+            {
+                "created": domain_data.connection_stats.created,
+                "reused": domain_data.connection_stats.reused,
+            }
+            if domain_data is not None
+            else None
+        ),
+    }
@@ -0,0 +1,105 @@
+"""Incremental storage growth forecasting for Filen accounts."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+SECONDS_PER_DAY = 86_400
+
+
+@dataclass(frozen=True, slots=True)
+class StorageForecast:
+    """Projected storage growth of one account."""
+
+    growth_per_day: float | None
+    days_until_full: float | None
+
+
+class StorageGrowthTracker:
+    """Least-squares fit of storage usage over a fixed-size ring of samples.
+
+    Running sums are updated when a sample enters or leaves the window, so
+    adding a sample and reading the slope are both O(1). Times are kept in
+    days relative to the first sample to keep the sums well conditioned.
+    """
+
+    __slots__ = (
+        "_origin",
+        "_samples",
+        "_sum_t",
+        "_sum_y",
+        "_sum_tt",
+        "_sum_ty",
+    )
+
+    def __init__(self, max_samples: int) -> None:
+        """Initialize an empty tracker."""
+        self._origin: float | None = None
+        self._samples: deque[tuple[float, float]] = deque(maxlen=max_samples)
+        self._sum_t = 0.0
+        self._sum_y = 0.0
+        self._sum_tt = 0.0
+        self._sum_ty = 0.0
+
+    @property
+    def last_timestamp(self) -> float | None:
+        """Return the POSIX timestamp of the newest sample."""
+        if not self._samples or self._origin is None:
+            return None
+        return self._origin + self._samples[-1][0] * SECONDS_PER_DAY
+
+    def add(self, timestamp: float, used: int) -> None:
+        """Add a sample of used bytes at a POSIX timestamp."""
+        if self._origin is None:
+            self._origin = timestamp
+        t = (timestamp - self._origin) / SECONDS_PER_DAY
+        y = float(used)
+
+        if len(self._samples) == self._samples.maxlen:
+            old_t, old_y = self._samples[0]
+            self._sum_t -= old_t
+            self._sum_y -= old_y
+            self._sum_tt -= old_t * old_t
+            self._sum_ty -= old_t * old_y
+
+        self._samples.append((t, y))
+        self._sum_t += t
+        self._sum_y += y
+        self._sum_tt += t * t
+        self._sum_ty += t * y
+
+    def slope(self) -> float | None:
+        """Return the fitted growth in bytes per day, if it can be estimated."""
+        n = len(self._samples)
+        if n < 2:
+            return None
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 0:
+            return None
+        return (n * self._sum_ty - self._sum_t * self._sum_y) / denominator
+
+    def forecast(self, used: int, total: int) -> StorageForecast:
+        """Return growth per day and the projected days until the quota is full."""
+        growth = self.slope()
+        if growth is None:
+            return StorageForecast(growth_per_day=None, days_until_full=None)
+        days_until_full = (
+            max(total - used, 0) / growth if growth > 0 and total > 0 else None
+        )
+        return StorageForecast(growth_per_day=growth, days_until_full=days_until_full)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation for storage."""
+        return {"origin": self._origin, "samples": [list(s) for s in self._samples]}
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Replace the samples with previously stored ones."""
+        self._samples.clear()
+        self._sum_t = self._sum_y = self._sum_tt = self._sum_ty = 0.0
+        self._origin = data.get("origin")
+        if self._origin is None:
+            return
+        for t, y in data.get("samples") or []:
+            self.add(self._origin + t * SECONDS_PER_DAY, y)
@@ -0,0 +1,281 @@
+"""Local SQLite index of a Filen drive's folder tree and file metadata."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+import json
+import sqlite3
+from typing import Any
+
+from .client import FilenFolderListing
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    uuid TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    uuid TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mime TEXT NOT NULL,
+    modified INTEGER NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS folders_parent ON folders (parent);
+CREATE INDEX IF NOT EXISTS files_parent ON files (parent);
+CREATE INDEX IF NOT EXISTS files_size ON files (size);
+CREATE INDEX IF NOT EXISTS files_modified ON files (modified);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Removes the given folders and everything below them.
+_DELETE_SUBTREES = """
+WITH RECURSIVE subtree(uuid) AS (
+    SELECT value FROM json_each(?)
+    UNION
+    SELECT folders.uuid FROM folders JOIN subtree ON folders.parent = subtree.uuid
+)
+DELETE FROM {table} WHERE {column} IN (SELECT uuid FROM subtree)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedFile:
+    """A file found in the drive index."""
+
+    uuid: str
+    name: str
+    path: str
+    size: int
+    modified: int
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class FilenIndexSummary:
+    """Totals and top lists answered from the drive index."""
+
+    files: int
+    folders: int
+    size: int
+    largest: tuple[IndexedFile, ...]
+    recent: tuple[IndexedFile, ...]
+
+
+class FilenDriveIndex:
+    """Blocking SQLite store of one drive's tree; call it from an executor.
+
+    Every folder and file row carries the generation of the sync that last
+    saw it, so a resynced folder can drop children that disappeared.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the index without opening it."""
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Return the open connection."""
+        if self._connection is None:
+            raise RuntimeError("The Filen drive index is not open")
+        return self._connection
+
+    def open(self) -> None:
+        """Open the database and create the schema if needed."""
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        self._connection = connection
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def get_state(self, key: str) -> str | None:
+        """Return a stored sync state value."""
+        row = self.connection.execute(
+            "SELECT value FROM state WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, values: dict[str, str]) -> None:
+        """Store sync state values."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                values.items(),
+            )
+
+    def known_folders(self, folder_uuids: Iterable[str]) -> set[str]:
+        """Return which of the given folders are in the index."""
+        folder_uuids = list(folder_uuids)
+        if not folder_uuids:
+            return set()
+        rows = self.connection.execute(
+            "SELECT uuid FROM folders WHERE uuid IN (SELECT value FROM json_each(?))",
+            (_json_list(folder_uuids),),
+        )
+        return {row[0] for row in rows}
+
+    def write_listings(
+        self, listings: list[tuple[str, FilenFolderListing]], generation: int
+    ) -> list[str]:
+        """Replace the contents of the listed folders in one transaction.
+
+        Children that are no longer listed are removed, including everything
+        below removed folders. Returns the subfolders that were not indexed
+        before.
+        """
+        connection = self.connection
+        new_folders: list[str] = []
+        with connection:
+            for folder_uuid, listing in listings:
+                child_uuids = [folder.uuid for folder in listing.folders]
+                new_folders.extend(
+                    set(child_uuids) - self.known_folders(child_uuids)
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO folders (uuid, parent, name, generation) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        (folder.uuid, folder_uuid, folder.name, generation)
+                        for folder in listing.folders
+                    ),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO files "
+                    "(uuid, parent, name, size, mime, modified, generation) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            file.uuid,
+                            folder_uuid,
+                            file.name,
+                            file.size,
+                            file.mime,
+                            file.last_modified,
+                            generation,
+                        )
+                        for file in listing.files
+                    ),
+                )
+                removed = [
+                    row[0]
+                    for row in connection.execute(
+                        "SELECT uuid FROM folders WHERE parent = ? AND generation < ?",
+                        (folder_uuid, generation),
+                    )
+                ]
+                if removed:
+                    self._delete_subtrees(removed)
+                connection.execute(
+                    "DELETE FROM files WHERE parent = ? AND generation < ?",
+                    (folder_uuid, generation),
+                )
+        return new_folders
+
+    def remove_stale(self, generation: int) -> None:
+        """Drop rows a full sync did not reach."""
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM folders WHERE generation < ?", (generation,)
+            )
+            self.connection.execute(
+                "DELETE FROM files WHERE generation < ?", (generation,)
+            )
+
+    def _delete_subtrees(self, folder_uuids: list[str]) -> None:
+        """Delete folders, their descendants and all files inside them."""
+        roots = _json_list(folder_uuids)
+        # Files first: the folder rows are needed to walk the subtree.
+        self.connection.execute(
+            _DELETE_SUBTREES.format(table="files", column="parent"), (roots,)
+        )
+        self.connection.execute(
+            _DELETE_SUBTREES.format(table="folders", column="uuid"), (roots,)
+        )
+
+    def search(self, query: str, limit: int) -> list[IndexedFile]:
+        """Return files whose name contains ``query``, ignoring ASCII case."""
+        pattern = "%{}%".format(
+            query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        return self._indexed_files(
+            "SELECT uuid, parent, name, size, modified FROM files "
+            "WHERE name LIKE ? ESCAPE '\\' ORDER BY modified DESC LIMIT ?",
+            (pattern, limit),
+        )
+
+    def summary(self, top: int) -> FilenIndexSummary:
+        """Return totals with the largest and most recently modified files."""
+        files, size = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files"
+        ).fetchone()
+        (folders,) = self.connection.execute("SELECT COUNT(*) FROM folders").fetchone()
+        return FilenIndexSummary(
+            files=files,
+            folders=folders,
+            size=size,
+            largest=tuple(
+                self._indexed_files(
+                    "SELECT uuid, parent, name, size, modified FROM files "
+                    "ORDER BY size DESC LIMIT ?",
+                    (top,),
+                )
+            ),
+            recent=tuple(
+                self._indexed_files(
+                    "SELECT uuid, parent, name, size, modified FROM files "
+                    "ORDER BY modified DESC LIMIT ?",
+                    (top,),
+                )
+            ),
+        )
+
+    def _indexed_files(self, sql: str, parameters: tuple[Any, ...]) -> list[IndexedFile]:
+        """Run a file query and resolve the path of every result."""
+        paths: dict[str, str] = {}
+        return [
+            IndexedFile(
+                uuid=uuid,
+                name=name,
+                path=f"{self._folder_path(parent, paths)}/{name}",
+                size=size,
+                modified=modified,
+            )
+            for uuid, parent, name, size, modified in self.connection.execute(
+                sql, parameters
+            ).fetchall()
+        ]
+
+    def _folder_path(self, folder_uuid: str, paths: dict[str, str]) -> str:
+        """Return a folder's path below the drive root, memoized in ``paths``."""
+        if folder_uuid in paths:
+            return paths[folder_uuid]
+        row = self.connection.execute(
+            "SELECT parent, name FROM folders WHERE uuid = ?", (folder_uuid,)
+        ).fetchone()
+        # The drive root itself is not indexed.
+        path = "" if row is None else f"{self._folder_path(row[0], paths)}/{row[1]}"
+        paths[folder_uuid] = path
+        return path
+
+
+def _json_list(values: list[str]) -> str:
+    """Encode values as a JSON array for SQLite's json_each."""
+    return json.dumps(values)
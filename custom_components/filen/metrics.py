@@ -0,0 +1,100 @@
+"""Fixed-memory request metrics for the Filen client."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds of the latency histogram buckets in milliseconds. Samples above
+# the last bound fall into an overflow bucket.
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1_000,
+    2_500,
+    5_000,
+    10_000,
+    30_000,
+)
+
+
+class EndpointMetrics:
+    """Request counters and a latency histogram for one endpoint."""
+
+    __slots__ = ("requests", "errors", "total_ms", "last_ms", "buckets")
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.last_ms: float | None = None
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, duration_ms: float, success: bool) -> None:
+        """Record one request."""
+        self.requests += 1
+        if not success:
+            self.errors += 1
+        self.total_ms += duration_ms
+        self.last_ms = duration_ms
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the bucket upper bound that covers the given percentile."""
+        if not self.requests:
+            return None
+
+        threshold = self.requests * percent / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= threshold:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return LATENCY_BUCKETS_MS[index]
+                break
+        # Overflow bucket: the largest bound is the best estimate available.
+        return LATENCY_BUCKETS_MS[-1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary for diagnostics."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+            "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
+class FilenMetrics:
+    """Per-endpoint request metrics of one Filen client."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+
+    def record(self, name: str, duration_ms: float, success: bool) -> None:
+        """Record one request or timed operation."""
+        if (metrics := self.endpoints.get(name)) is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        metrics.record(duration_ms, success)
+
+    def get(self, name: str) -> EndpointMetrics | None:
+        """Return the metrics for one endpoint, if it was used."""
+        return self.endpoints.get(name)
+
+    @property
+    def total_errors(self) -> int:
+        """Return the number of failed requests across all endpoints."""
+        return sum(metrics.errors for metrics in self.endpoints.values())
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return summaries for all endpoints."""
+        return {name: metrics.as_dict() for name, metrics in self.endpoints.items()}
@@ -0,0 +1,248 @@
+"""Realtime change notifications from Filen's event socket."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import json
+import logging
+import random
+import time
+from typing import Any
+
+import aiohttp
+
+from .client import FilenClient
+from .const import (
+    REALTIME_RECONNECT_MAX,
+    REALTIME_RECONNECT_MIN,
+    REALTIME_SOCKET_URL,
+    REALTIME_STABLE_SESSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Engine.IO packet types used by the socket.io v2 protocol Filen speaks.
+_EIO_OPEN = "0"
+_EIO_CLOSE = "1"
+_EIO_PING = "2"
+_EIO_PONG = "3"
+_EIO_MESSAGE = "4"
+# Socket.IO packet types, sent inside Engine.IO message packets.
+_SIO_EVENT = "2"
+
+_DEFAULT_PING_INTERVAL = 25.0
+_DEFAULT_PING_TIMEOUT = 20.0
+
+
+def is_change_event(event: str) -> bool:
+    """Return whether a socket event can change storage usage."""
+    return event.startswith(("file", "folder", "trash"))
+
+
+def _seconds(milliseconds: Any, default: float) -> float:
+    """Convert a positive millisecond value from the handshake to seconds."""
+    if isinstance(milliseconds, int | float) and milliseconds > 0:
+        return milliseconds / 1000
+    return default
+
+
+class FilenRealtimeListener:
+    """Keep a socket connection open and report file and folder events.
+
+    ``on_event`` is called with the event name for every change event and
+    ``on_connection_change`` with the new state whenever the authenticated
+    connection comes up or goes away. Reconnects use jittered exponential
+    backoff between REALTIME_RECONNECT_MIN and REALTIME_RECONNECT_MAX, which
+    only resets after a session stayed authenticated for
+    REALTIME_STABLE_SESSION, so a server that accepts and then drops every
+    connection is not hammered at the minimum delay.
+
+    A connection is dropped when a ping is not answered within the server's
+    ping timeout, or when nothing at all arrives for a ping interval plus
+    timeout, so a silently dead socket does not leave realtime updates
+    stuck as connected.
+    """
+
+    def __init__(
+        self,
+        client: FilenClient,
+        on_event: Callable[[str], None],
+        on_connection_change: Callable[[bool], None],
+        url: str = REALTIME_SOCKET_URL,
+    ) -> None:
+        """Initialize the listener."""
+        self.client = client
+        self.url = url
+        self.connected = False
+        self.reconnect_count = 0
+        self._on_event = on_event
+        self._on_connection_change = on_connection_change
+        self._stopped = False
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._pong = asyncio.Event()
+        # API key the current session authenticated with, and when it did.
+        self._session_api_key: str | None = None
+        self._authenticated_at: float | None = None
+        # Set by async_reconnect to skip the backoff once.
+        self._reconnect_now = False
+        self._close_task: asyncio.Task[bool] | None = None
+
+    async def async_run(self) -> None:
+        """Connect and reconnect until stopped."""
+        delay = REALTIME_RECONNECT_MIN
+        while not self._stopped:
+            self._authenticated_at = None
+            try:
+                await self._async_connect_and_listen()
+            except (aiohttp.ClientError, TimeoutError, ValueError) as err:
+                _LOGGER.debug("Filen realtime socket error: %s", err)
+            finally:
+                self._set_connected(False)
+                self._ws = None
+
+            if self._stopped:
+                break
+            self.reconnect_count += 1
+            if (
+                self._authenticated_at is not None
+                and time.monotonic() - self._authenticated_at
+                >= REALTIME_STABLE_SESSION
+            ):
+                delay = REALTIME_RECONNECT_MIN
+            if self._reconnect_now:
+                self._reconnect_now = False
+                continue
+            wait = random.uniform(delay / 2, delay)
+            _LOGGER.debug("Reconnecting to the Filen realtime socket in %.0f s", wait)
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, REALTIME_RECONNECT_MAX)
+
+    def async_reconnect(self) -> None:
+        """Reconnect at once if the session used a different API key.
+
+        Called when the client's API key was rotated by a new login, since the
+        socket stays authenticated with the key it was opened with.
+        """
+        if self._ws is None or self._session_api_key == self.client.api_key:
+            return
+        _LOGGER.debug("Reconnecting to the Filen realtime socket with a new API key")
+        self._reconnect_now = True
+        self._close_task = asyncio.create_task(self._ws.close())
+
+    async def async_stop(self) -> None:
+        """Stop listening and close the connection."""
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _async_connect_and_listen(self) -> None:
+        """Run one socket session."""
+        async with self.client.session.ws_connect(
+            f"{self.url}/socket.io/?EIO=3&transport=websocket"
+        ) as ws:
+            self._ws = ws
+            ping_task: asyncio.Task[None] | None = None
+            receive_timeout = _DEFAULT_PING_INTERVAL + _DEFAULT_PING_TIMEOUT
+            try:
+                while True:
+                    message = await ws.receive(timeout=receive_timeout)
+                    if message.type in (
+                        aiohttp.WSMsgType.CLOSE,
+                        aiohttp.WSMsgType.CLOSING,
+                        aiohttp.WSMsgType.CLOSED,
+                        aiohttp.WSMsgType.ERROR,
+                    ):
+                        break
+                    if message.type is not aiohttp.WSMsgType.TEXT:
+                        continue
+                    packet: str = message.data
+                    if packet.startswith(_EIO_OPEN):
+                        interval, timeout = self._parse_handshake(packet[1:])
+                        receive_timeout = interval + timeout
+                        ping_task = asyncio.create_task(
+                            self._async_ping(ws, interval, timeout)
+                        )
+                        self._session_api_key = self.client.api_key
+                        await self._async_emit(
+                            ws, "auth", {"apiKey": self._session_api_key}
+                        )
+                    elif packet.startswith(_EIO_PONG):
+                        self._pong.set()
+                    elif packet.startswith(_EIO_MESSAGE + _SIO_EVENT):
+                        self._handle_event(packet[2:])
+                    elif packet.startswith(_EIO_CLOSE):
+                        break
+            finally:
+                if ping_task is not None:
+                    ping_task.cancel()
+
+    @staticmethod
+    def _parse_handshake(data: str) -> tuple[float, float]:
+        """Return the ping interval and timeout in seconds from a handshake.
+
+        Raises ValueError if the handshake is not a JSON object.
+        """
+        handshake = json.loads(data)
+        if not isinstance(handshake, dict):
+            raise ValueError(f"Unexpected Filen realtime handshake: {data[:100]}")
+        return (
+            _seconds(handshake.get("pingInterval"), _DEFAULT_PING_INTERVAL),
+            _seconds(handshake.get("pingTimeout"), _DEFAULT_PING_TIMEOUT),
+        )
+
+    def _handle_event(self, data: str) -> None:
+        """Dispatch one socket.io event, ignoring malformed packets."""
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, list) or not payload:
+            _LOGGER.debug("Ignoring malformed Filen realtime packet: %s", data[:100])
+            return
+        event = str(payload[0])
+        if event == "authSuccess":
+            _LOGGER.debug("Filen realtime socket authenticated")
+            self._authenticated_at = time.monotonic()
+            self._set_connected(True)
+        elif event == "authFailed":
+            _LOGGER.warning("Filen realtime socket rejected the API key")
+            self._set_connected(False)
+        elif is_change_event(event):
+            self._on_event(event)
+
+    def _set_connected(self, connected: bool) -> None:
+        """Record the connection state and report changes while running."""
+        if connected != self.connected:
+            self.connected = connected
+            if not self._stopped:
+                self._on_connection_change(connected)
+
+    @staticmethod
+    async def _async_emit(
+        ws: aiohttp.ClientWebSocketResponse, event: str, data: Any
+    ) -> None:
+        """Send a socket.io event."""
+        await ws.send_str(
+            _EIO_MESSAGE + _SIO_EVENT + json.dumps([event, data], separators=(",", ":"))
+        )
+
+    async def _async_ping(
+        self, ws: aiohttp.ClientWebSocketResponse, interval: float, timeout: float
+    ) -> None:
+        """Send Engine.IO pings and close the socket if a pong does not arrive."""
+        try:
+            while not ws.closed:
+                await asyncio.sleep(interval)
+                self._pong.clear()
+                await ws.send_str(_EIO_PING)
+                try:
+                    await asyncio.wait_for(self._pong.wait(), timeout)
+                except TimeoutError:
+                    _LOGGER.debug(
+                        "No pong from the Filen realtime socket within %s s", timeout
+                    )
+                    await ws.close()
+                    return
+        except (aiohttp.ClientError, ConnectionResetError) as err:
+            _LOGGER.debug("Could not ping the Filen realtime socket: %s", err)
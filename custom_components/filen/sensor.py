@@ -3,45 +3,60 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import timedelta
 import logging
 from typing import Any, Callable
 
-import async_timeout
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, UnitOfInformation
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .client import FilenApiError, FilenClient
+from .client import FilenAccountData, FilenTrashUsage, FilenUserEvent
 from .const import (
-    ATTR_ACCOUNT_ID,
-    ATTR_AVATAR_URL,
-    ATTR_BASE_FOLDER_UUID,
-    ATTR_DISPLAY_NAME,
-    ATTR_EMAIL,
-    ATTR_IS_PREMIUM,
-    ATTR_NICK_NAME,
-    ATTR_PLAN_NAMES,
+    ATTR_EVENT_ID,
+    ATTR_FILES,
+    ATTR_FOLDER_UUID,
+    ATTR_FOLDERS,
+    ATTR_MISSED_EVENTS,
+    ATTR_NEW_EVENTS,
+    ATTR_TOP_FILES,
     DOMAIN,
-    UPDATE_INTERVAL,
+    METRIC_PASSWORD_DERIVATION,
+)
+from .coordinator import (
+    FilenActivityCoordinator,
+    FilenConfigEntry,
+    FilenDataUpdateCoordinator,
+    FilenFolderSizeCoordinator,
+    FilenIndexCoordinator,
+    FilenTrashCoordinator,
 )
+from .forecast import StorageForecast
+from .index import FilenIndexSummary, IndexedFile
+from .metrics import FilenMetrics
 
 _LOGGER = logging.getLogger(__name__)
 
 BYTES_PER_GIGABYTE = 1_000_000_000
 
+# Only the diagnostic metric sensors poll; they read in-memory counters.
+SCAN_INTERVAL = timedelta(minutes=1)
+
 
 def _bytes_to_gigabytes(value: Any) -> float | None:
     """Convert a byte value returned by Filen into decimal gigabytes."""
@@ -58,7 +73,7 @@ def _bytes_to_gigabytes(value: Any) -> float | None:
 class FilenSensorEntityDescription(SensorEntityDescription):
     """Describes a Filen sensor."""
 
-    value_fn: Callable[[dict[str, Any]], Any]
+    value_fn: Callable[[FilenAccountData], Any]
 
 
 SENSOR_DESCRIPTIONS: tuple[FilenSensorEntityDescription, ...] = (
@@ -69,7 +84,7 @@ SENSOR_DESCRIPTIONS: tuple[FilenSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.DATA_SIZE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
-        value_fn=lambda data: _bytes_to_gigabytes(data.get("storage_used")),
+        value_fn=lambda data: _bytes_to_gigabytes(data.storage_used),
     ),
     FilenSensorEntityDescription(
         key="storage_total",
@@ -78,7 +93,7 @@ SENSOR_DESCRIPTIONS: tuple[FilenSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.DATA_SIZE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
-        value_fn=lambda data: _bytes_to_gigabytes(data.get("storage_total")),
+        value_fn=lambda data: _bytes_to_gigabytes(data.storage_total),
     ),
     FilenSensorEntityDescription(
         key="storage_percentage",
@@ -87,47 +102,257 @@ SENSOR_DESCRIPTIONS: tuple[FilenSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
         icon="mdi:cloud-percent",
-        value_fn=lambda data: data.get("storage_percentage"),
+        value_fn=lambda data: data.storage_percentage,
+    ),
+)
+
+
+def _endpoint_p95(metrics: FilenMetrics, endpoint: str) -> float | None:
+    """Return the 95th percentile latency of an endpoint in milliseconds."""
+    endpoint_metrics = metrics.get(endpoint)
+    return endpoint_metrics.percentile(95) if endpoint_metrics else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class FilenMetricSensorEntityDescription(SensorEntityDescription):
+    """Describes a Filen client metric sensor."""
+
+    value_fn: Callable[[FilenMetrics], Any]
+
+
+METRIC_SENSOR_DESCRIPTIONS: tuple[FilenMetricSensorEntityDescription, ...] = (
+    FilenMetricSensorEntityDescription(
+        key="user_info_latency",
+        translation_key="user_info_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: _endpoint_p95(metrics, "/v3/user/info"),
+    ),
+    FilenMetricSensorEntityDescription(
+        key="user_account_latency",
+        translation_key="user_account_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: _endpoint_p95(metrics, "/v3/user/account"),
+    ),
+    FilenMetricSensorEntityDescription(
+        key="login_latency",
+        translation_key="login_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: _endpoint_p95(metrics, "/v3/login"),
+    ),
+    FilenMetricSensorEntityDescription(
+        key="password_derivation_time",
+        translation_key="password_derivation_time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        suggested_display_precision=0,
+        value_fn=lambda metrics: (
+            derivation.last_ms
+            if (derivation := metrics.get(METRIC_PASSWORD_DERIVATION))
+            else None
+        ),
+    ),
+    FilenMetricSensorEntityDescription(
+        key="request_errors",
+        translation_key="request_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:alert-circle-outline",
+        value_fn=lambda metrics: metrics.total_errors,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class FilenForecastSensorEntityDescription(SensorEntityDescription):
+    """Describes a Filen storage forecast sensor."""
+
+    value_fn: Callable[[StorageForecast], Any]
+
+
+FORECAST_SENSOR_DESCRIPTIONS: tuple[FilenForecastSensorEntityDescription, ...] = (
+    FilenForecastSensorEntityDescription(
+        key="storage_growth_rate",
+        translation_key="storage_growth_rate",
+        native_unit_of_measurement="GB/d",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        icon="mdi:chart-line",
+        value_fn=lambda forecast: _bytes_to_gigabytes(forecast.growth_per_day),
+    ),
+    FilenForecastSensorEntityDescription(
+        key="days_until_full",
+        translation_key="days_until_full",
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        device_class=SensorDeviceClass.DURATION,
+        suggested_display_precision=0,
+        icon="mdi:calendar-clock",
+        value_fn=lambda forecast: (
+            round(forecast.days_until_full, 1)
+            if forecast.days_until_full is not None
+            else None
+        ),
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class FilenActivitySensorEntityDescription(SensorEntityDescription):
+    """Describes a Filen account activity sensor."""
+
+    value_fn: Callable[[FilenUserEvent], Any]
+
+
+ACTIVITY_SENSOR_DESCRIPTIONS: tuple[FilenActivitySensorEntityDescription, ...] = (
+    FilenActivitySensorEntityDescription(
+        key="last_activity",
+        translation_key="last_activity",
+        icon="mdi:history",
+        value_fn=lambda event: event.type,
+    ),
+    FilenActivitySensorEntityDescription(
+        key="last_activity_time",
+        translation_key="last_activity_time",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda event: dt_util.utc_from_timestamp(event.timestamp),
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class FilenTrashSensorEntityDescription(SensorEntityDescription):
+    """Describes a Filen trash sensor."""
+
+    value_fn: Callable[[FilenTrashUsage], Any]
+
+
+TRASH_SENSOR_DESCRIPTIONS: tuple[FilenTrashSensorEntityDescription, ...] = (
+    FilenTrashSensorEntityDescription(
+        key="trash_items",
+        translation_key="trash_items",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:trash-can-outline",
+        value_fn=lambda trash: trash.items,
+    ),
+    FilenTrashSensorEntityDescription(
+        key="trash_size",
+        translation_key="trash_size",
+        native_unit_of_measurement=UnitOfInformation.GIGABYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda trash: _bytes_to_gigabytes(trash.size),
     ),
 )
 
 
+@dataclass(frozen=True, kw_only=True)
+class FilenIndexSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor answered from the drive index."""
+
+    value_fn: Callable[[FilenIndexSummary], Any]
+    top_files_fn: Callable[[FilenIndexSummary], tuple[IndexedFile, ...]] | None = None
+
+
+INDEX_SENSOR_DESCRIPTIONS: tuple[FilenIndexSensorEntityDescription, ...] = (
+    FilenIndexSensorEntityDescription(
+        key="indexed_files",
+        translation_key="indexed_files",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:file-search-outline",
+        value_fn=lambda summary: summary.files,
+    ),
+    FilenIndexSensorEntityDescription(
+        key="largest_file",
+        translation_key="largest_file",
+        native_unit_of_measurement=UnitOfInformation.GIGABYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        suggested_display_precision=2,
+        value_fn=lambda summary: (
+            _bytes_to_gigabytes(summary.largest[0].size) if summary.largest else None
+        ),
+        top_files_fn=lambda summary: summary.largest,
+    ),
+    FilenIndexSensorEntityDescription(
+        key="recently_modified",
+        translation_key="recently_modified",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda summary: (
+            dt_util.utc_from_timestamp(summary.recent[0].modified / 1000)
+            if summary.recent and summary.recent[0].modified
+            else None
+        ),
+        top_files_fn=lambda summary: summary.recent,
+    ),
+)
+
+
+def _device_info(entry: FilenConfigEntry) -> DeviceInfo:
+    """Return the device shared by all sensors of a Filen account."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=entry.title,
+        manufacturer="Filen",
+    )
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
-    entry: ConfigEntry,
+    entry: FilenConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Filen sensors based on a config entry."""
-    client: FilenClient = entry.runtime_data
-    coordinator = FilenDataUpdateCoordinator(hass, client)
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = entry.runtime_data.coordinator
+    folder_coordinator = entry.runtime_data.folder_coordinator
+    activity_coordinator = entry.runtime_data.activity_coordinator
+    trash_coordinator = entry.runtime_data.trash_coordinator
+    index_coordinator = entry.runtime_data.index_coordinator
+    metrics = entry.runtime_data.client.metrics
 
-    async_add_entities(
+    entities: list[SensorEntity] = [
         FilenAccountSensor(coordinator, entry, description)
         for description in SENSOR_DESCRIPTIONS
+    ]
+    entities.extend(
+        FilenMetricSensor(metrics, entry, description)
+        for description in METRIC_SENSOR_DESCRIPTIONS
     )
-
-
-class FilenDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Fetch and cache Filen account data."""
-
-    def __init__(self, hass: HomeAssistant, client: FilenClient) -> None:
-        """Initialize the data coordinator."""
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=UPDATE_INTERVAL,
+    entities.extend(
+        FilenForecastSensor(coordinator, entry, description)
+        for description in FORECAST_SENSOR_DESCRIPTIONS
+    )
+    if activity_coordinator is not None:
+        entities.extend(
+            FilenActivitySensor(activity_coordinator, entry, description)
+            for description in ACTIVITY_SENSOR_DESCRIPTIONS
         )
-        self.client = client
-
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch account/storage data from Filen."""
-        try:
-            async with async_timeout.timeout(30):
-                return await self.client.async_get_account_data()
-        except FilenApiError as err:
-            raise UpdateFailed(f"Error communicating with Filen: {err}") from err
+    if trash_coordinator is not None:
+        entities.extend(
+            FilenTrashSensor(trash_coordinator, entry, description)
+            for description in TRASH_SENSOR_DESCRIPTIONS
+        )
+    if index_coordinator is not None:
+        entities.extend(
+            FilenIndexSensor(index_coordinator, entry, description)
+            for description in INDEX_SENSOR_DESCRIPTIONS
+        )
+    if folder_coordinator is not None:
+        entities.extend(
+            FilenFolderSizeSensor(folder_coordinator, entry, folder_uuid)
+            for folder_uuid in folder_coordinator.folder_uuids
+        )
+    async_add_entities(entities)
 
 
 class FilenAccountSensor(CoordinatorEntity[FilenDataUpdateCoordinator], SensorEntity):
@@ -139,36 +364,251 @@ class FilenAccountSensor(CoordinatorEntity[FilenDataUpdateCoordinator], SensorEn
     def __init__(
         self,
         coordinator: FilenDataUpdateCoordinator,
-        entry: ConfigEntry,
+        entry: FilenConfigEntry,
         description: FilenSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, entry.entry_id)},
-            name=entry.title,
-            manufacturer="Filen",
+        self._attr_device_info = _device_info(entry)
+
+        self._attr_extra_state_attributes = {}
+        self._last_available: bool | None = None
+        self._update_from_coordinator()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if this sensor's value, attributes or availability changed."""
+        if not self._update_from_coordinator():
+            return
+        super()._handle_coordinator_update()
+
+    def _update_from_coordinator(self) -> bool:
+        """Compute the sensor value and attributes once per coordinator update.
+
+        Return whether anything visible in the entity state changed.
+        """
+        data = self.coordinator.data
+        native_value = self.entity_description.value_fn(data) if data else None
+        attributes = self.coordinator.account_attributes
+        available = self.available
+        changed = (
+            native_value != self._attr_native_value
+            or attributes != self._attr_extra_state_attributes
+            or available != self._last_available
+        )
+        self._attr_native_value = native_value
+        self._attr_extra_state_attributes = attributes
+        self._last_available = available
+        return changed
+
+
+class FilenForecastSensor(SensorEntity):
+    """Sensor representing the storage growth forecast of an account."""
+
+    entity_description: FilenForecastSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: FilenDataUpdateCoordinator,
+        entry: FilenConfigEntry,
+        description: FilenForecastSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self.coordinator = coordinator
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = _device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        """Write state whenever the coordinator publishes a new forecast."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self.coordinator.forecast_signal, self.async_write_ha_state
+            )
         )
 
+    @property
+    def native_value(self) -> Any:
+        """Return the forecast value."""
+        return self.entity_description.value_fn(self.coordinator.forecast)
+
+
+class FilenActivitySensor(CoordinatorEntity[FilenActivityCoordinator], SensorEntity):
+    """Sensor representing the latest Filen account activity."""
+
+    entity_description: FilenActivitySensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: FilenActivityCoordinator,
+        entry: FilenConfigEntry,
+        description: FilenActivitySensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = _device_info(entry)
+
+    @property
+    def native_value(self) -> Any:
+        """Return the sensor value."""
+        activity = self.coordinator.data
+        if activity is None or activity.last_event is None:
+            return None
+        return self.entity_description.value_fn(activity.last_event)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the event ID and how many events the last poll found."""
+        activity = self.coordinator.data
+        if activity is None or activity.last_event is None:
+            return None
+        return {
+            ATTR_EVENT_ID: activity.last_event.id,
+            ATTR_NEW_EVENTS: activity.new_events,
+            ATTR_MISSED_EVENTS: activity.missed_events,
+        }
+
+
+class FilenTrashSensor(CoordinatorEntity[FilenTrashCoordinator], SensorEntity):
+    """Sensor representing Filen trash usage."""
+
+    entity_description: FilenTrashSensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: FilenTrashCoordinator,
+        entry: FilenConfigEntry,
+        description: FilenTrashSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = _device_info(entry)
+
     @property
     def native_value(self) -> Any:
         """Return the sensor value."""
-        return self.entity_description.value_fn(self.coordinator.data or {})
+        if self.coordinator.data is None:
+            return None
+        return self.entity_description.value_fn(self.coordinator.data)
+
+
+class FilenIndexSensor(CoordinatorEntity[FilenIndexCoordinator], SensorEntity):
+    """Sensor answered from the local drive index."""
+
+    entity_description: FilenIndexSensorEntityDescription
+    _attr_has_entity_name = True
+    # The top file lists change often and are only useful as current state.
+    _unrecorded_attributes = frozenset({ATTR_TOP_FILES})
+
+    def __init__(
+        self,
+        coordinator: FilenIndexCoordinator,
+        entry: FilenConfigEntry,
+        description: FilenIndexSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = _device_info(entry)
+
+    @property
+    def native_value(self) -> Any:
+        """Return the sensor value."""
+        if self.coordinator.data is None:
+            return None
+        return self.entity_description.value_fn(self.coordinator.data)
 
     @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return additional account details."""
-        data = self.coordinator.data or {}
-        attrs = {
-            ATTR_EMAIL: data.get("email"),
-            ATTR_ACCOUNT_ID: data.get("account_id"),
-            ATTR_IS_PREMIUM: data.get("is_premium"),
-            ATTR_BASE_FOLDER_UUID: data.get("base_folder_uuid"),
-            ATTR_AVATAR_URL: data.get("avatar_url"),
-            ATTR_DISPLAY_NAME: data.get("display_name"),
-            ATTR_NICK_NAME: data.get("nick_name"),
-            ATTR_PLAN_NAMES: data.get("plan_names"),
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the files behind the value, if the sensor lists any."""
+        top_files_fn = self.entity_description.top_files_fn
+        if top_files_fn is None or self.coordinator.data is None:
+            return None
+        return {
+            ATTR_TOP_FILES: [
+                {"name": file.name, "path": file.path, "size": file.size}
+                for file in top_files_fn(self.coordinator.data)
+            ]
         }
-        return {key: value for key, value in attrs.items() if value not in (None, "", [])}
+
+
+class FilenFolderSizeSensor(
+    CoordinatorEntity[FilenFolderSizeCoordinator], SensorEntity
+):
+    """Sensor representing the recursive size of one configured folder."""
+
+    _attr_has_entity_name = True
+    _attr_translation_key = "folder_size"
+    _attr_native_unit_of_measurement = UnitOfInformation.GIGABYTES
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+
+    def __init__(
+        self,
+        coordinator: FilenFolderSizeCoordinator,
+        entry: FilenConfigEntry,
+        folder_uuid: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._folder_uuid = folder_uuid
+        self._attr_unique_id = f"{entry.entry_id}_folder_{folder_uuid}"
+        self._attr_translation_placeholders = {"folder": folder_uuid[:8]}
+        self._attr_device_info = _device_info(entry)
+        self._update_from_coordinator()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the cached folder values, then write state."""
+        self._update_from_coordinator()
+        super()._handle_coordinator_update()
+
+    def _update_from_coordinator(self) -> None:
+        """Compute the folder size and attributes from the latest scan."""
+        folder = (self.coordinator.data or {}).get(self._folder_uuid)
+        if folder is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = {ATTR_FOLDER_UUID: self._folder_uuid}
+            return
+        self._attr_native_value = _bytes_to_gigabytes(folder.size)
+        self._attr_extra_state_attributes = {
+            ATTR_FOLDER_UUID: folder.uuid,
+            ATTR_FILES: folder.files,
+            ATTR_FOLDERS: folder.folders,
+        }
+
+
+class FilenMetricSensor(SensorEntity):
+    """Diagnostic sensor exposing one Filen client request metric."""
+
+    entity_description: FilenMetricSensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        metrics: FilenMetrics,
+        entry: FilenConfigEntry,
+        description: FilenMetricSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._metrics = metrics
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = _device_info(entry)
+
+    @property
+    def native_value(self) -> Any:
+        """Return the metric value."""
+        return self.entity_description.value_fn(self._metrics)
@@ -0,0 +1,313 @@
+"""Services for the Filen integration."""
+
+from __future__ import annotations
+
+from contextlib import aclosing
+import os
+import time
+from typing import BinaryIO
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import (
+    ConfigEntryAuthFailed,
+    HomeAssistantError,
+    ServiceValidationError,
+)
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .client import FilenApiError, FilenClient, FilenFile
+from .const import (
+    ATTR_ACCOUNT_DETAILS,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_DIRECTORY,
+    ATTR_FILE_UUID,
+    ATTR_FILENAME,
+    ATTR_LIMIT,
+    ATTR_OVERWRITE,
+    ATTR_QUERY,
+    ATTR_STORAGE,
+    DOMAIN,
+    DOWNLOAD_PROGRESS_INTERVAL,
+    EVENT_DOWNLOAD_PROGRESS,
+    REFRESH_MODE_CACHED,
+    REFRESH_MODE_FRESH,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+    SERVICE_DOWNLOAD_FILE,
+    SERVICE_EMPTY_TRASH,
+    SERVICE_REFRESH,
+    SERVICE_SEARCH,
+)
+from .coordinator import FilenConfigEntry
+
+SERVICE_EMPTY_TRASH_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string}
+)
+
+SERVICE_DOWNLOAD_FILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_FILE_UUID): cv.string,
+        vol.Optional(ATTR_DIRECTORY): cv.string,
+        vol.Optional(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_OVERWRITE, default=False): cv.boolean,
+    }
+)
+
+SERVICE_SEARCH_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_QUERY): vol.All(cv.string, vol.Length(min=1)),
+        vol.Optional(ATTR_LIMIT, default=SEARCH_DEFAULT_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=SEARCH_MAX_LIMIT)
+        ),
+    }
+)
+
+SERVICE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_STORAGE, default=REFRESH_MODE_FRESH): vol.In(
+            (REFRESH_MODE_CACHED, REFRESH_MODE_FRESH)
+        ),
+        vol.Optional(ATTR_ACCOUNT_DETAILS, default=REFRESH_MODE_CACHED): vol.In(
+            (REFRESH_MODE_CACHED, REFRESH_MODE_FRESH)
+        ),
+    }
+)
+
+
+@callback
+def _async_get_entry(hass: HomeAssistant, call: ServiceCall) -> FilenConfigEntry:
+    """Return the loaded config entry a service call targets."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(f"Unknown Filen config entry: {entry_id}")
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(f"Filen config entry {entry.title} is not loaded")
+    return entry
+
+
+async def _async_empty_trash(call: ServiceCall) -> None:
+    """Empty the trash of a Filen account and refresh affected sensors."""
+    entry = _async_get_entry(call.hass, call)
+    runtime_data = entry.runtime_data
+    try:
+        await runtime_data.client.async_empty_trash()
+    except FilenApiError as err:
+        raise HomeAssistantError(f"Could not empty the Filen trash: {err}") from err
+
+    await runtime_data.coordinator.async_request_refresh()
+    if runtime_data.trash_coordinator is not None:
+        await runtime_data.trash_coordinator.async_request_refresh()
+
+
+async def _async_download_file(call: ServiceCall) -> ServiceResponse:
+    """Download a Filen file to a local directory."""
+    hass = call.hass
+    entry = _async_get_entry(hass, call)
+    client = entry.runtime_data.client
+
+    directory = call.data.get(ATTR_DIRECTORY) or next(
+        iter(hass.config.media_dirs.values()), hass.config.path("media")
+    )
+    if not await hass.async_add_executor_job(hass.config.is_allowed_path, directory):
+        raise ServiceValidationError(
+            f"Cannot write to {directory}; add it to allowlist_external_dirs"
+        )
+
+    try:
+        file = await client.async_get_file(call.data[ATTR_FILE_UUID])
+    except FilenApiError as err:
+        raise HomeAssistantError(f"Could not find the Filen file: {err}") from err
+
+    filename = os.path.basename(call.data.get(ATTR_FILENAME) or file.name) or file.uuid
+    path = os.path.join(directory, filename)
+    # A name like ".." or a symlink inside the directory can point elsewhere.
+    if not await hass.async_add_executor_job(hass.config.is_allowed_path, path):
+        raise ServiceValidationError(
+            f"Cannot write to {path}; it is outside allowlist_external_dirs"
+        )
+    if not call.data[ATTR_OVERWRITE] and await hass.async_add_executor_job(
+        os.path.exists, path
+    ):
+        raise ServiceValidationError(f"{path} already exists")
+
+    started = time.monotonic()
+    try:
+        downloaded = await _async_write_file(hass, entry, client, file, path)
+    except FilenApiError as err:
+        raise HomeAssistantError(f"Could not download the Filen file: {err}") from err
+    except OSError as err:
+        raise HomeAssistantError(f"Could not write {path}: {err}") from err
+
+    seconds = max(time.monotonic() - started, 1e-3)
+    return {
+        "path": path,
+        "size": downloaded,
+        "seconds": round(seconds, 3),
+        "bytes_per_second": round(downloaded / seconds),
+    }
+
+
+async def _async_write_file(
+    hass: HomeAssistant,
+    entry: FilenConfigEntry,
+    client: FilenClient,
+    file: FilenFile,
+    path: str,
+) -> int:
+    """Stream a file to disk in order, firing throttled progress events.
+
+    Chunks arrive in order from the client's bounded prefetch window and are
+    written in an executor while later chunks download. Data goes to a
+    temporary file that only replaces ``path`` once the download completed
+    with as many bytes as the file's metadata states. Returns the number of
+    bytes written.
+    """
+    temp_path = f"{path}.part"
+    started = last_report = time.monotonic()
+    downloaded = 0
+
+    def _fire_progress(done: bool) -> None:
+        elapsed = max(time.monotonic() - started, 1e-3)
+        hass.bus.async_fire(
+            EVENT_DOWNLOAD_PROGRESS,
+            {
+                "entry_id": entry.entry_id,
+                ATTR_FILE_UUID: file.uuid,
+                "path": path,
+                "downloaded": downloaded,
+                "size": file.size,
+                "percentage": (
+                    round(downloaded / file.size * 100, 1) if file.size else 100.0
+                ),
+                "bytes_per_second": round(downloaded / elapsed),
+                "done": done,
+            },
+        )
+
+    def _open() -> BinaryIO:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return open(temp_path, "wb")  # noqa: SIM115 - closed in the finally below
+
+    fp = await hass.async_add_executor_job(_open)
+    completed = False
+    try:
+        # Closing the iterator at once cancels chunks still being prefetched.
+        async with aclosing(client.async_iter_file(file)) as chunks:
+            async for chunk in chunks:
+                await hass.async_add_executor_job(fp.write, chunk)
+                downloaded += len(chunk)
+                if time.monotonic() - last_report >= DOWNLOAD_PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    _fire_progress(False)
+        if downloaded != file.size:
+            raise HomeAssistantError(
+                f"Downloaded {downloaded} bytes of {file.name}, expected {file.size}"
+            )
+        completed = True
+    finally:
+        await hass.async_add_executor_job(fp.close)
+        if completed:
+            await hass.async_add_executor_job(os.replace, temp_path, path)
+        else:
+            await hass.async_add_executor_job(_remove_file, temp_path)
+    _fire_progress(True)
+    return downloaded
+
+
+async def _async_search(call: ServiceCall) -> ServiceResponse:
+    """Search file names in the local drive index."""
+    entry = _async_get_entry(call.hass, call)
+    index_coordinator = entry.runtime_data.index_coordinator
+    if index_coordinator is None:
+        raise ServiceValidationError(
+            f"Enable the drive index in the options of {entry.title} to search it"
+        )
+    files = await index_coordinator.async_search(
+        call.data[ATTR_QUERY], call.data[ATTR_LIMIT]
+    )
+    return {"files": [file.as_dict() for file in files]}
+
+
+async def _async_refresh(call: ServiceCall) -> ServiceResponse:
+    """Return the account snapshot, fetching fresh data if requested.
+
+    /v3/user/info is fetched whenever either endpoint is requested fresh;
+    /v3/user/account details are only refetched when they are requested
+    fresh and otherwise come from the client's daily cache.
+    """
+    entry = _async_get_entry(call.hass, call)
+    coordinator = entry.runtime_data.coordinator
+    force_account_details = call.data[ATTR_ACCOUNT_DETAILS] == REFRESH_MODE_FRESH
+    fetched = force_account_details or call.data[ATTR_STORAGE] == REFRESH_MODE_FRESH
+
+    if fetched:
+        try:
+            data = await coordinator.async_refresh_on_demand(
+                force_account_details=force_account_details
+            )
+        except ConfigEntryAuthFailed as err:
+            entry.async_start_reauth(call.hass)
+            raise HomeAssistantError(f"Filen authentication failed: {err}") from err
+        except UpdateFailed as err:
+            raise HomeAssistantError(str(err)) from err
+    elif (data := coordinator.data) is None:
+        raise HomeAssistantError(f"No Filen data for {entry.title} yet")
+
+    return {
+        **data.as_dict(),
+        "plan_names": list(data.plan_names),
+        "fetched": fetched,
+    }
+
+
+def _remove_file(path: str) -> None:
+    """Remove a file if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Filen services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EMPTY_TRASH,
+        _async_empty_trash,
+        schema=SERVICE_EMPTY_TRASH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DOWNLOAD_FILE,
+        _async_download_file,
+        schema=SERVICE_DOWNLOAD_FILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEARCH,
+        _async_search,
+        schema=SERVICE_SEARCH_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        _async_refresh,
+        schema=SERVICE_REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,195 @@
+"""Fixtures for Filen integration tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Coroutine, Generator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, TypeVar
+from unittest.mock import patch
+
+import aiohttp
+from homeassistant import loader
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.filen.client import FilenClient
+from custom_components.filen.const import CONF_API_KEY, DOMAIN
+
+from .gateway import FakeAccount, FakeFilenGateway
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+EMAIL = "user@example.com"
+PASSWORD = "correct horse battery staple"
+
+_T = TypeVar("_T")
+
+
+@pytest.fixture
+async def gateway(socket_enabled: None) -> AsyncGenerator[FakeFilenGateway]:
+    """Run a stand-in Filen gateway on the test's event loop."""
+    gateway = FakeFilenGateway()
+    await gateway.start()
+    yield gateway
+    await gateway.close()
+
+
+@pytest.fixture
+def account(gateway: FakeFilenGateway) -> FakeAccount:
+    """Return an auth version 2 account on the stand-in gateway."""
+    return gateway.add_account(EMAIL, PASSWORD)
+
+
+@pytest.fixture
+async def session() -> AsyncGenerator[aiohttp.ClientSession]:
+    """Return a client session that is closed after the test."""
+    session = aiohttp.ClientSession()
+    yield session
+    await session.close()
+
+
+@pytest.fixture
+def client(
+    gateway: FakeFilenGateway, account: FakeAccount, session: aiohttp.ClientSession
+) -> FilenClient:
+    """Return a client for the stand-in account."""
+    return gateway.client(session, account)
+
+
+@contextmanager
+def _patch_clients(gateway: FakeFilenGateway) -> Generator[None]:
+    """Point clients created by the integration at ``gateway``.
+
+    The shared request budget is lifted so tests are not paced by it.
+    """
+    with (
+        patch(
+            "custom_components.filen.FilenClient",
+            partial(
+                FilenClient,
+                base_url=gateway.url,
+                ingest_url=gateway.url,
+                egest_url=gateway.url,
+            ),
+        ),
+        patch("custom_components.filen.GATEWAY_REQUESTS_PER_SECOND", 10_000),
+    ):
+        yield
+
+
+@pytest.fixture
+def gateway_clients(gateway: FakeFilenGateway) -> Generator[None]:
+    """Point clients created by the integration at the stand-in gateway."""
+    with _patch_clients(gateway):
+        yield
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant, account: FakeAccount) -> MockConfigEntry:
+    """Return a config entry for the stand-in account."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=f"Filen ({EMAIL})",
+        unique_id=EMAIL,
+        data={CONF_EMAIL: EMAIL, CONF_PASSWORD: PASSWORD, CONF_API_KEY: account.api_key},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+async def setup_integration(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    gateway_clients: None,
+    config_entry: MockConfigEntry,
+) -> MockConfigEntry:
+    """Set up the integration for the stand-in account."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return config_entry
+
+
+@dataclass
+class BenchmarkLoop:
+    """An event loop with a stand-in gateway for synchronous benchmarks.
+
+    pytest-benchmark calls the benchmarked function synchronously, so each
+    benchmark owns a loop and runs one coroutine per round on it.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    gateway: FakeFilenGateway
+    session: aiohttp.ClientSession
+
+    def run(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        """Run a coroutine to completion on the benchmark loop."""
+        return self.loop.run_until_complete(coro)
+
+
+@pytest.fixture
+def bench_loop(socket_enabled: None) -> Generator[BenchmarkLoop]:
+    """Return a private event loop running a stand-in gateway."""
+    loop = asyncio.new_event_loop()
+    gateway = FakeFilenGateway()
+    loop.run_until_complete(gateway.start())
+
+    async def _async_create_session() -> aiohttp.ClientSession:
+        return aiohttp.ClientSession()
+
+    session = loop.run_until_complete(_async_create_session())
+    yield BenchmarkLoop(loop, gateway, session)
+    loop.run_until_complete(session.close())
+    loop.run_until_complete(gateway.close())
+    loop.run_until_complete(loop.shutdown_default_executor())
+    loop.close()
+
+
+@pytest.fixture
+def bench_hass(
+    bench_loop: BenchmarkLoop, hass_storage: dict[str, Any]
+) -> Generator[HomeAssistant]:
+    """Return Home Assistant running on the benchmark loop.
+
+    Custom integrations are enabled and the integration's clients talk to the
+    benchmark loop's stand-in gateway.
+    """
+    context = async_test_home_assistant()
+    hass = bench_loop.run(context.__aenter__())
+    hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+    try:
+        with _patch_clients(bench_loop.gateway):
+            yield hass
+    finally:
+        bench_loop.run(hass.async_stop(force=True))
+        bench_loop.run(context.__aexit__(None, None, None))
+
+
+def add_entries(
+    hass: HomeAssistant, gateway: FakeFilenGateway, count: int
+) -> list[MockConfigEntry]:
+    """Add config entries for ``count`` new accounts with stored API keys."""
+    entries = []
+    for index in range(count):
+        account = gateway.add_account(f"user{index}@example.com", PASSWORD)
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Filen ({account.email})",
+            unique_id=account.email,
+            data={
+                CONF_EMAIL: account.email,
+                CONF_PASSWORD: PASSWORD,
+                CONF_API_KEY: account.api_key,
+            },
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+    return entries
@@ -0,0 +1,492 @@
+"""In-process stand-in for the Filen gateway and file servers.
+
+One ``aiohttp.web`` server answers gateway, ingest and egest requests, so a
+``FilenClient`` can be pointed at it with ``base_url``, ``ingest_url`` and
+``egest_url``. Accounts keep their drive in memory, and tests can add latency
+or queue failures per path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+import hashlib
+import json
+import secrets
+import time
+from typing import Any
+from uuid import uuid4
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.filen.client import FilenClient
+from custom_components.filen.crypto import (
+    CHUNK_SIZE,
+    FILE_VERSION_2,
+    FILE_VERSION_3,
+    encrypt_chunk,
+    encrypt_metadata,
+    generate_key,
+    hash_name,
+)
+
+REGION = "de-1"
+BUCKET = "filen-1"
+
+
+@dataclass
+class FakeAccount:
+    """A Filen account and its drive as the stand-in gateway sees it."""
+
+    email: str
+    password: str
+    auth_version: int = 2
+    two_factor_code: str | None = None
+    salt: str = field(default_factory=lambda: secrets.token_hex(32))
+    api_key: str = field(default_factory=lambda: secrets.token_hex(32))
+    account_id: int = field(default_factory=lambda: secrets.randbelow(1_000_000))
+    storage_used: int = 1_000_000
+    max_storage: int = 10_000_000_000
+    base_folder_uuid: str = field(default_factory=lambda: str(uuid4()))
+    # UUID -> folder record as returned by /v3/dir/content.
+    folders: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # UUID -> file record as returned by /v3/dir/content.
+    files: dict[str, dict[str, Any]] = field(default_factory=dict)
+    trash: list[dict[str, Any]] = field(default_factory=list)
+    events: list[dict[str, Any]] = field(default_factory=list)
+    _credentials: tuple[str, str] | None = None
+
+    @property
+    def credentials(self) -> tuple[str, str]:
+        """Return the (master key, login password) the client will derive."""
+        if self._credentials is None:
+            self._credentials = FilenClient._derive_credentials(
+                self.password, self.salt, self.auth_version
+            )
+        return self._credentials
+
+    @property
+    def master_key(self) -> str:
+        """Return the account's only master key."""
+        return self.credentials[0]
+
+    def add_event(self, event_type: str, **info: Any) -> dict[str, Any]:
+        """Record an account event, newest last."""
+        event = {
+            "id": len(self.events) + 1,
+            "type": event_type,
+            "timestamp": int(time.time()),
+            "info": info,
+        }
+        self.events.append(event)
+        return event
+
+
+class FakeFilenGateway:
+    """Serve the Filen endpoints the integration uses from memory."""
+
+    def __init__(self) -> None:
+        """Initialize the gateway without starting it."""
+        self.accounts: dict[str, FakeAccount] = {}
+        self.chunks: dict[tuple[str, int], bytes] = {}
+        # File UUID -> parent folder of uploads that are not finished yet.
+        self._pending_parents: dict[str, str] = {}
+        # Method and path of every request received, including failed ones.
+        self.requests: Counter[tuple[str, str]] = Counter()
+        # Seconds every request waits before it is answered.
+        self.latency = 0.0
+        self.events_page_size = 50
+        # JSON requests whose Checksum header matched their body.
+        self.checksums_verified = 0
+        # Path -> queued injected answers as (HTTP status, headers, error code).
+        self._failures: dict[
+            str, list[tuple[int, dict[str, str], str | None]]
+        ] = defaultdict(list)
+        self._server: TestServer | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the running server."""
+        assert self._server is not None
+        return str(self._server.make_url("")).rstrip("/")
+
+    async def start(self) -> None:
+        """Start serving on a free local port."""
+        # Encrypted chunks are slightly larger than aiohttp's default limit.
+        app = web.Application(
+            middlewares=[self._middleware], client_max_size=2 * CHUNK_SIZE
+        )
+        app.router.add_post("/v3/auth/info", self._auth_info)
+        app.router.add_post("/v3/login", self._login)
+        app.router.add_get("/v3/user/info", self._user_info)
+        app.router.add_get("/v3/user/account", self._user_account)
+        app.router.add_post("/v3/user/masterKeys", self._master_keys)
+        app.router.add_post("/v3/user/events", self._user_events)
+        app.router.add_post("/v3/dir/content", self._dir_content)
+        app.router.add_post("/v3/dir/size", self._dir_size)
+        app.router.add_post("/v3/dir/exists", self._dir_exists)
+        app.router.add_post("/v3/dir/create", self._dir_create)
+        app.router.add_post("/v3/file", self._file)
+        app.router.add_post("/v3/file/delete/permanent", self._file_delete)
+        app.router.add_post("/v3/trash/empty", self._trash_empty)
+        app.router.add_post("/v3/upload", self._upload_chunk)
+        app.router.add_post("/v3/upload/done", self._upload_done)
+        app.router.add_get("/{region}/{bucket}/{uuid}/{index}", self._download_chunk)
+        self._server = TestServer(app)
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            await self._server.close()
+            self._server = None
+
+    def client(
+        self, session: aiohttp.ClientSession, account: FakeAccount, **kwargs: Any
+    ) -> FilenClient:
+        """Return a client for an account that talks to this gateway."""
+        return FilenClient(
+            session=session,
+            email=account.email,
+            password=account.password,
+            base_url=self.url,
+            ingest_url=self.url,
+            egest_url=self.url,
+            **kwargs,
+        )
+
+    def add_account(self, email: str, password: str, **kwargs: Any) -> FakeAccount:
+        """Create an account."""
+        account = FakeAccount(email=email, password=password, **kwargs)
+        self.accounts[email.lower()] = account
+        return account
+
+    def add_folder(self, account: FakeAccount, parent: str, name: str) -> str:
+        """Create a folder and return its UUID."""
+        folder_uuid = str(uuid4())
+        account.folders[folder_uuid] = {
+            "uuid": folder_uuid,
+            "parent": parent,
+            "name": encrypt_metadata(json.dumps({"name": name}), account.master_key),
+            "nameHashed": hash_name(name),
+        }
+        return folder_uuid
+
+    def add_file(
+        self,
+        account: FakeAccount,
+        parent: str,
+        name: str,
+        content: bytes,
+        *,
+        mime: str = "application/octet-stream",
+        last_modified: int = 0,
+        version: int = FILE_VERSION_2,
+    ) -> str:
+        """Encrypt and store a file and return its UUID."""
+        file_uuid = str(uuid4())
+        key = secrets.token_hex(32) if version == FILE_VERSION_3 else generate_key()
+        chunks = 0
+        for chunks, offset in enumerate(range(0, len(content), CHUNK_SIZE), 1):
+            self.chunks[(file_uuid, chunks - 1)] = encrypt_chunk(
+                content[offset : offset + CHUNK_SIZE], key, version
+            )
+        metadata = {
+            "name": name,
+            "size": len(content),
+            "mime": mime,
+            "key": key,
+            "lastModified": last_modified,
+        }
+        account.files[file_uuid] = {
+            "uuid": file_uuid,
+            "parent": parent,
+            "metadata": encrypt_metadata(json.dumps(metadata), account.master_key),
+            "chunks": chunks,
+            "size": len(content),
+            "version": version,
+            "region": REGION,
+            "bucket": BUCKET,
+        }
+        return file_uuid
+
+    def fail(
+        self,
+        path: str,
+        status: int = 503,
+        *,
+        times: int = 1,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Answer the next ``times`` requests to ``path`` with ``status``."""
+        self._failures[path].extend([(status, headers or {}, None)] * times)
+
+    def reject(self, path: str, code: str, *, times: int = 1) -> None:
+        """Answer the next ``times`` requests to ``path`` with an error envelope."""
+        self._failures[path].extend([(200, {}, code)] * times)
+
+    def count(self, path: str, method: str = "POST") -> int:
+        """Return how many requests reached ``path``."""
+        return self.requests[(method, path)]
+
+    @web.middleware
+    async def _middleware(
+        self, request: web.Request, handler: Any
+    ) -> web.StreamResponse:
+        """Count requests, apply latency and injected failures, check checksums."""
+        self.requests[(request.method, request.path)] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if failures := self._failures.get(request.path):
+            status, headers, code = failures.pop(0)
+            if code is not None:
+                return _error(code, "injected")
+            return web.Response(status=status, headers=headers, text="injected")
+        if request.content_type == "application/json":
+            body = await request.read()
+            if request.headers.get("Checksum") != hashlib.sha512(body).hexdigest():
+                return _error("invalid_checksum", "Request checksum mismatch")
+            self.checksums_verified += 1
+        return await handler(request)
+
+    def _authenticated_account(self, request: web.Request) -> FakeAccount:
+        """Return the account owning the request's API key."""
+        api_key = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        for account in self.accounts.values():
+            if api_key == account.api_key:
+                return account
+        raise web.HTTPUnauthorized(text="API key not found")
+
+    def _account(self, email: str) -> FakeAccount | None:
+        """Return an account by email."""
+        return self.accounts.get(str(email).lower())
+
+    async def _auth_info(self, request: web.Request) -> web.Response:
+        """Return the auth version and salt of an account."""
+        body = await request.json()
+        account = self._account(body["email"])
+        if account is None:
+            return _ok({"authVersion": 2, "salt": secrets.token_hex(32)})
+        return _ok({"authVersion": account.auth_version, "salt": account.salt})
+
+    async def _login(self, request: web.Request) -> web.Response:
+        """Check the derived password and two-factor code and return the API key."""
+        body = await request.json()
+        account = self._account(body["email"])
+        if account is None or body["password"] != account.credentials[1]:
+            return _error("email_or_password_wrong", "Invalid email or password")
+        if (
+            account.two_factor_code is not None
+            and body["twoFactorCode"] != account.two_factor_code
+        ):
+            return _error("enter_2fa", "Invalid two-factor code")
+        return _ok({"apiKey": account.api_key})
+
+    async def _user_info(self, request: web.Request) -> web.Response:
+        """Return storage usage and account identifiers."""
+        account = self._authenticated_account(request)
+        return _ok(
+            {
+                "id": account.account_id,
+                "email": account.email,
+                "storageUsed": account.storage_used,
+                "maxStorage": account.max_storage,
+                "isPremium": 1,
+                "baseFolderUUID": account.base_folder_uuid,
+                "avatarURL": None,
+            }
+        )
+
+    async def _user_account(self, request: web.Request) -> web.Response:
+        """Return plan and profile details."""
+        account = self._authenticated_account(request)
+        return _ok(
+            {
+                "email": account.email,
+                "storage": account.storage_used,
+                "maxStorage": account.max_storage,
+                "isPremium": 1,
+                "plans": [{"name": "Pro I"}],
+                "displayName": "Stand-in",
+                "nickName": None,
+            }
+        )
+
+    async def _master_keys(self, request: web.Request) -> web.Response:
+        """Return the account's master keys encrypted with the newest one."""
+        account = self._authenticated_account(request)
+        await request.json()
+        return _ok({"keys": encrypt_metadata(account.master_key, account.master_key)})
+
+    async def _user_events(self, request: web.Request) -> web.Response:
+        """Return a page of events at or before lastTimestamp, newest first."""
+        account = self._authenticated_account(request)
+        last_timestamp = (await request.json())["lastTimestamp"]
+        events = [
+            event
+            for event in reversed(account.events)
+            if event["timestamp"] <= last_timestamp
+        ]
+        return _ok({"events": events[: self.events_page_size]})
+
+    async def _dir_content(self, request: web.Request) -> web.Response:
+        """List a folder, or the trash."""
+        account = self._authenticated_account(request)
+        folder_uuid = (await request.json())["uuid"]
+        if folder_uuid == "trash":
+            return _ok(
+                {
+                    "folders": [item for item in account.trash if "name" in item],
+                    "uploads": [item for item in account.trash if "metadata" in item],
+                }
+            )
+        return _ok(
+            {
+                "folders": [
+                    folder
+                    for folder in account.folders.values()
+                    if folder["parent"] == folder_uuid
+                ],
+                "uploads": [
+                    file
+                    for file in account.files.values()
+                    if file["parent"] == folder_uuid
+                ],
+            }
+        )
+
+    async def _dir_size(self, request: web.Request) -> web.Response:
+        """Return the size of the files directly inside a folder."""
+        account = self._authenticated_account(request)
+        folder_uuid = (await request.json())["uuid"]
+        files = [
+            file for file in account.files.values() if file["parent"] == folder_uuid
+        ]
+        return _ok(
+            {
+                "size": sum(file["size"] for file in files),
+                "files": len(files),
+                "folders": sum(
+                    folder["parent"] == folder_uuid
+                    for folder in account.folders.values()
+                ),
+            }
+        )
+
+    async def _dir_exists(self, request: web.Request) -> web.Response:
+        """Look up a subfolder by hashed name."""
+        account = self._authenticated_account(request)
+        body = await request.json()
+        for folder in account.folders.values():
+            if (
+                folder["parent"] == body["parent"]
+                and folder["nameHashed"] == body["nameHashed"]
+            ):
+                return _ok({"exists": True, "uuid": folder["uuid"]})
+        return _ok({"exists": False, "uuid": ""})
+
+    async def _dir_create(self, request: web.Request) -> web.Response:
+        """Create a folder."""
+        account = self._authenticated_account(request)
+        body = await request.json()
+        account.folders[body["uuid"]] = {
+            "uuid": body["uuid"],
+            "parent": body["parent"],
+            "name": body["name"],
+            "nameHashed": body["nameHashed"],
+        }
+        account.add_event("subFolderCreated", uuid=body["uuid"], parent=body["parent"])
+        return _ok({})
+
+    async def _file(self, request: web.Request) -> web.Response:
+        """Return one file's metadata and storage location."""
+        account = self._authenticated_account(request)
+        file = account.files.get((await request.json())["uuid"])
+        if file is None:
+            return _error("file_not_found", "File not found")
+        return _ok(
+            {
+                key: file[key]
+                for key in ("metadata", "chunks", "region", "bucket", "version")
+            }
+        )
+
+    async def _file_delete(self, request: web.Request) -> web.Response:
+        """Delete a file and its chunks."""
+        account = self._authenticated_account(request)
+        file = account.files.pop((await request.json())["uuid"], None)
+        if file is None:
+            return _error("file_not_found", "File not found")
+        for index in range(file["chunks"]):
+            self.chunks.pop((file["uuid"], index), None)
+        account.storage_used -= file["size"]
+        account.add_event("fileRm", uuid=file["uuid"], parent=file["parent"])
+        return _ok({})
+
+    async def _trash_empty(self, request: web.Request) -> web.Response:
+        """Delete everything in the trash."""
+        account = self._authenticated_account(request)
+        account.storage_used -= sum(item.get("size", 0) for item in account.trash)
+        account.trash.clear()
+        account.add_event("deleteAll")
+        return _ok({})
+
+    async def _upload_chunk(self, request: web.Request) -> web.Response:
+        """Store one encrypted chunk after checking its hash."""
+        self._authenticated_account(request)
+        body = await request.read()
+        query = request.query
+        if hashlib.sha512(body).hexdigest() != query["hash"]:
+            return _error("invalid_hash", "Chunk hash mismatch")
+        self.chunks[(query["uuid"], int(query["index"]))] = body
+        self._pending_parents[query["uuid"]] = query["parent"]
+        return _ok({"region": REGION, "bucket": BUCKET})
+
+    async def _upload_done(self, request: web.Request) -> web.Response:
+        """Turn uploaded chunks into a file."""
+        account = self._authenticated_account(request)
+        body = await request.json()
+        parent = self._pending_parents.pop(body["uuid"], None)
+        if parent is None or any(
+            (body["uuid"], index) not in self.chunks for index in range(body["chunks"])
+        ):
+            return _error("upload_incomplete", "Not all chunks were uploaded")
+        size = sum(
+            len(self.chunks[(body["uuid"], index)]) for index in range(body["chunks"])
+        )
+        account.files[body["uuid"]] = {
+            "uuid": body["uuid"],
+            "parent": parent,
+            "metadata": body["metadata"],
+            "chunks": body["chunks"],
+            "size": size,
+            "version": body["version"],
+            "region": REGION,
+            "bucket": BUCKET,
+        }
+        account.storage_used += size
+        account.add_event("fileUploaded", uuid=body["uuid"], parent=parent)
+        return _ok({})
+
+    async def _download_chunk(self, request: web.Request) -> web.Response:
+        """Return one encrypted chunk."""
+        self._authenticated_account(request)
+        chunk = self.chunks.get(
+            (request.match_info["uuid"], int(request.match_info["index"]))
+        )
+        if chunk is None:
+            raise web.HTTPNotFound
+        return web.Response(body=chunk, content_type="application/octet-stream")
+
+
+def _ok(data: Any) -> web.Response:
+    """Return a successful Filen response envelope."""
+    return web.json_response({"status": True, "message": "", "data": data})
+
+
+def _error(code: str, message: str) -> web.Response:
+    """Return a failed Filen response envelope."""
+    return web.json_response({"status": False, "code": code, "message": message})
@@ -0,0 +1,83 @@
+"""Tests for the Filen backup agent against the stand-in gateway."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+from homeassistant.components.backup import AgentBackup, BackupAgentError
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.filen.backup import FilenBackupAgent
+from custom_components.filen.crypto import CHUNK_SIZE
+
+from .gateway import FakeFilenGateway
+
+# Three chunks, the last one short.
+CONTENT = bytes(range(256)) * ((2 * CHUNK_SIZE + 4096) // 256)
+
+BACKUP = AgentBackup(
+    addons=[],
+    backup_id="abc123",
+    date="2026-01-01T00:00:00+00:00",
+    database_included=True,
+    extra_metadata={},
+    folders=[],
+    homeassistant_included=True,
+    homeassistant_version="2026.1.0",
+    name="Automatic backup",
+    protected=False,
+    size=len(CONTENT),
+)
+
+
+async def _async_open_stream() -> AsyncIterator[bytes]:
+    """Return the backup content in pieces smaller than a chunk."""
+
+    async def _async_iter() -> AsyncIterator[bytes]:
+        for offset in range(0, len(CONTENT), 65_536):
+            yield CONTENT[offset : offset + 65_536]
+
+    return _async_iter()
+
+
+@pytest.fixture
+def agent(hass: HomeAssistant, setup_integration: MockConfigEntry) -> FilenBackupAgent:
+    """Return a backup agent for the set up entry."""
+    return FilenBackupAgent(hass, setup_integration)
+
+
+async def test_backup_round_trip(agent: FilenBackupAgent) -> None:
+    """An uploaded backup is listed, downloaded unchanged and deleted."""
+    await agent.async_upload_backup(open_stream=_async_open_stream, backup=BACKUP)
+
+    assert await agent.async_list_backups() == [BACKUP]
+    downloaded = bytearray()
+    async for chunk in await agent.async_download_backup(BACKUP.backup_id):
+        downloaded += chunk
+    assert downloaded == CONTENT
+
+    await agent.async_delete_backup(BACKUP.backup_id)
+    assert await agent.async_list_backups() == []
+
+
+async def test_failed_backup_upload_resumes(
+    agent: FilenBackupAgent, gateway: FakeFilenGateway
+) -> None:
+    """A retried upload only sends the chunks that did not reach Filen."""
+    gateway.fail("/v3/upload", 400)
+
+    with pytest.raises(BackupAgentError):
+        await agent.async_upload_backup(open_stream=_async_open_stream, backup=BACKUP)
+    assert gateway.count("/v3/upload") == 3
+    assert await agent.async_list_backups() == []
+
+    await agent.async_upload_backup(open_stream=_async_open_stream, backup=BACKUP)
+
+    # One archive chunk again, plus the metadata sidecar.
+    assert gateway.count("/v3/upload") == 5
+    downloaded = bytearray()
+    async for chunk in await agent.async_download_backup(BACKUP.backup_id):
+        downloaded += chunk
+    assert downloaded == CONTENT
@@ -0,0 +1,315 @@
+"""Benchmarks of the client and coordinators against the stand-in gateway.
+
+Run ``pytest tests/test_benchmarks.py`` to see timings, or add
+``--benchmark-disable`` to run them once as plain tests. Every benchmark
+reports its median and 99th percentile round time in ``extra_info``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Generator
+import json
+import math
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from custom_components.filen import client as client_module
+from custom_components.filen.client import FilenApiError, FilenClient
+from custom_components.filen.coordinator import FilenDataUpdateCoordinator
+from custom_components.filen.crypto import CHUNK_SIZE
+
+from .conftest import EMAIL, PASSWORD, BenchmarkLoop, add_entries
+from .gateway import BUCKET, REGION
+
+
+@pytest.fixture(autouse=True)
+def round_percentiles(benchmark: BenchmarkFixture) -> Generator[None]:
+    """Add the nearest-rank p50 and p99 round times, in ms, to each benchmark."""
+    yield
+    if benchmark.stats is None:
+        return
+    rounds = benchmark.stats.stats.sorted_data
+    for name, percentile in (("p50_ms", 50), ("p99_ms", 99)):
+        rank = max(math.ceil(percentile / 100 * len(rounds)), 1)
+        benchmark.extra_info[name] = round(rounds[rank - 1] * 1000, 3)
+
+
+async def _async_max_loop_lag(task: asyncio.Future[object]) -> float:
+    """Return the longest the loop was blocked, in ms, while ``task`` ran."""
+    lag = 0.0
+    while not task.done():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lag = max(lag, (time.perf_counter() - started) * 1000 - 1)
+    await task
+    return lag
+
+
+def _decode_text_then_json(body: bytes) -> Any:
+    """Decode a body the way response.text() followed by response.json() did."""
+    body.decode("utf-8")
+    return json.loads(body.decode("utf-8"))
+
+
+def _peak_allocation_kib(function: Callable[[bytes], Any], body: bytes) -> float:
+    """Return the peak memory allocated while ``function`` decodes ``body``."""
+    tracemalloc.start()
+    try:
+        function(body)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize(
+    "decode",
+    [client_module._json_loads, _decode_text_then_json],
+    ids=["single_pass", "text_then_json"],
+)
+def test_response_decoding(
+    benchmark: BenchmarkFixture, decode: Callable[[bytes], Any]
+) -> None:
+    """Benchmark decoding a 2,000 entry folder listing body."""
+    body = json.dumps(
+        {
+            "status": True,
+            "message": "",
+            "data": {
+                "folders": [],
+                "uploads": [
+                    {
+                        "uuid": f"00000000-0000-0000-0000-{index:012}",
+                        "metadata": "002" + "x" * 200,
+                        "chunks": 1,
+                        "size": 1024,
+                        "region": REGION,
+                        "bucket": BUCKET,
+                    }
+                    for index in range(2000)
+                ],
+            },
+        }
+    ).encode("utf-8")
+
+    payload = benchmark(decode, body)
+
+    assert len(payload["data"]["uploads"]) == 2000
+    benchmark.extra_info["body_kib"] = round(len(body) / 1024, 1)
+    benchmark.extra_info["peak_kib"] = round(_peak_allocation_kib(decode, body), 1)
+
+
+def test_folder_listing_request(
+    benchmark: BenchmarkFixture, bench_loop: BenchmarkLoop
+) -> None:
+    """Benchmark one raw folder listing request for 500 files."""
+    account = bench_loop.gateway.add_account(EMAIL, PASSWORD)
+    for index in range(500):
+        bench_loop.gateway.add_file(
+            account, account.base_folder_uuid, f"file{index}.txt", b"x"
+        )
+    client = bench_loop.gateway.client(
+        bench_loop.session, account, api_key=account.api_key
+    )
+
+    payload = benchmark(
+        lambda: bench_loop.run(
+            client._request(
+                "POST", "/v3/dir/content", json={"uuid": account.base_folder_uuid}
+            )
+        )
+    )
+
+    assert len(payload["uploads"]) == 500
+
+
+@pytest.mark.parametrize("auth_version", [2, 3])
+def test_login(
+    benchmark: BenchmarkFixture, bench_loop: BenchmarkLoop, auth_version: int
+) -> None:
+    """Benchmark a cold login, including password derivation."""
+    account = bench_loop.gateway.add_account(
+        EMAIL, PASSWORD, auth_version=auth_version
+    )
+    # Derive the expected password outside of the measured rounds.
+    assert account.credentials
+    lags: list[float] = []
+
+    def _setup() -> tuple[tuple[FilenClient], dict[str, object]]:
+        # Each client derives into a cache of its own.
+        return (bench_loop.gateway.client(bench_loop.session, account),), {}
+
+    async def _async_login(client: FilenClient) -> None:
+        login = asyncio.ensure_future(client.authenticate())
+        lags.append(await _async_max_loop_lag(login))
+        assert client.api_key == account.api_key
+
+    benchmark.pedantic(
+        lambda client: bench_loop.run(_async_login(client)), setup=_setup, rounds=5
+    )
+    benchmark.extra_info["max_loop_lag_ms"] = round(max(lags), 2)
+
+
+def test_user_info_poll(
+    benchmark: BenchmarkFixture, bench_loop: BenchmarkLoop
+) -> None:
+    """Benchmark one account poll with a stored API key."""
+    account = bench_loop.gateway.add_account(EMAIL, PASSWORD)
+    client = bench_loop.gateway.client(
+        bench_loop.session, account, api_key=account.api_key
+    )
+
+    data = benchmark(lambda: bench_loop.run(client.async_get_account_data()))
+
+    assert data.storage_used == account.storage_used
+    # Account details are cached daily, so later polls only fetch user info.
+    assert bench_loop.gateway.count("/v3/user/account", "GET") == 1
+
+
+@pytest.mark.parametrize(
+    ("rejected", "verified"), [(False, 1), (True, 0)], ids=["accepted", "error_envelope"]
+)
+def test_json_request(
+    benchmark: BenchmarkFixture,
+    bench_loop: BenchmarkLoop,
+    rejected: bool,
+    verified: int,
+) -> None:
+    """Benchmark a checksummed JSON request that is accepted or rejected."""
+    gateway = bench_loop.gateway
+    account = gateway.add_account(EMAIL, PASSWORD)
+    client = gateway.client(bench_loop.session, account, api_key=account.api_key)
+    checksums: list[int] = []
+
+    def _setup() -> None:
+        if rejected:
+            gateway.reject("/v3/dir/content", "internal_error")
+        checksums.append(gateway.checksums_verified)
+
+    async def _async_list() -> None:
+        request = client._request(
+            "POST", "/v3/dir/content", json={"uuid": account.base_folder_uuid}
+        )
+        if not rejected:
+            await request
+            return
+        with pytest.raises(FilenApiError, match="injected"):
+            await request
+
+    benchmark.pedantic(lambda: bench_loop.run(_async_list()), setup=_setup, rounds=50)
+
+    # The rejected envelope is answered before the checksum is checked.
+    assert gateway.checksums_verified - checksums[-1] == verified
+
+
+def _setup_entries(
+    bench_loop: BenchmarkLoop, hass: HomeAssistant, count: int
+) -> list[FilenDataUpdateCoordinator]:
+    """Set up ``count`` new entries and return their account coordinators."""
+    entries = add_entries(hass, bench_loop.gateway, count)
+
+    async def _async_setup() -> None:
+        for entry in entries:
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    bench_loop.run(_async_setup())
+    return [entry.runtime_data.coordinator for entry in entries]
+
+
+@pytest.mark.parametrize(
+    "scenario", ["healthy", "slow", "flaky", "error_envelope"]
+)
+def test_coordinator_refresh(
+    benchmark: BenchmarkFixture,
+    bench_loop: BenchmarkLoop,
+    bench_hass: HomeAssistant,
+    monkeypatch: pytest.MonkeyPatch,
+    scenario: str,
+) -> None:
+    """Benchmark one account coordinator refresh over a degraded gateway."""
+    monkeypatch.setattr("custom_components.filen.client.RETRY_BACKOFF_BASE", 0)
+    gateway = bench_loop.gateway
+    (coordinator,) = _setup_entries(bench_loop, bench_hass, 1)
+    if scenario == "slow":
+        gateway.latency = 0.02
+
+    polls: list[int] = []
+
+    def _setup() -> None:
+        if scenario == "flaky":
+            gateway.fail("/v3/user/info", 503)
+        elif scenario == "error_envelope":
+            gateway.reject("/v3/user/info", "internal_error")
+        polls.append(gateway.count("/v3/user/info", "GET"))
+
+    benchmark.pedantic(
+        lambda: bench_loop.run(coordinator.async_refresh()), setup=_setup, rounds=50
+    )
+
+    assert coordinator.last_update_success is (scenario != "error_envelope")
+    # A 503 is retried once; an error envelope is not retried.
+    expected_polls = 2 if scenario == "flaky" else 1
+    assert gateway.count("/v3/user/info", "GET") - polls[-1] == expected_polls
+
+
+@pytest.mark.parametrize("accounts", [10, 50])
+def test_coordinator_refresh_many_accounts(
+    benchmark: BenchmarkFixture,
+    bench_loop: BenchmarkLoop,
+    bench_hass: HomeAssistant,
+    accounts: int,
+) -> None:
+    """Benchmark refreshing many account coordinators at once over a slow gateway."""
+    # Load the integration and its platforms before measuring memory per entry.
+    _setup_entries(bench_loop, bench_hass, 1)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        coordinators = _setup_entries(bench_loop, bench_hass, accounts)
+        loaded = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    bench_loop.gateway.latency = 0.02
+
+    async def _async_refresh_all() -> None:
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+
+    benchmark(lambda: bench_loop.run(_async_refresh_all()))
+
+    assert all(coordinator.last_update_success for coordinator in coordinators)
+    benchmark.extra_info["accounts"] = accounts
+    benchmark.extra_info["bytes_per_entry"] = loaded // accounts
+
+
+def test_chunk_download(
+    benchmark: BenchmarkFixture, bench_loop: BenchmarkLoop
+) -> None:
+    """Benchmark downloading and decrypting an 8 MiB file."""
+    account = bench_loop.gateway.add_account(EMAIL, PASSWORD)
+    content = bytes(range(256)) * (8 * CHUNK_SIZE // 256)
+    file_uuid = bench_loop.gateway.add_file(
+        account, account.base_folder_uuid, "bench.bin", content
+    )
+    client = bench_loop.gateway.client(
+        bench_loop.session, account, api_key=account.api_key
+    )
+    file = bench_loop.run(client.async_get_file(file_uuid))
+
+    async def _async_download() -> int:
+        return sum([len(chunk) async for chunk in client.async_iter_file(file)])
+
+    size = benchmark(lambda: bench_loop.run(_async_download()))
+
+    assert size == len(content)
+    if benchmark.stats is not None:
+        benchmark.extra_info["mib_per_second"] = round(
+            size / CHUNK_SIZE / benchmark.stats.stats.mean, 1
+        )
@@ -0,0 +1,139 @@
+"""Tests for the Filen API client against the stand-in gateway."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from custom_components.filen.client import FilenClient, FilenTransientError
+
+from .gateway import BUCKET, REGION, FakeAccount, FakeFilenGateway
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Retry without waiting."""
+    monkeypatch.setattr("custom_components.filen.client.RETRY_BACKOFF_BASE", 0)
+
+
+async def test_get_is_retried(
+    gateway: FakeFilenGateway, account: FakeAccount, client: FilenClient
+) -> None:
+    """Transient failures of GET requests are retried."""
+    client.api_key = account.api_key
+    gateway.fail("/v3/user/info", 503, times=2)
+
+    data = await client.async_get_account_data()
+
+    assert data.storage_used == account.storage_used
+    assert gateway.count("/v3/user/info", "GET") == 3
+    assert client.retry_count == 2
+
+
+async def test_non_idempotent_post_is_not_retried(
+    gateway: FakeFilenGateway, account: FakeAccount, client: FilenClient
+) -> None:
+    """A failed trash empty is sent once, since repeating it is not safe."""
+    client.api_key = account.api_key
+    gateway.fail("/v3/trash/empty", 503, times=4)
+
+    with pytest.raises(FilenTransientError):
+        await client.async_empty_trash()
+
+    assert gateway.count("/v3/trash/empty") == 1
+    assert client.retry_count == 0
+
+
+async def test_idempotent_post_is_retried(
+    gateway: FakeFilenGateway, account: FakeAccount, client: FilenClient
+) -> None:
+    """Read-only POST requests opt in to retries."""
+    client.api_key = account.api_key
+    gateway.fail("/v3/dir/content", 502)
+
+    usage = await client.async_get_trash_usage()
+
+    assert usage.items == 0
+    assert gateway.count("/v3/dir/content") == 2
+
+
+async def test_file_server_failures_do_not_open_circuit_breaker(
+    gateway: FakeFilenGateway, account: FakeAccount, client: FilenClient
+) -> None:
+    """Failing chunk downloads leave the gateway circuit breaker closed."""
+    client.api_key = account.api_key
+    file_uuid = gateway.add_file(
+        account, account.base_folder_uuid, "photo.jpg", b"jpeg"
+    )
+    file = await client.async_get_file(file_uuid)
+    gateway.fail(f"/{REGION}/{BUCKET}/{file_uuid}/0", 503, times=20)
+
+    for _ in range(3):
+        with pytest.raises(FilenTransientError):
+            async for _chunk in client.async_iter_file(file):
+                pass
+
+    assert client.circuit_breaker.state == "closed"
+    assert client.circuit_breaker.consecutive_failures == 0
+    assert (await client.async_get_account_data()).storage_used
+
+
+async def test_mutations_expire_cached_account_details(
+    gateway: FakeFilenGateway, account: FakeAccount, client: FilenClient
+) -> None:
+    """Account details are fetched again after a request changed the drive."""
+    client.api_key = account.api_key
+    await client.async_get_account_data()
+    await client.async_get_account_data()
+    assert gateway.count("/v3/user/account", "GET") == 1
+
+    await client.async_empty_trash()
+    await client.async_get_account_data()
+
+    assert gateway.count("/v3/user/account", "GET") == 2
+
+
+async def test_expired_account_details_are_kept_as_fallback(
+    gateway: FakeFilenGateway, account: FakeAccount, client: FilenClient
+) -> None:
+    """A failed refetch after a mutation still reports the cached details."""
+    client.api_key = account.api_key
+    await client.async_get_account_data()
+    client.invalidate_cache()
+    gateway.fail("/v3/user/account", 404)
+
+    data = await client.async_get_account_data()
+
+    assert data.plan_names == ("Pro I",)
+    assert gateway.count("/v3/user/account", "GET") == 2
+
+
+async def test_empty_trash_discards_listing_in_flight(
+    monkeypatch: pytest.MonkeyPatch,
+    account: FakeAccount,
+    client: FilenClient,
+) -> None:
+    """A trash listing that the empty overtook does not cache the old total."""
+    client.api_key = account.api_key
+    account.trash.append({"uuid": "old", "metadata": "", "size": 1_000})
+    listed = asyncio.Event()
+    release = asyncio.Event()
+    request = client._request
+
+    async def _held_request(method: str, path: str, **kwargs: Any) -> Any:
+        payload = await request(method, path, **kwargs)
+        if path == "/v3/dir/content" and not listed.is_set():
+            listed.set()
+            await release.wait()
+        return payload
+
+    monkeypatch.setattr(client, "_request", _held_request)
+    poll = asyncio.create_task(client.async_get_trash_usage())
+    await listed.wait()
+    await client.async_empty_trash()
+    release.set()
+
+    assert (await poll).size == 0
+    assert (await client.async_get_trash_usage()).size == 0
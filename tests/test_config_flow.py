@@ -0,0 +1,76 @@
+"""Tests for the Filen config flow."""
+
+from __future__ import annotations
+
+from homeassistant import config_entries
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.filen import async_get_domain_data
+from custom_components.filen.const import CONF_API_KEY, CONF_TWO_FACTOR_CODE, DOMAIN
+
+from .conftest import EMAIL, PASSWORD
+from .gateway import FakeAccount
+
+
+@pytest.mark.usefixtures("enable_custom_integrations", "gateway_clients")
+async def test_user_flow(hass: HomeAssistant, account: FakeAccount) -> None:
+    """A valid login creates an entry without the two-factor code."""
+    account.two_factor_code = "123456"
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {CONF_EMAIL: EMAIL, CONF_PASSWORD: PASSWORD, CONF_TWO_FACTOR_CODE: "123 456"},
+    )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"] == {
+        CONF_EMAIL: EMAIL,
+        CONF_PASSWORD: PASSWORD,
+        CONF_API_KEY: account.api_key,
+    }
+    await hass.async_block_till_done()
+    # The entry logs in with its own client, without the flow's code.
+    assert result["result"].runtime_data.client.two_factor_code == "XXXXXX"
+
+
+async def test_reauth_typo_keeps_registered_client(
+    hass: HomeAssistant, setup_integration: MockConfigEntry
+) -> None:
+    """A wrong password in a reauth flow does not replace the entry's client."""
+    registered = setup_integration.runtime_data.client
+    result = await setup_integration.start_reauth_flow(hass)
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_PASSWORD: "typo"}
+    )
+
+    assert result["errors"] == {"base": "invalid_auth"}
+    assert async_get_domain_data(hass).clients[EMAIL] is registered
+    assert registered.password == PASSWORD
+
+
+async def test_flow_two_factor_code_stays_in_flow(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, account: FakeAccount
+) -> None:
+    """A flow's two-factor code is not set on the registered client."""
+    registered = setup_integration.runtime_data.client
+    account.two_factor_code = "654321"
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {CONF_EMAIL: EMAIL, CONF_PASSWORD: PASSWORD, CONF_TWO_FACTOR_CODE: "654321"},
+    )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert registered.two_factor_code == "XXXXXX"
@@ -0,0 +1,158 @@
+"""Tests for the Filen coordinators."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from custom_components.filen.client import FilenClient
+from custom_components.filen.const import EVENT_ACTIVITY
+from custom_components.filen.coordinator import FilenActivityCoordinator
+
+from .gateway import FakeAccount, FakeFilenGateway
+
+
+async def test_idle_account_near_quota_polls_less_often(
+    setup_integration: MockConfigEntry, account: FakeAccount
+) -> None:
+    """An account close to its quota backs off while its usage does not move."""
+    coordinator = setup_integration.runtime_data.coordinator
+    account.storage_used = account.max_storage * 95 // 100
+    await coordinator.async_refresh()
+    interval = coordinator.update_interval
+
+    await coordinator.async_refresh()
+
+    assert coordinator.update_interval == interval * 2
+
+
+async def test_growing_account_polls_by_time_to_full(
+    setup_integration: MockConfigEntry, account: FakeAccount
+) -> None:
+    """Growth that fills the account soon polls at the minimum interval."""
+    coordinator = setup_integration.runtime_data.coordinator
+
+    account.storage_used += 1
+    await coordinator.async_refresh()
+    # Far from full, growth only halves the interval.
+    assert coordinator.update_interval == timedelta(minutes=15)
+
+    account.storage_used += account.max_storage // 2
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(minutes=5)
+
+
+async def test_on_demand_refresh_keeps_poll_interval(
+    setup_integration: MockConfigEntry,
+    account: FakeAccount,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A fetch for a caller does not adapt or stagger the poll interval."""
+    monkeypatch.setattr("custom_components.filen.coordinator.REFRESH_DEBOUNCE", 0)
+    coordinator = setup_integration.runtime_data.coordinator
+    await coordinator.async_refresh()
+    interval = coordinator.update_interval
+    # As if this were the second of two accounts that have not polled again.
+    coordinator.stagger = 0.5
+    coordinator._stagger_pending = True
+
+    account.storage_used += account.max_storage // 2
+    data = await coordinator.async_refresh_on_demand()
+
+    assert data.storage_used == account.storage_used
+    assert coordinator.update_interval == interval
+    assert coordinator._stagger_pending
+
+
+async def test_activity_events_fire_oldest_first(
+    hass: HomeAssistant,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    client: FilenClient,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Events spread over several pages are fired in the order they happened."""
+    client.api_key = account.api_key
+    gateway.events_page_size = 2
+    coordinator = FilenActivityCoordinator(hass, config_entry, client)
+    account.add_event("login")
+    # The first poll only records the cursor.
+    await coordinator.async_refresh()
+    fired = async_capture_events(hass, EVENT_ACTIVITY)
+
+    for offset, event_type in enumerate(
+        ("fileUploaded", "fileMoved", "fileTrash", "fileRm", "login"), 1
+    ):
+        # Filen pages by timestamp, so each page needs an older one.
+        account.add_event(event_type)["timestamp"] += offset
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert [event.data["event_id"] for event in fired] == [2, 3, 4, 5, 6]
+    assert coordinator.data.new_events == 5
+    assert coordinator.data.last_event.id == 6
+
+
+async def test_activity_events_sharing_a_timestamp(
+    hass: HomeAssistant,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    client: FilenClient,
+    config_entry: MockConfigEntry,
+) -> None:
+    """A page of events from one second does not stop paging to older ones."""
+    client.api_key = account.api_key
+    gateway.events_page_size = 2
+    coordinator = FilenActivityCoordinator(hass, config_entry, client)
+    account.add_event("login")
+    await coordinator.async_refresh()
+    fired = async_capture_events(hass, EVENT_ACTIVITY)
+
+    account.add_event("fileUploaded")["timestamp"] += 1
+    for event_type in ("fileMoved", "fileTrash"):
+        account.add_event(event_type)["timestamp"] += 2
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert [event.data["event_id"] for event in fired] == [2, 3, 4]
+    # Filen cannot say whether more events of the second did not fit the page.
+    assert coordinator.data.missed_events
+
+
+async def test_activity_overflow_reports_missed_events(
+    hass: HomeAssistant,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    client: FilenClient,
+    config_entry: MockConfigEntry,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Events older than the pages one poll reads are reported as missed."""
+    monkeypatch.setattr("custom_components.filen.client.USER_EVENTS_MAX_PAGES", 2)
+    client.api_key = account.api_key
+    gateway.events_page_size = 2
+    coordinator = FilenActivityCoordinator(hass, config_entry, client)
+    account.add_event("login")
+    await coordinator.async_refresh()
+    assert not coordinator.data.missed_events
+    fired = async_capture_events(hass, EVENT_ACTIVITY)
+
+    for offset in range(1, 7):
+        account.add_event("fileUploaded")["timestamp"] += offset
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.last_update_success
+    # The second page repeats the first page's oldest event.
+    assert [event.data["event_id"] for event in fired] == [5, 6, 7]
+    assert coordinator.data.missed_events
+    assert coordinator.data.last_event.id == 7
+
+    await coordinator.async_refresh()
+    assert not coordinator.data.missed_events
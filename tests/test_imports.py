@@ -0,0 +1,44 @@
+"""Guard the integration's import cost."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+# Packages that must only be imported when a password is derived or data is
+# encrypted.
+_LAZY_PACKAGES = {"_argon2_cffi_bindings", "argon2", "cryptography"}
+
+# Imports what Home Assistant has loaded before it imports the integration,
+# then reports the modules the integration itself added.
+_SCRIPT = """
+import sys
+
+import homeassistant.components.sensor
+import homeassistant.config_entries
+import homeassistant.helpers.config_validation
+import homeassistant.helpers.storage
+import homeassistant.helpers.update_coordinator
+
+before = set(sys.modules)
+import custom_components.filen
+print("\\n".join(sorted(set(sys.modules) - before)))
+"""
+
+
+def test_import_does_not_load_crypto_dependencies() -> None:
+    """argon2 and cryptography are loaded on first use, not at import."""
+    result = subprocess.run(
+        [sys.executable, "-c", _SCRIPT],
+        capture_output=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        text=True,
+    )
+    added = result.stdout.split()
+
+    assert "custom_components.filen" in added
+    assert not [
+        module for module in added if module.partition(".")[0] in _LAZY_PACKAGES
+    ]
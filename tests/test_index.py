@@ -0,0 +1,120 @@
+"""Tests for the drive index sync against the stand-in gateway."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from functools import partial
+import os
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.filen.const import REQUEST_PRIORITY_LOW
+from custom_components.filen.coordinator import FilenIndexCoordinator
+
+from .gateway import FakeAccount, FakeFilenGateway
+
+
+@pytest.fixture
+async def index_coordinator(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+) -> AsyncGenerator[FilenIndexCoordinator]:
+    """Return an index coordinator after its first, full sync."""
+    photos = gateway.add_folder(account, account.base_folder_uuid, "Photos")
+    gateway.add_file(account, photos, "cat.jpg", b"cat")
+    account.add_event("login")
+    await hass.async_add_executor_job(
+        partial(os.makedirs, hass.config.path(STORAGE_DIR), exist_ok=True)
+    )
+    coordinator = FilenIndexCoordinator(
+        hass, setup_integration, setup_integration.runtime_data.coordinator
+    )
+    await coordinator.async_open()
+    await coordinator.async_refresh()
+    assert coordinator.data.files == 1
+    yield coordinator
+    await coordinator.async_close()
+
+
+async def test_created_folder_is_indexed_incrementally(
+    index_coordinator: FilenIndexCoordinator,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+) -> None:
+    """A new folder is found by listing only its parent and the folder itself."""
+    music = gateway.add_folder(account, account.base_folder_uuid, "Music")
+    gateway.add_file(account, music, "song.mp3", b"song")
+    account.add_event(
+        "subFolderCreated", uuid=music, parent=account.base_folder_uuid
+    )
+    account.add_event("fileUploaded", uuid="song", parent=music)
+    listings = gateway.count("/v3/dir/content")
+
+    await index_coordinator.async_refresh()
+
+    assert gateway.count("/v3/dir/content") - listings == 2
+    assert index_coordinator.data.files == 2
+    assert index_coordinator.data.folders == 2
+
+
+async def test_unknown_parent_falls_back_to_full_walk(
+    index_coordinator: FilenIndexCoordinator,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+) -> None:
+    """An event in a folder the index does not know re-walks the whole tree."""
+    photos = next(iter(account.folders))
+    hidden = gateway.add_folder(account, photos, "Hidden")
+    gateway.add_file(account, hidden, "secret.txt", b"secret")
+    # The folder's creation event was never seen.
+    account.add_event("fileUploaded", uuid="secret", parent=hidden)
+    client = index_coordinator.client
+
+    with patch.object(
+        client, "async_list_folder", wraps=client.async_list_folder
+    ) as list_folder:
+        await index_coordinator.async_refresh()
+
+    assert index_coordinator.data.files == 2
+    assert {call.args[0] for call in list_folder.call_args_list} == {
+        account.base_folder_uuid,
+        photos,
+        hidden,
+    }
+    assert {call.kwargs["priority"] for call in list_folder.call_args_list} == {
+        REQUEST_PRIORITY_LOW
+    }
+
+
+async def test_event_overflow_falls_back_to_full_walk(
+    index_coordinator: FilenIndexCoordinator,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """More new events than one sync reads re-walks the whole tree."""
+    monkeypatch.setattr("custom_components.filen.client.USER_EVENTS_MAX_PAGES", 1)
+    gateway.events_page_size = 2
+    photos = next(iter(account.folders))
+    for offset, name in enumerate(("dog.jpg", "bird.jpg", "fish.jpg"), 1):
+        gateway.add_file(account, photos, name, name.encode())
+        event = account.add_event("fileUploaded", uuid=name, parent=photos)
+        event["timestamp"] += offset
+    client = index_coordinator.client
+
+    with patch.object(
+        client, "async_list_folder", wraps=client.async_list_folder
+    ) as list_folder:
+        await index_coordinator.async_refresh()
+
+    assert index_coordinator.data.files == 4
+    assert {call.args[0] for call in list_folder.call_args_list} == {
+        account.base_folder_uuid,
+        photos,
+    }
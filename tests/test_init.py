@@ -0,0 +1,77 @@
+"""Tests for setting up and unloading Filen config entries."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.filen import async_get_domain_data
+from custom_components.filen.const import CONF_API_KEY, CONF_REALTIME
+from custom_components.filen.realtime import FilenRealtimeListener
+
+from .gateway import FakeAccount
+
+
+async def test_reload_keeps_one_session_close_listener(
+    hass: HomeAssistant, setup_integration: MockConfigEntry
+) -> None:
+    """Recreating the gateway session does not add close listeners."""
+    listeners = hass.bus.async_listeners()[EVENT_HOMEASSISTANT_CLOSE]
+
+    for _ in range(3):
+        assert await hass.config_entries.async_reload(setup_integration.entry_id)
+        await hass.async_block_till_done()
+
+    assert setup_integration.state is ConfigEntryState.LOADED
+    assert hass.bus.async_listeners()[EVENT_HOMEASSISTANT_CLOSE] == listeners
+
+    assert await hass.config_entries.async_unload(setup_integration.entry_id)
+    domain_data = async_get_domain_data(hass)
+    assert domain_data.session is None
+    assert domain_data.session_close_listener is None
+    assert hass.bus.async_listeners().get(EVENT_HOMEASSISTANT_CLOSE, 0) == listeners - 1
+
+
+async def test_unload_forgets_password_derivations(
+    hass: HomeAssistant, setup_integration: MockConfigEntry
+) -> None:
+    """Derived credentials do not outlive the entry that derived them."""
+    client = setup_integration.runtime_data.client
+    credential_cache = async_get_domain_data(hass).credential_cache
+    # A stored API key skips the login, so derive through the master key lookup.
+    await client.async_get_master_keys()
+    assert client.credential_cache is credential_cache
+    assert len(credential_cache) == 1
+
+    assert await hass.config_entries.async_unload(setup_integration.entry_id)
+
+    assert len(credential_cache) == 0
+
+
+async def test_new_api_key_reconnects_realtime_socket(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    gateway_clients: None,
+    config_entry: MockConfigEntry,
+    account: FakeAccount,
+) -> None:
+    """A new login's API key is stored and the realtime socket reconnects."""
+    hass.config_entries.async_update_entry(config_entry, options={CONF_REALTIME: True})
+    with (
+        patch.object(FilenRealtimeListener, "async_run", AsyncMock()),
+        patch.object(FilenRealtimeListener, "async_reconnect") as reconnect,
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        reconnect.assert_not_called()
+
+        # The stored key is revoked, so the next poll logs in again.
+        account.api_key = "rotated-api-key"
+        await config_entry.runtime_data.coordinator.async_refresh()
+
+    assert config_entry.data[CONF_API_KEY] == "rotated-api-key"
+    reconnect.assert_called_once_with()
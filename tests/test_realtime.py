@@ -0,0 +1,242 @@
+"""Tests for the realtime listener against a stand-in event socket."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+import json
+import random
+from unittest.mock import patch
+
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from custom_components.filen import realtime
+from custom_components.filen.client import FilenClient
+from custom_components.filen.realtime import FilenRealtimeListener
+
+
+class FakeSocketServer:
+    """Speak enough of Engine.IO 3 to authenticate and push events."""
+
+    def __init__(self) -> None:
+        """Initialize the server without starting it."""
+        self.handshake = json.dumps(
+            {"sid": "sid", "pingInterval": 50, "pingTimeout": 50}
+        )
+        self.answer_pings = True
+        # Close every session right after the handshake, before authentication.
+        self.close_after_handshake = False
+        # Packets sent right after a successful authentication.
+        self.events: list[str] = []
+        self.connections = 0
+        # API key of every auth request, in order.
+        self.api_keys: list[str] = []
+        self._server: TestServer | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the running server."""
+        assert self._server is not None
+        return str(self._server.make_url("")).rstrip("/")
+
+    async def start(self) -> None:
+        """Start serving on a free local port."""
+        app = web.Application()
+        app.router.add_get("/socket.io/", self._socket)
+        self._server = TestServer(app)
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            await self._server.close()
+
+    async def _socket(self, request: web.Request) -> web.WebSocketResponse:
+        """Run one socket session."""
+        self.connections += 1
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str("0" + self.handshake)
+        if self.close_after_handshake:
+            await ws.close()
+            return ws
+        async for message in ws:
+            if message.type is not WSMsgType.TEXT:
+                continue
+            if message.data == "2" and self.answer_pings:
+                await ws.send_str("3")
+            elif message.data.startswith('42["auth"'):
+                self.api_keys.append(json.loads(message.data[2:])[1]["apiKey"])
+                await ws.send_str('42["authSuccess"]')
+                for event in self.events:
+                    await ws.send_str(event)
+        return ws
+
+
+@pytest.fixture
+async def socket_server(socket_enabled: None) -> AsyncGenerator[FakeSocketServer]:
+    """Run a stand-in event socket."""
+    server = FakeSocketServer()
+    await server.start()
+    yield server
+    await server.close()
+
+
+@pytest.fixture(autouse=True)
+def fast_reconnect(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reconnect without the production backoff."""
+    monkeypatch.setattr(
+        "custom_components.filen.realtime.REALTIME_RECONNECT_MIN", 0.01
+    )
+
+
+async def _async_wait_for(
+    condition: Callable[[], object], timeout: float = 2.0
+) -> None:
+    """Wait until ``condition`` returns true."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def _async_run(
+    listener: FilenRealtimeListener,
+    condition: Callable[[], object],
+    *,
+    linger: float = 0.0,
+) -> None:
+    """Run the listener until ``condition`` holds, wait ``linger``, then stop it."""
+    task = asyncio.create_task(listener.async_run())
+    try:
+        await _async_wait_for(condition)
+        await asyncio.sleep(linger)
+        assert not task.done()
+    finally:
+        await listener.async_stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def test_malformed_event_is_ignored(
+    socket_server: FakeSocketServer, client: FilenClient
+) -> None:
+    """A dict payload or invalid JSON does not stop the listener."""
+    socket_server.events = [
+        '42{"type":"fileNew"}',
+        "42[not json",
+        '42["fileNew",{}]',
+    ]
+    events: list[str] = []
+    listener = FilenRealtimeListener(
+        client, events.append, lambda connected: None, url=socket_server.url
+    )
+
+    await _async_run(listener, lambda: events)
+
+    assert events == ["fileNew"]
+    assert socket_server.connections == 1
+
+
+async def test_missing_pong_drops_connection(
+    socket_server: FakeSocketServer, client: FilenClient
+) -> None:
+    """An unanswered ping closes the socket and reconnects."""
+    socket_server.answer_pings = False
+    states: list[bool] = []
+    listener = FilenRealtimeListener(
+        client, lambda event: None, states.append, url=socket_server.url
+    )
+
+    await _async_run(listener, lambda: listener.reconnect_count >= 2)
+
+    assert states[:3] == [True, False, True]
+
+
+async def test_answered_pings_keep_connection(
+    socket_server: FakeSocketServer, client: FilenClient
+) -> None:
+    """A socket that answers pings stays connected across ping intervals."""
+    socket_server.handshake = json.dumps(
+        {"sid": "sid", "pingInterval": 50, "pingTimeout": 1000}
+    )
+    states: list[bool] = []
+    listener = FilenRealtimeListener(
+        client, lambda event: None, states.append, url=socket_server.url
+    )
+
+    # Lingers for ten ping intervals.
+    await _async_run(listener, lambda: listener.connected, linger=0.5)
+
+    assert states == [True]
+    assert listener.reconnect_count == 0
+    assert socket_server.connections == 1
+
+
+async def test_unauthenticated_sessions_back_off(
+    socket_server: FakeSocketServer, client: FilenClient
+) -> None:
+    """A server that closes after every handshake is retried ever more slowly."""
+    socket_server.close_after_handshake = True
+    listener = FilenRealtimeListener(
+        client, lambda event: None, lambda connected: None, url=socket_server.url
+    )
+
+    with patch.object(realtime.random, "uniform", wraps=random.uniform) as uniform:
+        await _async_run(listener, lambda: listener.reconnect_count >= 3)
+
+    assert [call.args[1] for call in uniform.call_args_list[:3]] == [
+        0.01,
+        0.02,
+        0.04,
+    ]
+
+
+async def test_stable_session_resets_backoff(
+    socket_server: FakeSocketServer,
+    client: FilenClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A session that stayed authenticated long enough reconnects quickly."""
+    monkeypatch.setattr(
+        "custom_components.filen.realtime.REALTIME_STABLE_SESSION", 0
+    )
+    socket_server.answer_pings = False
+    listener = FilenRealtimeListener(
+        client, lambda event: None, lambda connected: None, url=socket_server.url
+    )
+
+    with patch.object(realtime.random, "uniform", wraps=random.uniform) as uniform:
+        await _async_run(listener, lambda: listener.reconnect_count >= 3)
+
+    assert {call.args[1] for call in uniform.call_args_list} == {0.01}
+
+
+async def test_rotated_api_key_reconnects(
+    socket_server: FakeSocketServer, client: FilenClient
+) -> None:
+    """A new API key from a login is used by a new socket session at once."""
+    socket_server.handshake = json.dumps(
+        {"sid": "sid", "pingInterval": 50, "pingTimeout": 1000}
+    )
+    client.api_key = "old-api-key"
+    listener = FilenRealtimeListener(
+        client, lambda event: None, lambda connected: None, url=socket_server.url
+    )
+    task = asyncio.create_task(listener.async_run())
+    try:
+        await _async_wait_for(lambda: listener.connected)
+        listener.async_reconnect()
+        assert listener.connected
+
+        client.api_key = "new-api-key"
+        listener.async_reconnect()
+        await _async_wait_for(lambda: len(socket_server.api_keys) == 2)
+    finally:
+        await listener.async_stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert socket_server.api_keys == ["old-api-key", "new-api-key"]
+    assert listener.reconnect_count == 1
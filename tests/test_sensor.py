@@ -0,0 +1,100 @@
+"""Tests for the Filen sensors."""
+
+from __future__ import annotations
+
+from collections.abc import Generator
+from dataclasses import replace
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.filen.sensor import SENSOR_DESCRIPTIONS, FilenAccountSensor
+
+from .gateway import FakeAccount
+
+# A simulated day of polling every 5 minutes, with usage changing every 2 hours.
+POLLS_PER_DAY = 288
+POLLS_PER_CHANGE = 24
+CHANGES_PER_DAY = POLLS_PER_DAY // POLLS_PER_CHANGE
+GROWTH_PER_CHANGE = 1_000_000_000
+
+# Sensors whose value follows storage_used; the storage total never changes.
+STORAGE_USED_SENSORS = ("storage_used", "storage_percentage")
+
+
+@pytest.fixture
+def state_writes() -> Generator[list[str]]:
+    """Record the key of every account sensor that writes its state."""
+    writes: list[str] = []
+    original_write = FilenAccountSensor.async_write_ha_state
+
+    def _record_state_write(sensor: FilenAccountSensor) -> None:
+        writes.append(sensor.entity_description.key)
+        original_write(sensor)
+
+    with patch.object(FilenAccountSensor, "async_write_ha_state", _record_state_write):
+        yield writes
+
+
+async def test_day_of_polling_skips_unchanged_writes(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    account: FakeAccount,
+    state_writes: list[str],
+) -> None:
+    """Polls that return the same account data write no state and no snapshot."""
+    coordinator = setup_integration.runtime_data.coordinator
+    state_writes.clear()
+
+    with patch.object(
+        coordinator._store,
+        "async_delay_save",
+        wraps=coordinator._store.async_delay_save,
+    ) as snapshot_saves:
+        for poll in range(POLLS_PER_DAY):
+            if poll % POLLS_PER_CHANGE == 0:
+                account.storage_used += GROWTH_PER_CHANGE
+            await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert sorted(state_writes) == sorted(STORAGE_USED_SENSORS * CHANGES_PER_DAY)
+    assert snapshot_saves.call_count == CHANGES_PER_DAY
+
+
+async def test_day_of_updates_benchmark(
+    benchmark: BenchmarkFixture,
+    setup_integration: MockConfigEntry,
+    state_writes: list[str],
+) -> None:
+    """Benchmark a day of coordinator updates and count the writes avoided."""
+    coordinator = setup_integration.runtime_data.coordinator
+    start = coordinator.data
+    day = [
+        replace(
+            start,
+            storage_used=start.storage_used
+            + (poll // POLLS_PER_CHANGE + 1) * GROWTH_PER_CHANGE,
+            storage_percentage=start.storage_percentage
+            + (poll // POLLS_PER_CHANGE + 1) * 10,
+        )
+        for poll in range(POLLS_PER_DAY)
+    ]
+
+    def _setup() -> None:
+        coordinator.async_set_updated_data(start)
+        state_writes.clear()
+
+    def _update_day() -> None:
+        for data in day:
+            coordinator.async_set_updated_data(data)
+
+    benchmark.pedantic(_update_day, setup=_setup, rounds=5)
+
+    assert len(state_writes) == len(STORAGE_USED_SENSORS) * CHANGES_PER_DAY
+    benchmark.extra_info["state_writes"] = len(state_writes)
+    benchmark.extra_info["state_writes_avoided"] = (
+        POLLS_PER_DAY * len(SENSOR_DESCRIPTIONS) - len(state_writes)
+    )
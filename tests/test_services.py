@@ -0,0 +1,183 @@
+"""Tests for the Filen services."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.filen.client import FilenFile
+from custom_components.filen.const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_DIRECTORY,
+    ATTR_FILE_UUID,
+    ATTR_FILENAME,
+    ATTR_OVERWRITE,
+    DOMAIN,
+    SERVICE_DOWNLOAD_FILE,
+)
+from custom_components.filen.crypto import CHUNK_SIZE, FILE_VERSION_3
+
+from .gateway import FakeAccount, FakeFilenGateway
+
+# Two chunks, the last one short.
+CONTENT = bytes(range(256)) * ((CHUNK_SIZE + 1024) // 256)
+
+
+@pytest.fixture
+def download_dir(hass: HomeAssistant, tmp_path: Path) -> Path:
+    """Return a directory the download service may write to."""
+    hass.config.allowlist_external_dirs.add(str(tmp_path))
+    return tmp_path
+
+
+async def _async_download(
+    hass: HomeAssistant,
+    entry: MockConfigEntry,
+    file_uuid: str,
+    directory: Path,
+    **data: object,
+) -> dict[str, object]:
+    """Call the download service with extra ``data`` and return its response."""
+    return await hass.services.async_call(
+        DOMAIN,
+        SERVICE_DOWNLOAD_FILE,
+        {
+            ATTR_CONFIG_ENTRY_ID: entry.entry_id,
+            ATTR_FILE_UUID: file_uuid,
+            ATTR_DIRECTORY: str(directory),
+            **data,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+
+async def test_download_without_chunk_count(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    download_dir: Path,
+) -> None:
+    """A file listed without a chunk count is downloaded in full."""
+    file_uuid = gateway.add_file(
+        account, account.base_folder_uuid, "video.mp4", CONTENT
+    )
+    account.files[file_uuid]["chunks"] = None
+
+    response = await _async_download(hass, setup_integration, file_uuid, download_dir)
+
+    assert (download_dir / "video.mp4").read_bytes() == CONTENT
+    assert response["size"] == len(CONTENT)
+
+
+async def test_truncated_download_is_discarded(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    download_dir: Path,
+) -> None:
+    """A download shorter than the file's size leaves no file behind."""
+    file_uuid = gateway.add_file(
+        account, account.base_folder_uuid, "video.mp4", CONTENT
+    )
+    account.files[file_uuid]["chunks"] = 1
+
+    with pytest.raises(HomeAssistantError, match="expected"):
+        await _async_download(hass, setup_integration, file_uuid, download_dir)
+
+    assert list(download_dir.iterdir()) == []
+
+
+async def test_download_version_3_file(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    download_dir: Path,
+) -> None:
+    """A file encrypted with a hex version 3 key is decrypted."""
+    file_uuid = gateway.add_file(
+        account,
+        account.base_folder_uuid,
+        "video.mp4",
+        CONTENT,
+        version=FILE_VERSION_3,
+    )
+
+    response = await _async_download(hass, setup_integration, file_uuid, download_dir)
+
+    assert (download_dir / "video.mp4").read_bytes() == CONTENT
+    assert response["size"] == len(CONTENT)
+
+
+@pytest.mark.parametrize("link", [False, True], ids=["parent_name", "symlink"])
+async def test_download_outside_allowed_dirs_is_rejected(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    tmp_path_factory: pytest.TempPathFactory,
+    download_dir: Path,
+    link: bool,
+) -> None:
+    """A file name that resolves outside the allowed directory is refused."""
+    file_uuid = gateway.add_file(
+        account, account.base_folder_uuid, "video.mp4", CONTENT
+    )
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "video.mp4").write_bytes(b"keep")
+    filename = ".."
+    if link:
+        filename = "video.mp4"
+        (download_dir / filename).symlink_to(outside / filename)
+
+    with pytest.raises(ServiceValidationError, match="outside"):
+        await _async_download(
+            hass,
+            setup_integration,
+            file_uuid,
+            download_dir,
+            **{ATTR_FILENAME: filename, ATTR_OVERWRITE: True},
+        )
+
+    assert (outside / "video.mp4").read_bytes() == b"keep"
+
+
+async def test_failed_write_stops_download(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    gateway: FakeFilenGateway,
+    account: FakeAccount,
+    download_dir: Path,
+) -> None:
+    """A write error closes the chunk iterator instead of leaving it suspended."""
+    file_uuid = gateway.add_file(
+        account, account.base_folder_uuid, "video.mp4", CONTENT
+    )
+    client = setup_integration.runtime_data.client
+    iter_file = client.async_iter_file
+    downloads: list[AsyncIterator[bytes]] = []
+
+    def _iter_file(file: FilenFile) -> AsyncIterator[bytes]:
+        downloads.append(iter_file(file))
+        return downloads[-1]
+
+    fp = MagicMock()
+    fp.write.side_effect = OSError("No space left on device")
+    with (
+        patch.object(client, "async_iter_file", _iter_file),
+        patch("custom_components.filen.services.open", create=True, return_value=fp),
+        pytest.raises(HomeAssistantError, match="No space left"),
+    ):
+        await _async_download(hass, setup_integration, file_uuid, download_dir)
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(downloads[0])